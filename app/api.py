@@ -1,20 +1,31 @@
+import asyncio
+import time
 from pathlib import Path
+from typing import Dict
 
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.requests import Request
 from starlette.responses import HTMLResponse
-from starlette.staticfiles import StaticFiles
 from starlette.templating import Jinja2Templates
 
+from common_lib.metrics import register_metrics_provider
 from common_lib.models import User
 from common_lib.services.auth.auth_service import get_current_active_user
+from common_lib.services.auth.password_pool import password_pool
+from routes.classify import classify_router
 from routes.comment import comment_router
+from routes.metrics import metrics_router
 from routes.product import product_router
-from common_lib.services.rm.rm import connect_rabbitmq, close_rabbitmq
 from routes.user import user_route
-from common_lib.database.database import init_db
+from common_lib.database.database import check_db_connection
 from common_lib.database.config import get_settings
+from common_lib.database.instrumentation import QueryCountMiddleware
+from core.admission import start_admission_sampler, stop_admission_sampler
+from core.classifier import start_classifier, stop_classifier
+from core.request_id import RequestIdMiddleware
+from core.transport import start_transport, stop_transport
+from core.static_assets import build_static_assets, install_static_url_for, PrecompressedStaticFiles
 from core.templating import templates
 
 import uvicorn
@@ -33,11 +44,15 @@ def create_application() -> FastAPI:
         docs_url="/api/docs",
         redoc_url="/api/redoc"
     )
+    static_dir = APP_DIR / "view/static"
+    static_build_dir = Path(settings.STATIC_BUILD_DIR or APP_DIR / "view/.static_build")
+    manifest = build_static_assets(static_dir, static_build_dir)
     app.mount(
         "/static",
-        StaticFiles(directory=str(APP_DIR / "view/static")),
+        PrecompressedStaticFiles(static_build_dir, static_dir, manifest),
         name="static"
     )
+    install_static_url_for(templates.env, manifest)
 
     app.add_middleware(
         CORSMiddleware,
@@ -46,23 +61,47 @@ def create_application() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    if settings.DB_INSTRUMENTATION_ENABLED:
+        app.add_middleware(QueryCountMiddleware)
+    app.add_middleware(RequestIdMiddleware)
     app.include_router(user_route, prefix="/api/auth", tags=["Authentication"])
     app.include_router(product_router, prefix="/api/products", tags=["Products"])
     app.include_router(comment_router, prefix="/api/comments", tags=["Comments"])
+    app.include_router(classify_router, prefix="/api/classify", tags=["Classification"])
+    app.include_router(metrics_router, prefix="/api/metrics", tags=["Metrics"])
     return app
 
 
 app = create_application()
 
 
+startup_timings: Dict[str, float] = {}
+register_metrics_provider("startup", lambda: dict(startup_timings))
+
+
+async def _timed(name: str, awaitable) -> None:
+    started = time.perf_counter()
+    try:
+        await awaitable
+    finally:
+        startup_timings[f"{name}_seconds"] = round(time.perf_counter() - started, 4)
+
+
 @app.on_event("startup")
 async def on_startup():
+    # Схема и начальные данные создаются отдельной командой
+    # `python -m common_lib.database.manage init-db`; здесь только проверки.
+    started = time.perf_counter()
     try:
-        logger.info("Initializing database...")
-        init_db()
-        logger.info("Connecting to RabbitMQ...")
-        await connect_rabbitmq()
-        logger.info("Application startup completed successfully")
+        logger.info("Checking database connectivity and starting the task transport...")
+        await asyncio.gather(
+            _timed("database", asyncio.to_thread(check_db_connection)),
+            _timed("transport", start_transport()),
+        )
+        start_admission_sampler()
+        await _timed("classifier", start_classifier())
+        startup_timings["total_seconds"] = round(time.perf_counter() - started, 4)
+        logger.info(f"Application startup completed successfully: {startup_timings}")
     except Exception as e:
         logger.error(f"Startup failed: {str(e)}")
         raise
@@ -102,7 +141,10 @@ async def get_create_product_page(request: Request, current_user: User = Depends
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Application shutting down...")
-    await close_rabbitmq()
+    await stop_admission_sampler()
+    await stop_transport()
+    await stop_classifier()
+    password_pool.shutdown()
 
 if __name__ == '__main__':
     logging.basicConfig(level=logging.DEBUG)
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+from typing import Optional
+
+from sqlmodel import Session
+
+from common_lib.database.config import get_settings
+from common_lib.database.database import engine
+from common_lib.services.admission import admission_controller
+from common_lib.services.crud.comment import requeue_deferred_comments
+from common_lib.services.transport.registry import get_transport
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_sampler_task: Optional[asyncio.Task] = None
+
+
+def _requeue_deferred() -> int:
+    with Session(engine) as session:
+        return requeue_deferred_comments(session, limit=settings.ADMISSION_REQUEUE_BATCH_SIZE)
+
+
+async def _run_sampler() -> None:
+    while True:
+        try:
+            message_count, consumer_count = await get_transport().queue_load()
+            admission_controller.update(message_count, consumer_count)
+            if not admission_controller.is_overloaded():
+                await asyncio.to_thread(_requeue_deferred)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Moderation queue sampling failed: {e}")
+        await asyncio.sleep(settings.ADMISSION_SAMPLE_INTERVAL_SECONDS)
+
+
+def start_admission_sampler() -> None:
+    global _sampler_task
+    if not admission_controller.enabled or _sampler_task is not None:
+        return
+    _sampler_task = asyncio.create_task(_run_sampler())
+    logger.info(f"Admission sampler started, interval {settings.ADMISSION_SAMPLE_INTERVAL_SECONDS}s")
+
+
+async def stop_admission_sampler() -> None:
+    global _sampler_task
+    if _sampler_task is None:
+        return
+    _sampler_task.cancel()
+    try:
+        await _sampler_task
+    except asyncio.CancelledError:
+        pass
+    _sampler_task = None
@@ -0,0 +1,49 @@
+import logging
+import os
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from common_lib.database.config import get_settings
+from common_lib.metrics import register_metrics_provider
+from common_lib.services.classifier.batcher import MicroBatcher
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+batcher: Optional[MicroBatcher] = None
+
+
+async def start_classifier() -> None:
+    """Loads the model and starts the cross-request batcher if classification is enabled."""
+    global batcher
+    if not settings.CLASSIFIER_ENABLED:
+        logger.info("Classifier disabled, /api/classify will answer 503")
+        return
+    from common_lib.services.classifier.model import ReviewClassifier, ARTIFACT_FILENAME
+
+    classifier = ReviewClassifier(os.path.join(settings.MODEL_DIR, ARTIFACT_FILENAME))
+    batcher = MicroBatcher(
+        classifier.classify,
+        max_batch_size=settings.CLASSIFY_MAX_BATCH_SIZE,
+        max_wait_ms=settings.CLASSIFY_MAX_WAIT_MS,
+        workers=settings.CLASSIFY_WORKERS,
+    )
+    await batcher.start()
+    register_metrics_provider("classify_batcher", batcher.stats)
+
+
+async def stop_classifier() -> None:
+    global batcher
+    if batcher is not None:
+        await batcher.stop()
+        batcher = None
+
+
+def get_batcher() -> MicroBatcher:
+    if batcher is None or not batcher.is_running:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Classifier is not available",
+        )
+    return batcher
@@ -0,0 +1,41 @@
+import time
+
+from common_lib.services.tracing import REQUEST_ID_HEADER, bind_request, normalize_request_id, reset_request
+
+
+class RequestIdMiddleware:
+    """
+    Pure ASGI middleware that assigns each HTTP request a correlation ID,
+    taken from the incoming ``X-Request-ID`` header when it looks valid, and
+    records when the request was accepted. Both are available to the request
+    through ``common_lib.services.tracing`` and the ID is echoed back in the
+    response headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for key, value in scope.get("headers", []):
+            if key == REQUEST_ID_HEADER.encode("latin-1"):
+                incoming = value.decode("latin-1")
+                break
+        request_id = normalize_request_id(incoming)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER.encode("latin-1"), request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        tokens = bind_request(request_id, time.time())
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            reset_request(tokens)
@@ -0,0 +1,169 @@
+"""
+Fingerprinting and precompression of static assets.
+
+Every file under the source directory is copied into the build directory
+under a content-hashed name (``style.css`` -> ``style.3f2a9c1b7d4e.css``)
+and text assets additionally get ``.gz`` and, when the ``brotli`` package is
+installed, ``.br`` variants. The mapping is written to ``manifest.json``.
+Hashed files never change, so they are served with
+``Cache-Control: immutable``.
+
+Can be run as a build step (``python -m core.static_assets`` from ``app/``);
+the application also builds on startup, reusing files that already exist.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Set
+
+from jinja2 import pass_context
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip variants are always written
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".svg", ".html", ".json", ".txt", ".map"}
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+HASH_LENGTH = 12
+
+
+def _fingerprinted_name(relative_path: str, digest: str) -> str:
+    path = Path(relative_path)
+    return str(path.with_name(f"{path.stem}.{digest[:HASH_LENGTH]}{path.suffix}").as_posix())
+
+
+def _write_atomic(target: Path, data: bytes) -> None:
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, target)
+
+
+def build_static_assets(source_dir: Path, build_dir: Path) -> Dict[str, str]:
+    """
+    Builds hashed and precompressed copies of every asset and returns the
+    manifest mapping original relative paths to fingerprinted ones.
+    """
+    source_dir = Path(source_dir)
+    build_dir = Path(build_dir)
+    build_dir.mkdir(parents=True, exist_ok=True)
+    manifest: Dict[str, str] = {}
+    written = 0
+
+    for source in sorted(p for p in source_dir.rglob("*") if p.is_file()):
+        relative = source.relative_to(source_dir).as_posix()
+        data = source.read_bytes()
+        hashed = _fingerprinted_name(relative, hashlib.sha256(data).hexdigest())
+        manifest[relative] = hashed
+
+        target = build_dir / hashed
+        if target.exists():
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, target)
+        if source.suffix.lower() in COMPRESSIBLE_SUFFIXES:
+            _write_atomic(target.with_name(target.name + ".gz"), gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                _write_atomic(target.with_name(target.name + ".br"), brotli.compress(data))
+        written += 1
+
+    _write_atomic(build_dir / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+    logger.info(f"Static assets built: {len(manifest)} file(s), {written} new, brotli={'on' if brotli else 'off'}")
+    return manifest
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """
+    Maps each coding of an Accept-Encoding header to its q-value
+    (``br;q=0, gzip`` -> ``{"br": 0.0, "gzip": 1.0}``). Malformed q-values
+    count as 0, i.e. the coding is not accepted.
+    """
+    accepted: Dict[str, float] = {}
+    for item in header.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding.lower()] = quality
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves fingerprinted assets from the build directory with
+    immutable caching and picks a precompressed variant by Accept-Encoding.
+    Paths that are not in the manifest fall back to the source directory with
+    the default revalidation headers.
+    """
+
+    def __init__(self, build_dir: Path, source_dir: Path, manifest: Dict[str, str]):
+        super().__init__(directory=str(build_dir))
+        self.all_directories = [str(build_dir), str(source_dir)]
+        self.build_dir = Path(build_dir)
+        self.fingerprinted: Set[str] = set(manifest.values())
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        relative = Path(path).as_posix()
+        if relative not in self.fingerprinted:
+            return await super().get_response(path, scope)
+
+        response = await super().get_response(path, scope)
+        if response.status_code != 200:
+            return response
+
+        accept_encoding = ""
+        for key, value in scope.get("headers", []):
+            if key == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        accepted = parse_accept_encoding(accept_encoding)
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            variant = self.build_dir / (relative + suffix)
+            if accepted.get(encoding, accepted.get("*", 0.0)) > 0 and variant.is_file():
+                response = FileResponse(variant, media_type=response.media_type,
+                                        headers={"Content-Encoding": encoding})
+                break
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+
+def install_static_url_for(env, manifest: Dict[str, str], mount_name: str = "static") -> None:
+    """
+    Replaces the ``url_for`` Jinja global so that ``url_for('static', path=...)``
+    resolves to the fingerprinted file. Static URLs are returned as paths,
+    which keeps them valid behind the reverse proxy.
+    """
+    original_url_for = env.globals["url_for"]
+
+    @pass_context
+    def url_for(context, name: str, /, **path_params):
+        if name == mount_name and "path" in path_params:
+            path_params["path"] = manifest.get(path_params["path"], path_params["path"])
+            return context["request"].app.url_path_for(name, **path_params)
+        return original_url_for(context, name, **path_params)
+
+    env.globals["url_for"] = url_for
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    app_dir = Path(__file__).resolve().parent.parent
+    build_static_assets(app_dir / "view" / "static", app_dir / "view" / ".static_build")
@@ -1,14 +1,23 @@
-import datetime
 import logging
-from collections import defaultdict
-from typing import Optional, Any
+import tempfile
+from pathlib import Path
 
 from fastapi.templating import Jinja2Templates
-from pathlib import Path
+from jinja2 import FileSystemBytecodeCache
+
+from common_lib.database.config import get_settings
 
 APP_ROOT_DIR = Path(__file__).resolve().parent.parent
 TEMPLATE_DIR = APP_ROOT_DIR / "view" / "templates"
 
-templates = Jinja2Templates(directory=str(TEMPLATE_DIR))
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+templates = Jinja2Templates(directory=str(TEMPLATE_DIR))
 
+# Скомпилированные шаблоны кэшируются на диске и переиспользуются между
+# перезапусками процесса; проверка mtime шаблонов нужна только в разработке.
+_bytecode_cache_dir = Path(settings.TEMPLATE_CACHE_DIR or Path(tempfile.gettempdir()) / "jinja_bytecode_cache")
+_bytecode_cache_dir.mkdir(parents=True, exist_ok=True)
+templates.env.bytecode_cache = FileSystemBytecodeCache(str(_bytecode_cache_dir))
+templates.env.auto_reload = settings.ENVIRONMENT != "production"
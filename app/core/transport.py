@@ -0,0 +1,47 @@
+import asyncio
+import logging
+import os
+
+from common_lib.database.config import get_settings
+from common_lib.metrics import register_metrics_provider
+from common_lib.services.transport.registry import get_transport, set_transport
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_processor = None
+
+
+def _build_inprocess_transport():
+    from common_lib.services.classifier.model import ARTIFACT_FILENAME, ReviewClassifier
+    from common_lib.services.moderation import ModerationProcessor
+    from common_lib.services.transport.inprocess import InProcessTransport
+
+    global _processor
+    classifier = ReviewClassifier(os.path.join(settings.MODEL_DIR, ARTIFACT_FILENAME))
+    _processor = ModerationProcessor.from_settings(lambda text: classifier.predict_labels([text])[0],
+                                                   unit_name="inprocess moderation")
+    return InProcessTransport(
+        _processor.handle,
+        workers=settings.INPROCESS_WORKERS,
+        max_queue=settings.INPROCESS_MAX_QUEUE,
+    )
+
+
+async def start_transport() -> None:
+    """
+    Starts the task transport selected by TASK_TRANSPORT. For the in-process
+    transport the model is loaded here, off the event loop.
+    """
+    if settings.TASK_TRANSPORT == "inprocess" and _processor is None:
+        set_transport(await asyncio.to_thread(_build_inprocess_transport))
+    transport = get_transport()
+    await transport.start()
+    register_metrics_provider("transport", transport.stats)
+    logger.info(f"Moderation task transport: {transport.name}")
+
+
+async def stop_transport() -> None:
+    await get_transport().stop()
+    if _processor is not None:
+        await asyncio.to_thread(_processor.snapshot)
@@ -0,0 +1,42 @@
+import asyncio
+from typing import Dict, List
+
+from fastapi import APIRouter, Depends
+from pydantic import Field
+from sqlmodel import SQLModel
+
+from common_lib.models import RoleEnum
+from common_lib.services.auth.auth_service import require_role
+from common_lib.services.classifier.batcher import MicroBatcher
+from core.classifier import get_batcher
+
+classify_router = APIRouter()
+
+
+class ClassifyRequest(SQLModel):
+    texts: List[str] = Field(min_length=1, max_length=100)
+
+
+class ClassifyResult(SQLModel):
+    label: int
+    predicted_class: str
+    confidence: float
+    probabilities: Dict[str, float]
+
+
+@classify_router.post(
+    "/",
+    response_model=List[ClassifyResult],
+    summary="Синхронная классификация произвольного текста",
+    dependencies=[Depends(require_role(RoleEnum.ADMIN))]
+)
+async def classify_texts(
+        request: ClassifyRequest,
+        batcher: MicroBatcher = Depends(get_batcher)
+):
+    """
+    Оценивает тексты без создания комментариев. Одновременные запросы
+    объединяются в один векторизованный вызов модели. Доступно только
+    администраторам: модель общая для всех запросов.
+    """
+    return await asyncio.gather(*(batcher.submit(text) for text in request.texts))
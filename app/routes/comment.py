@@ -1,20 +1,51 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlmodel import Session
 
-from common_lib.models.Comment import CommentCreate, CommentOut, Comment, CommentUpdateModeration
+from common_lib.database.config import get_settings
+from common_lib.models.Comment import (CommentCreate, CommentOut, Comment, CommentUpdateModeration,
+                                       CommentBulkItemResult, CommentBulkResult, ModerationStatus)
 from common_lib.services.crud import comment
 from common_lib.database.database import get_session
 
 
+from common_lib.services.admission import admission_controller, SheddingPolicy
 from common_lib.services.auth.auth_service import get_current_active_user, require_role
 from common_lib.models.User import User, RoleEnum
 from common_lib.services.crud.comment import moderate_comment
 
+settings = get_settings()
+
 comment_router = APIRouter(
 )
 
 
+def _should_defer(policy: str) -> bool:
+    """
+    Решение о допуске по закэшированной загрузке очереди модерации: при
+    перегрузке либо откладывает модерацию, либо отвечает 429 с Retry-After.
+    """
+    if not admission_controller.is_overloaded():
+        return False
+    if policy == SheddingPolicy.REJECT:
+        admission_controller.record_rejected()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Очередь модерации перегружена, повторите запрос позже.",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)}
+        )
+    admission_controller.record_deferred()
+    return True
+
+
 @comment_router.post(
     "/",
     response_model=CommentOut,
@@ -29,7 +60,149 @@ def create_new_comment(
     return comment.create_comment(
         session=session,
         comment_in=comment_in,
-        author=current_user
+        author=current_user,
+        defer=_should_defer(settings.ADMISSION_SINGLE_POLICY)
+    )
+
+
+@comment_router.post(
+    "/bulk",
+    response_model=CommentBulkResult,
+    summary="Массовая загрузка комментариев"
+)
+def create_new_comments_bulk(
+        items: List[Dict[str, Any]] = Body(...),
+        session: Session = Depends(get_session),
+        current_user: User = Depends(get_current_active_user)
+):
+    """
+    Валидирует каждый элемент отдельно, вставляет валидные комментарии одним
+    запросом и возвращает результат по каждому элементу в исходном порядке.
+    """
+    if current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+        )
+    if len(items) > settings.COMMENT_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Слишком много комментариев в запросе, максимум {settings.COMMENT_BULK_MAX_ITEMS}."
+        )
+    defer = _should_defer(settings.ADMISSION_BULK_POLICY)
+
+    results: List[CommentBulkItemResult] = []
+    valid: List[tuple] = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, CommentCreate.model_validate(item)))
+        except ValidationError as e:
+            errors = [{"loc": err["loc"], "msg": err["msg"], "type": err["type"]} for err in e.errors()]
+            results.append(CommentBulkItemResult(index=index, status="invalid", errors=errors))
+
+    existing_products = comment.get_existing_product_ids(session, [c.product_id for _, c in valid])
+    to_create = []
+    for index, comment_in in valid:
+        if comment_in.product_id in existing_products:
+            to_create.append((index, comment_in))
+        else:
+            results.append(CommentBulkItemResult(
+                index=index,
+                status="invalid",
+                errors=[{"loc": ["product_id"], "msg": "Продукт не найден", "type": "not_found"}]
+            ))
+
+    created, queued = comment.create_comments_bulk(
+        session=session,
+        comments_in=[c for _, c in to_create],
+        author=current_user,
+        defer=defer
+    )
+    for (index, _), db_comment in zip(to_create, created):
+        results.append(CommentBulkItemResult(
+            index=index, status="deferred" if defer else "created", id=db_comment.id, queued=queued
+        ))
+
+    results.sort(key=lambda r: r.index)
+    return CommentBulkResult(created=len(created), failed=len(items) - len(created), results=results)
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _stream_export(
+        session: Session,
+        export_format: ExportFormat,
+        product_id: Optional[UUID],
+        moderation_status: Optional[ModerationStatus],
+        since: Optional[datetime],
+        until: Optional[datetime]
+) -> Iterator[str]:
+    # Сессия зависимости закрывается до начала отдачи тела ответа,
+    # поэтому курсор открывается в собственной сессии на том же движке.
+    with Session(session.get_bind()) as export_session:
+        batches = comment.iter_comments_for_export(
+            session=export_session,
+            product_id=product_id,
+            moderation_status=moderation_status,
+            since=since,
+            until=until,
+            batch_size=settings.COMMENT_EXPORT_BATCH_SIZE
+        )
+        if export_format == ExportFormat.CSV:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(comment.EXPORT_COLUMNS)
+            for rows in batches:
+                for row in rows:
+                    writer.writerow([_export_value(row[column]) for column in comment.EXPORT_COLUMNS])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+        else:
+            for rows in batches:
+                yield "".join(
+                    json.dumps({key: _export_value(value) for key, value in row.items()}, ensure_ascii=False) + "\n"
+                    for row in rows
+                )
+
+
+@comment_router.get(
+    "/export",
+    summary="Потоковая выгрузка комментариев со статусом модерации",
+    dependencies=[Depends(require_role(RoleEnum.ADMIN))]
+)
+def export_comments(
+        export_format: ExportFormat = ExportFormat.NDJSON,
+        product_id: Optional[UUID] = None,
+        moderation_status: Optional[ModerationStatus] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        session: Session = Depends(get_session)
+):
+    """
+    Отдаёт комментарии в формате NDJSON или CSV, читая их из БД пачками,
+    поэтому потребление памяти не зависит от размера выборки. since/until
+    отбирают комментарии, созданные в интервале [since, until).
+    """
+    media_type = "text/csv" if export_format == ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        _stream_export(session, export_format, product_id, moderation_status, since, until),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="comments.{export_format.value}"'}
     )
 
 
@@ -0,0 +1,19 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+
+from common_lib.metrics import collect_metrics
+from common_lib.models.User import RoleEnum
+from common_lib.services.auth.auth_service import require_role
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get(
+    "/",
+    response_model=Dict[str, Dict[str, Any]],
+    summary="Метрики компонентов приложения",
+    dependencies=[Depends(require_role(RoleEnum.ADMIN))]
+)
+def get_metrics():
+    return collect_metrics()
@@ -5,7 +5,7 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from sqlmodel import Session
 
 from common_lib.database.database import get_session
-from common_lib.models.Product import Product, ProductCreate, ProductOutWithComments
+from common_lib.models.Product import Product, ProductCreate, ProductOutWithComments, ProductOutWithStats
 from common_lib.services.crud.product import get_products, get_product, delete_product, create_product
 
 product_router = APIRouter()
@@ -22,14 +22,14 @@ def create_new_product(
 ):
     return create_product(session=session, product_in=product_in)
 
-@product_router.get("/", response_model=List[Product])
+@product_router.get("/", response_model=List[ProductOutWithStats])
 def get_all_products(
     skip: int = 0, limit: int = 10, session: Session = Depends(get_session)
 ):
     return get_products(session=session, skip=skip, limit=limit)
 
 
-@product_router.get("/{product_id}", response_model=Product)
+@product_router.get("/{product_id}", response_model=ProductOutWithStats)
 def get_product_by_id(product_id: UUID, session: Session = Depends(get_session)):
     product = get_product(session=session, product_id=product_id)
     if not product:
@@ -7,9 +7,10 @@ from sqlmodel import Session
 from starlette.responses import Response, RedirectResponse
 from common_lib.database.config import get_settings
 from common_lib.database.database import get_session
-from common_lib.models import User, UserCreate, UserOut
+from common_lib.models import User, UserCreate, UserOut, RoleEnum
 from common_lib.services.crud import user as UserService
 import common_lib.services.auth.auth_service as AuthService
+from common_lib.services.auth.password_pool import PasswordPoolSaturated
 from typing import List, Dict
 import logging
 
@@ -20,6 +21,14 @@ logger = logging.getLogger(__name__)
 user_route = APIRouter()
 
 
+def _password_pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent login attempts, please retry shortly.",
+        headers={"Retry-After": str(settings.PASSWORD_POOL_RETRY_AFTER_SECONDS)},
+    )
+
+
 @user_route.post(
     '/register',
     response_model=UserOut,
@@ -37,9 +46,11 @@ async def register(user_data: UserCreate, session: Session = Depends(get_session
             detail="Email already registered",
         )
     try:
-        created_user = UserService.create_user(session=session, user_in=user_data)
+        created_user = await UserService.create_user_async(session=session, user_in=user_data)
         logger.info(f"User registered successfully: {created_user.email}")
         return UserOut.from_orm(created_user)
+    except PasswordPoolSaturated:
+        raise _password_pool_busy()
     except Exception as e:
         logger.error(f"Error during user registration: {e}", exc_info=True)
         raise HTTPException(
@@ -59,9 +70,12 @@ async def login_for_access_token( response: Response,
     session: Session = Depends(get_session)
 ):
     logger.info(f"Login attempt for user: {form_data.username}")
-    user = UserService.authenticate_user(
-        session=session, email=form_data.username, password=form_data.password
-    )
+    try:
+        user = await UserService.authenticate_user_async(
+            session=session, email=form_data.username, password=form_data.password
+        )
+    except PasswordPoolSaturated:
+        raise _password_pool_busy()
 
     if not user:
         raise HTTPException(
@@ -106,6 +120,28 @@ async def get_user_by_id(
 
     return user
 
+@user_route.put(
+    "/users/{user_id}/role",
+    response_model=UserOut,
+    summary="Change User Role",
+    description="Changes the role of a user. Available to administrators only.",
+    dependencies=[Depends(AuthService.require_role(RoleEnum.ADMIN))]
+)
+async def change_user_role(
+    user_id: UUID,
+    role: RoleEnum,
+    session: Session = Depends(get_session)
+):
+    user = UserService.update_user_role(session=session, user_id=user_id, role=role)
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+
+    return user
+
 @user_route.post(
     '/logout',
     response_model=Dict[str, str],
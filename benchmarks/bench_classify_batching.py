@@ -0,0 +1,105 @@
+"""
+Throughput and tail latency of the classify batcher.
+
+Fires ``--requests`` single-text classifications from ``--concurrency``
+concurrent callers through MicroBatcher, once without batching
+(max_batch_size=1) and once with the configured batch size. By default the
+model is a TF-IDF + LogisticRegression pipeline fitted on synthetic reviews;
+pass ``--model`` to use a real model_artifacts.pkl instead.
+
+Usage (from the repository root):
+    python benchmarks/bench_classify_batching.py --requests 5000 --concurrency 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from common_lib.services.classifier.batcher import MicroBatcher
+
+WORDS = ("great product love quality fast delivery terrible broken waste money recommend "
+         "five stars cheap fake amazing works perfectly disappointed return refund").split()
+
+
+def synthetic_texts(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(8, 60))) for _ in range(count)]
+
+
+def synthetic_predictor() -> Callable[[List[str]], List[int]]:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+
+    texts = synthetic_texts(2000, seed=1)
+    labels = [int("fake" in text) for text in texts]
+    pipeline = make_pipeline(TfidfVectorizer(ngram_range=(1, 2)), LogisticRegression(max_iter=500))
+    pipeline.fit(texts, labels)
+    return lambda batch: pipeline.predict_proba(batch)[:, 1].tolist()
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(round(q / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+async def run(predict: Callable, texts: List[str], concurrency: int,
+              max_batch_size: int, max_wait_ms: float, workers: int) -> Dict[str, float]:
+    batcher = MicroBatcher(predict, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms, workers=workers)
+    await batcher.start()
+    latencies: List[float] = []
+    iterator = iter(texts)
+
+    async def caller():
+        for text in iterator:
+            started = time.perf_counter()
+            await batcher.submit(text)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stats = batcher.stats()
+    await batcher.stop()
+    return {
+        "max_batch_size": max_batch_size,
+        "qps": round(len(texts) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "avg_batch_size": round(stats["avg_batch_size"], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--model", help="path to model_artifacts.pkl")
+    args = parser.parse_args()
+
+    if args.model:
+        from common_lib.services.classifier.model import ReviewClassifier
+        predict = ReviewClassifier(args.model).classify
+    else:
+        predict = synthetic_predictor()
+
+    texts = synthetic_texts(args.requests, seed=2)
+    results = [
+        asyncio.run(run(predict, texts, args.concurrency, 1, 0.0, args.workers)),
+        asyncio.run(run(predict, texts, args.concurrency, args.max_batch_size, args.max_wait_ms, args.workers)),
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Login storm benchmark: logins/sec against latency of concurrent page reads.
+
+Runs the FastAPI app in-process on an in-memory SQLite database and fires
+``--logins`` concurrent logins while a reader keeps requesting the product
+list. Each scenario is run twice: with bcrypt offloaded to the password pool
+(current behaviour) and with bcrypt executed inline on the event loop.
+
+Usage (from the repository root, with the app settings in the environment):
+    python benchmarks/bench_login_storm.py --logins 64 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List
+from unittest.mock import patch
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT_DIR, os.path.join(ROOT_DIR, "app")]
+
+import httpx
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.api import app
+from common_lib.database.database import get_session
+from common_lib.models import UserCreate
+from common_lib.services.crud import user as UserService
+
+EMAIL = "bench@example.com"
+PASSWORD = "bench-password"
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(round(q / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+async def run_scenario(logins: int, concurrency: int) -> Dict[str, float]:
+    transport = httpx.ASGITransport(app=app)
+    read_latencies: List[float] = []
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def reader():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/api/products/")
+                read_latencies.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.005)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        statuses: List[int] = []
+
+        async def login():
+            async with semaphore:
+                response = await client.post("/api/auth/token", data={"username": EMAIL, "password": PASSWORD})
+                statuses.append(response.status_code)
+
+        reader_task = asyncio.create_task(reader())
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await reader_task
+
+    return {
+        "logins": logins,
+        "ok": statuses.count(200),
+        "rejected_503": statuses.count(503),
+        "logins_per_sec": round(logins / elapsed, 2),
+        "read_requests": len(read_latencies),
+        "read_p50_ms": round(statistics.median(read_latencies), 2) if read_latencies else 0.0,
+        "read_p99_ms": round(percentile(read_latencies, 99), 2),
+        "read_max_ms": round(max(read_latencies), 2) if read_latencies else 0.0,
+    }
+
+
+async def inline_verify(plain_password: str, hashed_password: str) -> bool:
+    return UserService.verify_password(plain_password, hashed_password)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        UserService.create_user(session, UserCreate(name="Bench", email=EMAIL, password=PASSWORD))
+
+    def get_session_override():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+
+    results = {"offloaded": asyncio.run(run_scenario(args.logins, args.concurrency))}
+    with patch.object(UserService, "verify_password_async", inline_verify):
+        results["inline"] = asyncio.run(run_scenario(args.logins, args.concurrency))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Per-insert cost of the MinHash-LSH near-duplicate index against pairwise
+comparison of MinHash signatures.
+
+Inserts ``--reviews`` synthetic reviews, of which ``--ring-share`` are
+lightly edited copies of a few templates (a fake-review ring), and reports
+insert latency at several index sizes together with how well the copies
+were clustered.
+
+Usage (from the repository root):
+    python benchmarks/bench_near_duplicates.py --reviews 20000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from common_lib.services.signals.near_duplicates import NearDuplicateIndex
+
+WORDS = ("great product love quality fast delivery terrible broken waste money recommend battery screen "
+         "camera price seller box manual size color fits works perfectly disappointed return refund cheap "
+         "sound light heavy strong weak bright dark soft loud quiet week month year daughter son gift").split()
+SYNONYMS = {"great": "excellent", "love": "adore", "fast": "quick", "recommend": "suggest", "cheap": "inexpensive"}
+
+
+def synthetic_reviews(count: int, ring_share: float, templates: int, seed: int) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    ring_texts = [" ".join(rng.choices(WORDS, k=30)) for _ in range(templates)]
+    reviews = []
+    for i in range(count):
+        if rng.random() < ring_share:
+            template_id = rng.randrange(templates)
+            words = ring_texts[template_id].split()
+            for _ in range(2):
+                position = rng.randrange(len(words))
+                words[position] = SYNONYMS.get(words[position], rng.choice(WORDS))
+            reviews.append((f"ring{template_id}", " ".join(words)))
+        else:
+            reviews.append(("organic", " ".join(rng.choices(WORDS, k=rng.randint(10, 60)))))
+    return reviews
+
+
+def pairwise_insert(matrix: np.ndarray, signature: np.ndarray, threshold: float) -> int:
+    return int(((matrix == signature).mean(axis=1) >= threshold).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reviews", type=int, default=20000)
+    parser.add_argument("--ring-share", type=float, default=0.05)
+    parser.add_argument("--templates", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    reviews = synthetic_reviews(args.reviews, args.ring_share, args.templates, args.seed)
+    index = NearDuplicateIndex(threshold=args.threshold, max_items=args.reviews)
+    checkpoints = {int(args.reviews * share) for share in (0.1, 0.5, 1.0)}
+    lsh: Dict[int, float] = {}
+    pairwise: Dict[int, float] = {}
+    signatures: List[np.ndarray] = []
+    window: List[float] = []
+
+    for i, (_, text) in enumerate(reviews, start=1):
+        started = time.perf_counter()
+        index.insert(str(i), text)
+        window.append(time.perf_counter() - started)
+        signatures.append(index.signature(text))
+        if i in checkpoints:
+            lsh[i] = round(float(np.mean(window[-200:])) * 1e6, 1)
+            matrix = np.stack(signatures)
+            started = time.perf_counter()
+            for probe in signatures[-20:]:
+                pairwise_insert(matrix, probe, args.threshold)
+            pairwise[i] = round((time.perf_counter() - started) / 20 * 1e6, 1)
+
+    ring_ids = {str(i) for i, (source, _) in enumerate(reviews, start=1) if source != "organic"}
+    clustered = {member for cluster in index.clusters(min_size=2) for member in cluster}
+    print(json.dumps({
+        "reviews": args.reviews,
+        "lsh_insert_us_by_index_size": lsh,
+        "pairwise_compare_us_by_index_size": pairwise,
+        "ring_recall": round(len(ring_ids & clustered) / len(ring_ids), 3) if ring_ids else None,
+        "organic_false_clustered": len(clustered - ring_ids),
+        "index": index.stats(),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Per-review cost of TextCleaner.clean_text against the step-by-step cleaning
+it replaced (a translate table rebuilt per call, a regex per method and a
+list pass per token step).
+
+Both variants clean the same ``--reviews`` synthetic reviews (punctuation,
+digits, mixed case, some non-ASCII text) with the training configuration;
+the benchmark fails if any output differs. Pass ``--stopwords`` to include
+stop word removal (needs the NLTK stopwords corpus).
+
+Usage (from the repository root):
+    python benchmarks/bench_text_cleaner.py --reviews 50000
+"""
+import argparse
+import json
+import os
+import random
+import re
+import string
+import sys
+import time
+from typing import Callable, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from common_lib.data.text_cleaner import TextCleaner
+
+WORDS = ("Great product LOVE quality, fast delivery! terrible broken waste of money... recommend "
+         "5 stars 10/10 cheap fake?? amazing works perfectly; disappointed (return) refund $20 "
+         "отлично цена 1500₽ très bien").split()
+METHODS = ['lower', 'remove_punctuation', 'remove_numbers', 'remove_whitespace']
+
+
+def synthetic_reviews(count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return ["  ".join(rng.choices(WORDS, k=rng.randint(8, 80))) for _ in range(count)]
+
+
+def step_by_step(methods: List[str], stop_words: frozenset) -> Callable[[str], str]:
+    def clean(text: str) -> str:
+        if 'lower' in methods:
+            text = text.lower()
+        if 'remove_punctuation' in methods:
+            text = text.translate(str.maketrans('', '', string.punctuation))
+        if 'remove_numbers' in methods:
+            text = re.sub(r'\d+', '', text)
+        if 'remove_whitespace' in methods:
+            text = re.sub(r'\s+', ' ', text).strip()
+        words = text.split()
+        if 'remove_stopwords' in methods:
+            words = [word for word in words if word not in stop_words]
+        return ' '.join(words)
+    return clean
+
+
+def timed(clean: Callable[[str], str], reviews: List[str], repeats: int):
+    best, outputs = float("inf"), []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        outputs = [clean(text) for text in reviews]
+        best = min(best, time.perf_counter() - started)
+    return best, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reviews", type=int, default=50000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--stopwords", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    methods = METHODS + (['remove_stopwords'] if args.stopwords else [])
+    reviews = synthetic_reviews(args.reviews, args.seed)
+    cleaner = TextCleaner(methods=methods)
+
+    baseline_seconds, expected = timed(step_by_step(methods, cleaner._stop_words), reviews, args.repeats)
+    compiled_seconds, actual = timed(cleaner.clean_text, reviews, args.repeats)
+    mismatches = sum(1 for left, right in zip(expected, actual) if left != right)
+    if mismatches:
+        raise SystemExit(f"{mismatches} review(s) cleaned differently")
+
+    print(json.dumps({
+        "reviews": args.reviews,
+        "methods": methods,
+        "step_by_step_us_per_review": round(baseline_seconds / args.reviews * 1e6, 2),
+        "compiled_us_per_review": round(compiled_seconds / args.reviews * 1e6, 2),
+        "speedup": round(baseline_seconds / compiled_seconds, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
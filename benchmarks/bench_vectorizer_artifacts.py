@@ -0,0 +1,106 @@
+"""
+Model artifact size, load time and transform throughput of the 'tfidf'
+vectorizer against the stateless 'hashing' one (with and without streaming
+TF-IDF weighting).
+
+Each variant is a preprocessing pipeline from PreprocessingPipelineBuilder
+followed by LogisticRegression, fitted on ``--reviews`` synthetic reviews
+and saved with joblib like model_artifacts.pkl. Training accuracy is
+reported only to show the variants are comparable. Note that the
+classifier's coefficients grow with ``--n-features`` for the hashing
+variants, just as they grow with the vocabulary for tfidf.
+
+Usage (from the repository root):
+    python benchmarks/bench_vectorizer_artifacts.py --reviews 50000 --ngram-max 2
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import joblib
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from common_lib.data import PreprocessingPipelineBuilder
+
+CLEAN_METHODS = ['lower', 'remove_punctuation', 'remove_numbers', 'remove_whitespace']
+
+
+def synthetic_frame(count: int, vocabulary_size: int, seed: int) -> pd.DataFrame:
+    rng = random.Random(seed)
+    vocabulary = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(vocabulary_size)]
+    # Частоты слов по закону Ципфа, как в реальных отзывах
+    weights = [1.0 / rank for rank in range(1, vocabulary_size + 1)]
+    texts, labels = [], []
+    for _ in range(count):
+        label = rng.randint(0, 1)
+        words = rng.choices(vocabulary, weights=weights, k=rng.randint(8, 60))
+        # Метка слегка зависит от текста, чтобы модели было чему учиться
+        words.append(vocabulary[label])
+        texts.append(" ".join(words))
+        labels.append(label)
+    return pd.DataFrame({"text_": texts, "label": labels})
+
+
+def measure(name: str, frame: pd.DataFrame, options: Dict, directory: str) -> Dict:
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
+    builder = PreprocessingPipelineBuilder(frame)
+    preprocessing = builder.build_text_preprocessing_pipeline("text_", clean_text_methods=CLEAN_METHODS, **options)
+    pipeline = Pipeline([('preprocessing', preprocessing), ('classifier', LogisticRegression(max_iter=200))])
+    started = time.perf_counter()
+    pipeline.fit(frame[["text_"]], frame["label"])
+    fit_seconds = time.perf_counter() - started
+
+    path = os.path.join(directory, f"{name}.pkl")
+    joblib.dump({'full_pipeline': pipeline}, path)
+    started = time.perf_counter()
+    loaded = joblib.load(path)['full_pipeline']
+    load_seconds = time.perf_counter() - started
+
+    sample = frame[["text_"]].head(5000)
+    started = time.perf_counter()
+    loaded.predict(sample)
+    predict_seconds = time.perf_counter() - started
+    return {
+        "artifact_bytes": os.path.getsize(path),
+        "load_ms": round(load_seconds * 1000, 1),
+        "fit_s": round(fit_seconds, 2),
+        "predict_us_per_review": round(predict_seconds / len(sample) * 1e6, 1),
+        "train_accuracy": round(float((loaded.predict(sample) == frame["label"].head(5000)).mean()), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reviews", type=int, default=50000)
+    parser.add_argument("--ngram-max", type=int, default=2)
+    parser.add_argument("--vocabulary", type=int, default=50000)
+    parser.add_argument("--n-features", type=int, default=2 ** 18)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    frame = synthetic_frame(args.reviews, args.vocabulary, args.seed)
+    ngram_range = (1, args.ngram_max)
+    variants: List = [
+        ("tfidf", dict(vectorizer_method='tfidf', ngram_range=ngram_range)),
+        ("hashing", dict(vectorizer_method='hashing', ngram_range=ngram_range, n_features=args.n_features)),
+        ("hashing_idf", dict(vectorizer_method='hashing', use_idf=True, ngram_range=ngram_range,
+                             n_features=args.n_features)),
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        results = {name: measure(name, frame, options, directory) for name, options in variants}
+    print(json.dumps({"reviews": args.reviews, "ngram_range": ngram_range, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Load test of the comment -> moderation path.
+
+Drives the HTTP API with an open-loop arrival schedule and reports
+throughput and latency percentiles for ``POST /api/comments/`` and for the
+end-to-end time until the moderation status is written. End-to-end latency
+is observed by polling ``/api/products/{id}/with-comments`` every
+``--poll-interval`` seconds, so it has that resolution.
+
+Arrival patterns (``--pattern``):
+    steady  Poisson arrivals at ``--rate`` comments/s.
+    burst   ``--rate`` with ``--burst-multiplier`` x spikes of
+            ``--burst-length`` s every ``--burst-every`` s.
+    spam    ``--rate`` of ordinary reviews plus, during the middle third of
+            the run, a campaign of near-duplicate texts from
+            ``--spam-accounts`` accounts at ``--spam-multiplier`` x rate.
+
+Targets:
+    --base-url http://localhost:8080   the docker-compose stack; test users are
+                                       registered, products must already exist.
+    --in-process                       the app on a temporary SQLite database with
+                                       the in-process task transport and a
+                                       stand-in scorer that takes
+                                       ``--stand-in-scoring-ms`` per text.
+
+The run is reproducible for a given ``--seed``. Results are printed as JSON
+and written to ``--output`` when given, so runs can be compared.
+
+Usage (from the repository root, with the app settings in the environment):
+    python benchmarks/loadtest.py --in-process --pattern burst --duration 20 --rate 50
+    python benchmarks/loadtest.py --base-url http://localhost:8080 --pattern spam --output spam.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from typing import Dict, List, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT_DIR, os.path.join(ROOT_DIR, "app")]
+
+import httpx
+
+PASSWORD = "loadtest-password"
+MODERATED = {"approved", "rejected"}
+
+OPENERS = ["I bought this", "Got it last week", "Ordered for my family", "Second purchase",
+           "Received yesterday", "Using it for a month"]
+OPINIONS = ["and it works perfectly", "but the battery is weak", "and the quality is great",
+            "but delivery took too long", "and it was worth every penny", "but it broke after a week",
+            "and the screen is bright", "but support never answered"]
+CLOSERS = ["Would recommend.", "Not sure I'd buy again.", "Five stars.", "Returned it.",
+           "Good value for money.", "Expected more."]
+SPAM_TEMPLATES = ["BEST DEAL!!! {n}% off, visit cheap-store-{n}.example now",
+                  "Amazing amazing amazing product, buy now at promo{n}.example!!!",
+                  "Click here for free gift card {n} -> giftcards.example"]
+
+
+def review_text(rng: random.Random) -> str:
+    return f"{rng.choice(OPENERS)} {rng.choice(OPINIONS)}. {rng.choice(CLOSERS)}"
+
+
+def spam_text(rng: random.Random) -> str:
+    return rng.choice(SPAM_TEMPLATES).format(n=rng.randint(10, 99))
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(round(q / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def summarize(latencies_ms: List[float], elapsed: float) -> Dict[str, float]:
+    return {
+        "count": len(latencies_ms),
+        "throughput_per_sec": round(len(latencies_ms) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+        "max_ms": round(max(latencies_ms), 2) if latencies_ms else 0.0,
+    }
+
+
+def poisson_arrivals(rng: random.Random, rate: float, start: float, end: float) -> List[float]:
+    arrivals = []
+    t = start
+    while rate > 0:
+        t += rng.expovariate(rate)
+        if t >= end:
+            break
+        arrivals.append(t)
+    return arrivals
+
+
+def build_schedule(args, rng: random.Random) -> List[Tuple[float, str]]:
+    """Returns (offset in seconds, kind) pairs, kind is "review" or "spam"."""
+    schedule = [(t, "review") for t in poisson_arrivals(rng, args.rate, 0.0, args.duration)]
+    if args.pattern == "burst":
+        window = 0.0
+        while window < args.duration:
+            burst_start = window + args.burst_every - args.burst_length
+            burst_end = min(window + args.burst_every, args.duration)
+            extra_rate = args.rate * (args.burst_multiplier - 1)
+            schedule += [(t, "review") for t in poisson_arrivals(rng, extra_rate, burst_start, burst_end)]
+            window += args.burst_every
+    elif args.pattern == "spam":
+        third = args.duration / 3
+        schedule += [(t, "spam") for t in poisson_arrivals(rng, args.rate * args.spam_multiplier, third, 2 * third)]
+    return sorted(schedule)
+
+
+def stand_in_scorer(scoring_ms: float):
+    """Fixed-latency replacement for the model: texts that look like spam get label 0 (rejected)."""
+    def predict_label(text: str) -> int:
+        time.sleep(scoring_ms / 1000)
+        return 0 if any(marker in text for marker in ("!!!", ".example")) else 1
+    return predict_label
+
+
+async def login(client: httpx.AsyncClient, email: str) -> Dict[str, str]:
+    response = await client.post("/api/auth/register", json={"name": "Load Test", "email": email, "password": PASSWORD})
+    if response.status_code not in (201, 409):
+        response.raise_for_status()
+    response = await client.post("/api/auth/token", data={"username": email, "password": PASSWORD})
+    response.raise_for_status()
+    # Cookie выставляется с флагом Secure, поэтому передаём его явно и по http
+    return {"Cookie": response.headers["set-cookie"].split(";", 1)[0]}
+
+
+async def run_load(client: httpx.AsyncClient, args) -> Dict:
+    rng = random.Random(args.seed)
+    run_id = uuid.uuid4().hex[:8]
+    products = [p["id"] for p in (await client.get("/api/products/")).json()]
+    if not products:
+        raise SystemExit("No products found; run `python -m common_lib.database.manage init-db` first")
+
+    accounts = [await login(client, f"loadtest-{run_id}-{i}@example.com") for i in range(args.accounts)]
+    spammers = [await login(client, f"spam-{run_id}-{i}@example.com") for i in range(args.spam_accounts)]
+    schedule = build_schedule(args, rng)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    create_latencies: Dict[str, List[float]] = {"review": [], "spam": []}
+    status_counts: Dict[str, int] = {}
+    sent_at: Dict[str, float] = {}
+    moderation_latencies: List[float] = []
+    late_starts = 0
+
+    async def send(offset: float, kind: str, started: float):
+        nonlocal late_starts
+        text = spam_text(rng) if kind == "spam" else review_text(rng)
+        headers = rng.choice(spammers if kind == "spam" else accounts)
+        payload = {"product_id": rng.choice(products), "text": text, "rating": rng.randint(1, 5)}
+        async with semaphore:
+            if time.perf_counter() - started - offset > 0.1:
+                late_starts += 1
+            request_started = time.perf_counter()
+            try:
+                response = await client.post("/api/comments/", json=payload, headers=headers)
+                key = str(response.status_code)
+            except httpx.HTTPError as e:
+                response, key = None, type(e).__name__
+            status_counts[key] = status_counts.get(key, 0) + 1
+            if response is not None and response.status_code == 201:
+                create_latencies[kind].append((time.perf_counter() - request_started) * 1000)
+                sent_at[response.json()["id"]] = request_started
+
+    async def poll_moderation(stop: asyncio.Event):
+        seen = set()
+        while True:
+            for product_id in products:
+                response = await client.get(f"/api/products/{product_id}/with-comments")
+                now = time.perf_counter()
+                for item in response.json().get("comments", []):
+                    comment_id = item["id"]
+                    if comment_id in sent_at and comment_id not in seen and item["moderation_status"] in MODERATED:
+                        seen.add(comment_id)
+                        moderation_latencies.append((now - sent_at[comment_id]) * 1000)
+            if stop.is_set() and len(seen) >= len(sent_at):
+                return
+            await asyncio.sleep(args.poll_interval)
+
+    stop_polling = asyncio.Event()
+    poller = asyncio.create_task(poll_moderation(stop_polling))
+    started = time.perf_counter()
+    in_flight = []
+    for offset, kind in schedule:
+        delay = started + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        in_flight.append(asyncio.create_task(send(offset, kind, started)))
+    await asyncio.gather(*in_flight)
+    load_elapsed = time.perf_counter() - started
+
+    stop_polling.set()
+    try:
+        await asyncio.wait_for(poller, timeout=args.drain_timeout)
+    except asyncio.TimeoutError:
+        pass
+    total_elapsed = time.perf_counter() - started
+
+    all_created = create_latencies["review"] + create_latencies["spam"]
+    return {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "scheduled": len(schedule),
+        "late_starts": late_starts,
+        "status_counts": status_counts,
+        "comment_create": summarize(all_created, load_elapsed),
+        "comment_create_by_kind": {kind: summarize(values, load_elapsed) for kind, values in create_latencies.items()
+                                   if values},
+        "moderation_e2e": {
+            **summarize(moderation_latencies, total_elapsed),
+            "pending": len(sent_at) - len(moderation_latencies),
+            "resolution_ms": args.poll_interval * 1000,
+        },
+    }
+
+
+async def run_remote(args) -> Dict:
+    limits = httpx.Limits(max_connections=args.concurrency + 2)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        return await run_load(client, args)
+
+
+def run_in_process(args) -> Dict:
+    from sqlmodel import SQLModel, Session, create_engine
+
+    from app.api import app
+    from common_lib.database.database import get_session
+    from common_lib.services.crud.product import ensure_products
+    from common_lib.services.moderation import ModerationProcessor
+    from common_lib.services.transport.inprocess import InProcessTransport
+    from common_lib.services.transport.registry import set_transport
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'loadtest.db')}",
+                               connect_args={"check_same_thread": False, "timeout": 30})
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            ensure_products(session)
+
+        def get_session_override():
+            with Session(engine) as session:
+                yield session
+
+        processor = ModerationProcessor(stand_in_scorer(args.stand_in_scoring_ms),
+                                        session_factory=lambda: Session(engine), summary_every=0)
+        transport = InProcessTransport(processor.handle, workers=args.stand_in_workers)
+
+        async def run():
+            await transport.start()
+            try:
+                transport_client = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport_client, base_url="http://loadtest",
+                                             timeout=args.timeout) as client:
+                    report = await run_load(client, args)
+            finally:
+                await transport.stop()
+            report["transport"] = transport.stats()
+            return report
+
+        app.dependency_overrides[get_session] = get_session_override
+        set_transport(transport)
+        try:
+            return asyncio.run(run())
+        finally:
+            set_transport(None)
+            app.dependency_overrides.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--base-url", help="URL of a running stack, e.g. http://localhost:8080")
+    target.add_argument("--in-process", action="store_true", help="run the app in-process on SQLite")
+    parser.add_argument("--pattern", choices=["steady", "burst", "spam"], default="steady")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--rate", type=float, default=20.0, help="ordinary comments per second")
+    parser.add_argument("--concurrency", type=int, default=32, help="max requests in flight")
+    parser.add_argument("--accounts", type=int, default=10)
+    parser.add_argument("--burst-every", type=float, default=10.0)
+    parser.add_argument("--burst-length", type=float, default=2.0)
+    parser.add_argument("--burst-multiplier", type=float, default=5.0)
+    parser.add_argument("--spam-accounts", type=int, default=3)
+    parser.add_argument("--spam-multiplier", type=float, default=4.0)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--drain-timeout", type=float, default=60.0,
+                        help="how long to wait for pending moderation after the load ends")
+    parser.add_argument("--stand-in-scoring-ms", type=float, default=5.0)
+    parser.add_argument("--stand-in-workers", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=30.0, help="HTTP timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_in_process(args) if args.in_process else asyncio.run(run_remote(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,95 @@
+import hashlib
+import json
 import logging
 import os
 import shutil
+from typing import Callable, List, Optional, Sequence
+
 import pandas as pd
 import kagglehub
 
+CACHE_SUFFIX = ".parquet"
+CACHE_FORMAT_VERSION = 1
+_SOURCE_METADATA_KEY = b"review_moderation.source"
+DEFAULT_CATEGORY_COLUMNS = ("category", "label")
+DEFAULT_RATING_COLUMN = "rating"
+MANIFEST_FILENAME = "manifest.json"
+_HASH_BLOCK_SIZE = 1 << 20
+
+DownloadFn = Callable[[str, bool], str]
+
+
+def kaggle_download(link: str, force: bool = False) -> str:
+    """Downloads a dataset into the kagglehub cache and returns its directory."""
+    return kagglehub.dataset_download(link, force_download=force)
+
+
+def local_directory_download(root: str) -> DownloadFn:
+    """
+    A download function that serves ``<root>/<owner>/<dataset>`` instead of
+    Kaggle, for tests and air-gapped environments.
+    """
+    def download(link: str, force: bool = False) -> str:
+        path = os.path.join(root, *link.split('/'))
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"Dataset '{link}' not found in '{root}'")
+        return path
+    return download
+
+
+def _sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_json_atomic(path, data) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _import_pyarrow():
+    """pyarrow is optional: without it the loader always parses the CSV."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow, pyarrow.parquet
+    except ImportError:
+        return None
+
 
 class DataLoader:
     """
     Class for loading data from open sources
+
+    Datasets are fetched with ``download_fn(link, force)`` (Kaggle by
+    default) and copied through temp files; a manifest with the size and
+    SHA-256 of every file is written once all of them are copied. A local
+    copy is reused only if it matches the manifest; otherwise the dataset is
+    copied again, and downloaded again (``force``) if the copy still fails.
+
+    The first load of a CSV writes a Parquet cache next to it (if pyarrow is
+    installed). Later loads read the cache, optionally only some columns and
+    memory-mapped. The cache records the size and modification time of the
+    CSV and the dtype settings and is rebuilt when they change.
+
+    Dtypes are set while parsing, so a frame has the same dtypes whether it
+    came from the cache or from the CSV: the columns in ``category_columns``
+    (product category and label by default) become categories and
+    ``rating_column`` becomes int8 (nullable Int8 if it has gaps). Review
+    text is never converted.
     """
 
-    def __init__(self):
+    def __init__(self, download_fn: DownloadFn = kaggle_download,
+                 category_columns: Sequence[str] = DEFAULT_CATEGORY_COLUMNS,
+                 rating_column: Optional[str] = DEFAULT_RATING_COLUMN):
+        self.download_fn = download_fn
+        self.category_columns = tuple(category_columns)
+        self.rating_column = rating_column
         self.__data_path = os.path.join("../", "data")
         os.makedirs(self.__data_path, exist_ok=True)
 
@@ -22,32 +101,139 @@ class DataLoader:
     def data_path(self, value):
         self.__data_path = value
 
-    @staticmethod
-    def __download_kaggle_dataset(link, res_dir):
+    def __copy_verified(self, src, dst) -> dict:
+        """Copies through a temp file, hashing on the way; the target appears only when complete."""
+        tmp = f"{dst}.part"
+        digest = hashlib.sha256()
+        try:
+            with open(src, "rb") as source, open(tmp, "wb") as target:
+                for block in iter(lambda: source.read(_HASH_BLOCK_SIZE), b""):
+                    digest.update(block)
+                    target.write(block)
+            size = os.path.getsize(tmp)
+            if size != os.path.getsize(src):
+                raise IOError(f"Copied {size} bytes of '{src}', expected {os.path.getsize(src)}")
+            shutil.copystat(src, tmp)
+            os.replace(tmp, dst)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        stat = os.stat(dst)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest.hexdigest()}
+
+    def __download_kaggle_dataset(self, link, res_dir, force: bool = False) -> Optional[dict]:
         try:
-            dataset_path = kagglehub.dataset_download(link, force_download=True)
-            for filename in os.listdir(dataset_path):
-                src = os.path.join(dataset_path, filename)
-                dst = os.path.join(res_dir, filename)
-                shutil.copy2(src, dst)
+            dataset_path = self.download_fn(link, force)
+            files = {}
+            for root, _, filenames in os.walk(dataset_path):
+                for filename in filenames:
+                    src = os.path.join(root, filename)
+                    name = os.path.relpath(src, dataset_path)
+                    dst = os.path.join(res_dir, name)
+                    os.makedirs(os.path.dirname(dst), exist_ok=True)
+                    files[name] = self.__copy_verified(src, dst)
+            manifest = {"link": link, "files": files}
+            _write_json_atomic(os.path.join(res_dir, MANIFEST_FILENAME), manifest)
+            return manifest
         except Exception as e:
             logging.error(e)
+            return None
 
     @staticmethod
-    def __download_kaggle_file(link, filename, filepath):
+    def _file_is_verified(path, entry: dict) -> bool:
+        """Size must match; the hash is recomputed only if the modification time changed."""
+        if not os.path.isfile(path):
+            return False
+        stat = os.stat(path)
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        return _sha256(path) == entry["sha256"]
+
+    def verify_local_copy(self, res_dir, filename) -> bool:
+        """True if ``filename`` is listed in the dataset manifest and matches it."""
+        manifest_path = os.path.join(res_dir, MANIFEST_FILENAME)
+        if not os.path.isfile(manifest_path):
+            return False
         try:
-            dataset_path = kagglehub.dataset_download(link, path=filename, force_download=True)
-            if not os.path.isfile(dataset_path):
-                logging.error(f"File '{filename}' not found in '{dataset_path}'."
-                              f"Directory files: {os.listdir(dataset_path)}")
-                return
-            shutil.copy2(dataset_path, filepath)
-        except Exception as e:
-            logging.error(e)
+            with open(manifest_path, encoding="utf-8") as f:
+                entry = json.load(f)["files"].get(filename)
+        except (OSError, ValueError, KeyError) as e:
+            logging.error(f"Unreadable dataset manifest {manifest_path}: {e}")
+            return False
+        return entry is not None and self._file_is_verified(os.path.join(res_dir, filename), entry)
+
+    def __load_data(self, filepath, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        dtype = {column: 'category' for column in self.category_columns}
+        df = pd.read_csv(filepath, quotechar='"', encoding='utf-8', encoding_errors='replace', usecols=columns,
+                         dtype=dtype)
+        if self.rating_column in df.columns:
+            df[self.rating_column] = self._compact_ratings(df[self.rating_column], self.rating_column)
+        return df
 
     @staticmethod
-    def __load_data(filepath) -> pd.DataFrame:
-        return pd.read_csv(filepath, quotechar='"', encoding='utf-8', encoding_errors='replace')
+    def _compact_ratings(series: pd.Series, name: str) -> pd.Series:
+        """Ratings 1-5 fit in int8; a column with gaps becomes nullable Int8."""
+        if not pd.api.types.is_numeric_dtype(series):
+            return series
+        values = series.dropna()
+        if not (values % 1 == 0).all() or values.min() < -128 or values.max() > 127:
+            logging.warning(f"Column '{name}' is not a small integral rating, keeping {series.dtype}")
+            return series
+        return series.astype('Int8' if series.isna().any() else 'int8')
+
+    def _source_signature(self, filepath) -> dict:
+        stat = os.stat(filepath)
+        return {"version": CACHE_FORMAT_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                "category_columns": sorted(self.category_columns), "rating_column": self.rating_column}
+
+    def __read_cache(self, cache_path, filepath, columns, memory_map) -> Optional[pd.DataFrame]:
+        if not os.path.isfile(cache_path):
+            return None
+        _, pq = _import_pyarrow()
+        try:
+            metadata = pq.read_schema(cache_path, memory_map=memory_map).metadata or {}
+            if json.loads(metadata.get(_SOURCE_METADATA_KEY, b"{}")) != self._source_signature(filepath):
+                logging.info(f"Parquet cache {cache_path} is stale, rebuilding it")
+                return None
+            return pq.read_table(cache_path, columns=columns, memory_map=memory_map).to_pandas()
+        except Exception as e:
+            logging.error(f"Failed to read parquet cache {cache_path}: {e}")
+            return None
+
+    def __write_cache(self, df: pd.DataFrame, cache_path, filepath) -> None:
+        pa, pq = _import_pyarrow()
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_SOURCE_METADATA_KEY] = json.dumps(self._source_signature(filepath)).encode()
+        tmp_path = f"{cache_path}.tmp"
+        try:
+            pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logging.error(f"Failed to write parquet cache {cache_path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def load_csv(self, filepath, columns: Optional[List[str]] = None, use_cache: bool = True,
+                 memory_map: bool = False) -> pd.DataFrame:
+        """
+        Loads a CSV through its Parquet cache. ``columns`` limits what is
+        read; ``memory_map`` maps the cache file instead of reading it.
+        """
+        if not use_cache:
+            return self.__load_data(filepath, columns)
+        if _import_pyarrow() is None:
+            logging.info("pyarrow is not installed, the CSV will be parsed on every load")
+            return self.__load_data(filepath, columns)
+        cache_path = filepath + CACHE_SUFFIX
+        df = self.__read_cache(cache_path, filepath, columns, memory_map)
+        if df is not None:
+            return df
+        df = self.__load_data(filepath)
+        self.__write_cache(df, cache_path, filepath)
+        return df[columns] if columns is not None else df
 
     def __prepare_paths_and_dirs(self, link, filename) -> tuple[str, str]:
         res_dir = os.path.join(self.__data_path, *link.split('/'))
@@ -55,13 +241,16 @@ class DataLoader:
         filepath = os.path.join(res_dir, filename)
         return res_dir, filepath
 
-    def load_from_kaggle(self, link, filename) -> pd.DataFrame:
+    def load_from_kaggle(self, link, filename, columns: Optional[List[str]] = None, use_cache: bool = True,
+                         memory_map: bool = False) -> pd.DataFrame:
         res_dir, filepath = self.__prepare_paths_and_dirs(link, filename)
         print(filepath)
-        if not os.path.isfile(filepath):
-            self.__download_kaggle_dataset(link, res_dir)
-        #    self.__download_kaggle_file(link, filename, filepath)
-        return self.__load_data(filepath)
+        if not self.verify_local_copy(res_dir, filename):
+            manifest = self.__download_kaggle_dataset(link, res_dir)
+            if manifest is None or filename not in manifest["files"]:
+                logging.warning(f"'{filename}' was not verified after download, forcing a fresh download")
+                self.__download_kaggle_dataset(link, res_dir, force=True)
+        return self.load_csv(filepath, columns=columns, use_cache=use_cache, memory_map=memory_map)
 
 
 if __name__ == "__main__":
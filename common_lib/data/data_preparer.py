@@ -3,12 +3,16 @@ import string
 from typing import Optional, List, Any, Union, Dict
 import pandas as pd
 from pandas import DataFrame
-from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer
+from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer, HashingVectorizer
+from sklearn.pipeline import Pipeline
 
 from common_lib.classes.data_processor import DataProcessor
 from common_lib.data import DataLoader
 
 from common_lib.data.text_cleaner import TextCleaner
+from common_lib.text_transformers.streaming_tfidf_transformer import StreamingTfidfTransformer
+
+_TFIDF_WEIGHTING_OPTIONS = ('norm', 'smooth_idf', 'sublinear_tf')
 
 
 class DataPreparer(DataProcessor):
@@ -46,6 +50,12 @@ class DataPreparer(DataProcessor):
 
     def __fill_missing_values(self, cols_to_process: Optional[List[str]] = None, fill_value: Any = None) -> None:
         if cols_to_process and fill_value is not None:
+            for col in cols_to_process:
+                # В категориальную колонку можно записать только известную категорию
+                value = fill_value.get(col) if isinstance(fill_value, dict) else fill_value
+                if isinstance(self._df[col].dtype, pd.CategoricalDtype) and value is not None \
+                        and value not in self._df[col].cat.categories:
+                    self._df[col] = self._df[col].cat.add_categories([value])
             self._df[cols_to_process] = self._df[cols_to_process].fillna(fill_value)
 
     def handle_missing_values(self,
@@ -80,7 +90,7 @@ class DataPreparer(DataProcessor):
 
     def clean_text_column(self, text_column: str, methods: Optional[List[str]] = None,
                           stop_words_lang: Optional[str] = 'english', lemmatize: bool = False,
-                          stem: bool = False) -> 'DataPreparer':
+                          stem: bool = False, n_jobs: int = 1, chunk_size: int = 10000) -> 'DataPreparer':
         self._validate_column_exists(text_column)
         text_cleaner = TextCleaner(
             methods=methods,
@@ -88,18 +98,35 @@ class DataPreparer(DataProcessor):
             lemmatize=lemmatize,
             stem=stem
         )
-        self._df[text_column] = text_cleaner.clean_series(self._df[text_column])
+        self._df[text_column] = text_cleaner.clean_series(self._df[text_column], n_jobs=n_jobs, chunk_size=chunk_size)
         return self
 
     @staticmethod
     def _create_vectorizer(method: str, **kwargs):
-        """Create vectorizer using the same logic as create_text_features method."""
+        """
+        Create vectorizer using the same logic as create_text_features method.
+
+        'hashing' is a stateless HashingVectorizer (``n_features`` columns, no
+        vocabulary to fit or pickle, safe to transform in parallel). With
+        ``use_idf=True`` its counts are weighted by a StreamingTfidfTransformer,
+        which takes ``norm``, ``smooth_idf`` and ``sublinear_tf``.
+        """
         if method == 'tfidf':
             return TfidfVectorizer(**kwargs)
         elif method == 'count':
             return CountVectorizer(**kwargs)
+        elif method == 'hashing':
+            if not kwargs.pop('use_idf', False):
+                return HashingVectorizer(**kwargs)
+            weighting = {key: kwargs.pop(key) for key in _TFIDF_WEIGHTING_OPTIONS if key in kwargs}
+            kwargs.setdefault('alternate_sign', False)
+            return Pipeline([
+                ('hashing', HashingVectorizer(norm=None, **kwargs)),
+                ('tfidf', StreamingTfidfTransformer(**weighting))
+            ])
         else:
-            raise ValueError(f"Vectorization method '{method}' is not supported. Choose from 'tfidf', 'count'.")
+            raise ValueError(f"Vectorization method '{method}' is not supported. "
+                             f"Choose from 'tfidf', 'count', 'hashing'.")
 
     def create_text_features(self,
                              text_column: str,
@@ -165,7 +192,8 @@ class DataPreparer(DataProcessor):
                    clean_text_methods: Optional[List[str]] = None,
                    clean_text_stopwords_lang: Optional[str] = 'english',
                    clean_text_lemmatize: bool = False,
-                   clean_text_stem: bool = False
+                   clean_text_stem: bool = False,
+                   clean_text_n_jobs: int = 1
                    ) -> 'DataPreparer':
         print("Starting data preparation...")
         print(f"Handling missing values using strategy: '{handle_missing_strategy}'...")
@@ -193,7 +221,8 @@ class DataPreparer(DataProcessor):
                 methods=clean_text_methods,
                 stop_words_lang=clean_text_stopwords_lang,
                 lemmatize=clean_text_lemmatize,
-                stem=clean_text_stem
+                stem=clean_text_stem,
+                n_jobs=clean_text_n_jobs
             )
             print(f"Text cleaning applied to '{clean_text_col}'.")
         print("Data preparation complete.")
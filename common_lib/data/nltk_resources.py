@@ -0,0 +1,60 @@
+"""
+Offline access to the NLTK corpora used by TextCleaner.
+
+Corpora are never downloaded at runtime: they are vendored into the image at
+build time (``python -m common_lib.data.nltk_resources /usr/share/nltk_data``)
+and looked up lazily on first use. Set NLTK_ALLOW_DOWNLOAD=1 to restore the
+old download-on-demand behaviour in a development environment.
+"""
+import logging
+import os
+import sys
+from typing import Iterable
+
+import nltk
+
+logger = logging.getLogger(__name__)
+
+RESOURCES = {
+    "stopwords": "corpora/stopwords",
+    "wordnet": "corpora/wordnet",
+    "omw-1.4": "corpora/omw-1.4",
+}
+
+
+def _download_allowed() -> bool:
+    return os.getenv("NLTK_ALLOW_DOWNLOAD", "0").lower() in ("1", "true", "yes")
+
+
+def require_resource(name: str) -> None:
+    """
+    Makes sure an NLTK resource is available locally. Raises LookupError with
+    vendoring instructions instead of reaching out to the network.
+    """
+    path = RESOURCES[name]
+    try:
+        nltk.data.find(path)
+        return
+    except LookupError:
+        if not _download_allowed():
+            raise LookupError(
+                f"NLTK resource '{name}' is not installed and runtime downloads are disabled. "
+                f"Vendor it with `python -m common_lib.data.nltk_resources <dir>` and point NLTK_DATA "
+                f"at that directory, or set NLTK_ALLOW_DOWNLOAD=1."
+            ) from None
+    logger.info(f"Downloading NLTK resource '{name}'")
+    if not nltk.download(name, quiet=True):
+        raise LookupError(f"Failed to download NLTK resource '{name}'")
+
+
+def vendor_resources(target_dir: str, names: Iterable[str] = tuple(RESOURCES)) -> None:
+    os.makedirs(target_dir, exist_ok=True)
+    for name in names:
+        if not nltk.download(name, download_dir=target_dir, quiet=True):
+            raise RuntimeError(f"Failed to download NLTK resource '{name}' into {target_dir}")
+        logger.info(f"Vendored NLTK resource '{name}' into {target_dir}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    vendor_resources(sys.argv[1] if len(sys.argv) > 1 else "nltk_data")
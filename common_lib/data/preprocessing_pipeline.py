@@ -4,8 +4,12 @@ import pandas as pd
 from sklearn.pipeline import Pipeline
 
 from common_lib.data import DataPreparer
+from common_lib.text_transformers.column_selector import ColumnSelector
+from common_lib.text_transformers.text_cleaner_analyzer import TextCleanerAnalyzer
 from common_lib.text_transformers.text_cleaner_transformer import TextCleanerTransformer
 
+_FUSED_CONFLICTS = ('analyzer', 'tokenizer', 'preprocessor', 'token_pattern', 'stop_words')
+
 
 class PreprocessingPipelineBuilder(DataPreparer):
     """
@@ -22,19 +26,49 @@ class PreprocessingPipelineBuilder(DataPreparer):
                                           clean_text_stopwords_lang: Optional[str] = 'english',
                                           clean_text_lemmatize: bool = False,
                                           clean_text_stem: bool = False,
+                                          clean_text_n_jobs: int = 1,
+                                          fused_analyzer: bool = False,
                                           **vectorizer_kwargs: Any
                                           ) -> Pipeline:
-
+        """
+        Builds ``text_cleaner -> vectorizer``. With ``fused_analyzer=True`` the
+        cleaner runs inside the vectorizer as its analyzer instead
+        (``column_selector -> vectorizer``): no cleaned-string copy of the
+        corpus is built and the text is tokenized once. ``ngram_range`` and
+        ``lowercase`` are then handled by the analyzer, and
+        ``clean_text_n_jobs`` does not apply.
+        """
         self._validate_column_exists(text_column)
 
         print(f"\nBuilding text preprocessing pipeline for column '{text_column}'...")
 
+        if fused_analyzer:
+            conflicts = [option for option in _FUSED_CONFLICTS if option in vectorizer_kwargs]
+            if conflicts:
+                raise ValueError(f"Options {conflicts} cannot be combined with fused_analyzer=True.")
+            analyzer = TextCleanerAnalyzer(
+                methods=clean_text_methods,
+                stop_words_lang=clean_text_stopwords_lang,
+                lemmatize=clean_text_lemmatize,
+                stem=clean_text_stem,
+                ngram_range=vectorizer_kwargs.pop('ngram_range', (1, 1)),
+                lowercase=vectorizer_kwargs.pop('lowercase', True)
+            )
+            vectorizer = self._create_vectorizer(vectorizer_method, analyzer=analyzer, **vectorizer_kwargs)
+            self.vectorizer = vectorizer
+            print("Fused text preprocessing pipeline built.")
+            return Pipeline([
+                ('column_selector', ColumnSelector(text_column)),
+                ('vectorizer', vectorizer)
+            ])
+
         text_cleaner = TextCleanerTransformer(
             text_column=text_column,
             methods=clean_text_methods,
             stop_words_lang=clean_text_stopwords_lang,
             lemmatize=clean_text_lemmatize,
-            stem=clean_text_stem
+            stem=clean_text_stem,
+            n_jobs=clean_text_n_jobs
         )
 
         vectorizer = self._create_vectorizer(vectorizer_method, **vectorizer_kwargs)
@@ -48,3 +82,26 @@ class PreprocessingPipelineBuilder(DataPreparer):
 
         print("Text preprocessing pipeline built.")
         return preprocessing_pipeline
+
+    @staticmethod
+    def warm_token_cache(pipeline: Pipeline) -> int:
+        """
+        Seeds the lemma/stem caches of every TextCleanerTransformer (or fused
+        TextCleanerAnalyzer) in a fitted pipeline with the vocabulary of the
+        vectorizer that follows (or contains) it.
+        Call it before saving the model artifact so workers load a warm cache.
+        """
+        added = 0
+        cleaner = None
+        for _, step in pipeline.steps:
+            if isinstance(step, Pipeline):
+                added += PreprocessingPipelineBuilder.warm_token_cache(step)
+            elif isinstance(step, TextCleanerTransformer):
+                cleaner = step
+            elif isinstance(getattr(step, 'analyzer', None), TextCleanerAnalyzer) and hasattr(step, 'vocabulary_'):
+                added += step.analyzer.seed_token_cache(step.vocabulary_)
+            elif cleaner is not None and hasattr(step, 'vocabulary_'):
+                added += cleaner.seed_token_cache(step.vocabulary_)
+                cleaner = None
+        print(f"Token cache seeded with {added} entries.")
+        return added
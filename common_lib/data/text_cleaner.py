@@ -1,80 +1,182 @@
+import os
 import re
 import string
-from typing import Optional, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
 
 import pandas as pd
-import nltk
-from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer, PorterStemmer
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
-try:
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('wordnet')
-try:
-    nltk.data.find('corpora/omw-1.4')
-except LookupError:
-    nltk.download('omw-1.4')
+from common_lib.data.nltk_resources import require_resource
+from common_lib.data.token_cache import TokenCache
+
+
+_NON_ASCII_DIGITS = re.compile(r'\d+')
+
+_worker_cleaner: Optional['TextCleaner'] = None
+
+
+def _init_worker(cleaner: 'TextCleaner') -> None:
+    # Очиститель передаётся один раз на процесс вместе со стоп-словами и кэшами
+    global _worker_cleaner
+    _worker_cleaner = cleaner
+
+
+def _clean_chunk(texts: List[Any]) -> List[str]:
+    return [_worker_cleaner.clean_text(text) for text in texts]
 
 
 class TextCleaner:
+    """
+    Cleans review texts with the configured ``methods``, applied in a fixed
+    order: lower, remove_punctuation, remove_numbers, remove_whitespace,
+    remove_stopwords, then lemmatization and stemming.
+
+    The methods are compiled once into a plan: punctuation and ASCII digits
+    are deleted by a single ``str.translate`` table, the digit regex only runs
+    for non-ASCII texts (other Unicode digits), and stop word filtering,
+    lemmatization and stemming share one pass over the tokens. Whitespace
+    normalization needs no step of its own because tokens are split on any
+    whitespace run anyway.
+
+    Lemmas and stems are memoized per token in bounded caches of
+    ``token_cache_size`` entries each (0 disables them); the caches are
+    pickled with the cleaner and can be pre-seeded with ``seed_token_cache``.
+    """
+
     def __init__(self, methods: Optional[List[str]] = None,
                  stop_words_lang: Optional[str] = 'english',
-                 lemmatize: bool = False, stem: bool = False):
+                 lemmatize: bool = False, stem: bool = False, token_cache_size: int = 100000):
         self.methods = methods if methods is not None else []
         self.stop_words_lang = stop_words_lang
         self.lemmatize = lemmatize
         self.stem = stem
 
-        self._lemmatizer = WordNetLemmatizer()
-        self._stemmer = PorterStemmer()
-        self._stop_words = self._load_stop_words()
-
-    def _load_stop_words(self) -> set:
+        # Лемматизатор и стеммер создаются при первом использовании, поэтому
+        # WordNet не нужен, если lemmatize=False. Стоп-слова вычисляются сразу
+        # и сохраняются вместе с пайплайном в артефакте модели.
+        self._lemmatizer: Optional[WordNetLemmatizer] = None
+        self._stemmer: Optional[PorterStemmer] = None
+        self._stop_words = self._load_stop_words() if 'remove_stopwords' in self.methods else frozenset()
+        self._lemma_cache = TokenCache(token_cache_size)
+        self._stem_cache = TokenCache(token_cache_size)
+        self._compile()
+
+    def _compile(self) -> None:
+        methods = set(self.methods)
+        deleted = ''
+        if 'remove_punctuation' in methods:
+            deleted += string.punctuation
+        if 'remove_numbers' in methods:
+            deleted += string.digits
+        self._lower = 'lower' in methods
+        self._delete_table = str.maketrans('', '', deleted) if deleted else None
+        self._remove_other_digits = 'remove_numbers' in methods
+        self._filter_stop_words = 'remove_stopwords' in methods and bool(self._stop_words)
+        self._per_token = self._filter_stop_words or self.lemmatize or self.stem
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in ('_lower', '_delete_table', '_remove_other_digits', '_filter_stop_words', '_per_token'):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        # Артефакты, сохранённые до появления плана, восстанавливаются так же
+        self.__dict__.update(state)
+        self.__dict__.setdefault('_lemmatizer', None)
+        self.__dict__.setdefault('_stemmer', None)
+        self.__dict__.setdefault('_lemma_cache', TokenCache())
+        self.__dict__.setdefault('_stem_cache', TokenCache())
+        self._stop_words = frozenset(self.__dict__.get('_stop_words') or ())
+        self._compile()
+
+    def _load_stop_words(self) -> frozenset:
         if not self.stop_words_lang:
-            return set()
+            return frozenset()
+        require_resource('stopwords')
+        from nltk.corpus import stopwords
         try:
-            return set(stopwords.words(self.stop_words_lang))
+            return frozenset(stopwords.words(self.stop_words_lang))
         except OSError:
             print(
                 f"Warning: Stop words language '{self.stop_words_lang}' not supported or data not downloaded. "
                 f"Using empty stop word list.")
-            return set()
-
-    def clean_text(self, text: str) -> str:
-        if not isinstance(text, str) or pd.isna(text):
-            return ""
+            return frozenset()
 
-        cleaned_text = text
+    def _get_lemmatizer(self) -> WordNetLemmatizer:
+        if self._lemmatizer is None:
+            require_resource('wordnet')
+            self._lemmatizer = WordNetLemmatizer()
+        return self._lemmatizer
 
-        if 'lower' in self.methods:
-            cleaned_text = cleaned_text.lower()
-
-        if 'remove_punctuation' in self.methods:
-            cleaned_text = cleaned_text.translate(str.maketrans('', '', string.punctuation))
-
-        if 'remove_numbers' in self.methods:
-            cleaned_text = re.sub(r'\d+', '', cleaned_text)
-
-        if 'remove_whitespace' in self.methods:
-            cleaned_text = re.sub(r'\s+', ' ', cleaned_text).strip()
-
-        words = cleaned_text.split()
-
-        if 'remove_stopwords' in self.methods:
-            words = [word for word in words if word not in self._stop_words]
+    def _get_stemmer(self) -> PorterStemmer:
+        if self._stemmer is None:
+            self._stemmer = PorterStemmer()
+        return self._stemmer
 
+    def clean_text(self, text: str) -> str:
+        return ' '.join(self.tokens(text))
+
+    def tokens(self, text: str) -> List[str]:
+        """Cleaned tokens of the text, i.e. ``clean_text(text).split()`` without the join."""
+        if not isinstance(text, str):
+            return []
+
+        if self._lower:
+            text = text.lower()
+        if self._delete_table is not None:
+            text = text.translate(self._delete_table)
+        if self._remove_other_digits and not text.isascii():
+            text = _NON_ASCII_DIGITS.sub('', text)
+
+        words = text.split()
+        if not self._per_token:
+            return words
+
+        if self._filter_stop_words:
+            stop_words = self._stop_words
+            words = [word for word in words if word not in stop_words]
         if self.lemmatize:
-            words = [self._lemmatizer.lemmatize(word) for word in words]
-
+            words = self._lemma_cache.map(words, self._get_lemmatizer().lemmatize)
         if self.stem:
-            words = [self._stemmer.stem(word) for word in words]
-
-        return ' '.join(words)
-
-    def clean_series(self, series: pd.Series) -> pd.Series:
-        return series.apply(self.clean_text)
+            words = self._stem_cache.map(words, self._get_stemmer().stem)
+        return words
+
+    def seed_token_cache(self, tokens: Iterable[str]) -> int:
+        """
+        Precomputes lemmas and stems for ``tokens``, e.g. the vocabulary of
+        the fitted vectorizer, so a freshly loaded model starts warm.
+        Returns the number of cache entries added.
+        """
+        tokens = list(dict.fromkeys(tokens))
+        added = 0
+        if self.lemmatize:
+            lemmatize = self._get_lemmatizer().lemmatize
+            added += self._lemma_cache.seed(tokens, lemmatize)
+            # Стеммер получает уже лемматизированные токены
+            tokens = list(dict.fromkeys(lemmatize(token) for token in tokens))
+        if self.stem:
+            added += self._stem_cache.seed(tokens, self._get_stemmer().stem)
+        return added
+
+    def token_cache_stats(self) -> Dict[str, Any]:
+        return {"lemma": self._lemma_cache.stats(), "stem": self._stem_cache.stats()}
+
+    def clean_series(self, series: pd.Series, n_jobs: int = 1, chunk_size: int = 10000) -> pd.Series:
+        """
+        Cleans every value of the series. With ``n_jobs`` other than 1 the
+        values are split into chunks of ``chunk_size`` and cleaned in a
+        process pool (``-1`` uses every CPU); chunks are reassembled in
+        order, so the result is identical to the sequential one.
+        """
+        workers = (os.cpu_count() or 1) if n_jobs == -1 else n_jobs
+        if workers <= 1 or len(series) <= chunk_size:
+            return series.apply(self.clean_text)
+
+        values = series.tolist()
+        chunks = [values[start:start + chunk_size] for start in range(0, len(values), chunk_size)]
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_worker,
+                                 initargs=(self,)) as executor:
+            cleaned = [text for chunk in executor.map(_clean_chunk, chunks) for text in chunk]
+        return pd.Series(cleaned, index=series.index, name=series.name, dtype=object)
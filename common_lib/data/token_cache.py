@@ -0,0 +1,82 @@
+import threading
+from typing import Callable, Dict, Iterable, List
+
+
+class TokenCache:
+    """
+    Bounded token -> normalized form cache for lemmatization and stemming.
+
+    Review vocabulary is Zipf distributed, so a few thousand entries answer
+    almost every lookup. Hits are plain dict reads; only misses take the lock.
+    When ``max_size`` entries are stored the oldest inserted entry is dropped
+    (FIFO keeps hits free of bookkeeping); hit counters are not locked and
+    are approximate under concurrent use. The cache is pickled together with
+    its owner, so a warm cache travels with the model artifact.
+    """
+
+    def __init__(self, max_size: int = 100000):
+        self.max_size = max_size
+        self._entries: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def map(self, tokens: List[str], compute: Callable[[str], str]) -> List[str]:
+        entries = self._entries
+        result = [entries.get(token) for token in tokens]
+        misses = 0
+        for i, value in enumerate(result):
+            if value is None:
+                # Повтор токена в том же тексте уже мог попасть в кэш
+                value = entries.get(tokens[i])
+                if value is None:
+                    misses += 1
+                    value = self._store(tokens[i], compute(tokens[i]))
+                result[i] = value
+        self.hits += len(tokens) - misses
+        self.misses += misses
+        return result
+
+    def seed(self, tokens: Iterable[str], compute: Callable[[str], str]) -> int:
+        """Precomputes forms for ``tokens``; returns how many were added."""
+        added = 0
+        for token in tokens:
+            if token not in self._entries and len(self._entries) < self.max_size:
+                self._store(token, compute(token))
+                added += 1
+        return added
+
+    def _store(self, token: str, value: str) -> str:
+        if self.max_size <= 0:
+            return value
+        with self._lock:
+            if token not in self._entries:
+                while len(self._entries) >= self.max_size:
+                    del self._entries[next(iter(self._entries))]
+                self._entries[token] = value
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __getstate__(self):
+        return {"max_size": self.max_size, "entries": dict(self._entries)}
+
+    def __setstate__(self, state):
+        self.__init__(state["max_size"])
+        self._entries.update(state["entries"])
@@ -21,15 +21,70 @@ class Settings(BaseSettings):
     RABBITMQ_VHOST: str = '/'
     QUEUE_NAME: str = 'ml_task_queue'
 
+    TASK_TRANSPORT: str = "rabbitmq"
+    INPROCESS_WORKERS: int = 2
+    INPROCESS_MAX_QUEUE: int = 10000
+
+    NEAR_DUPLICATE_ENABLED: bool = False
+    NEAR_DUPLICATE_THRESHOLD: float = 0.7
+    NEAR_DUPLICATE_NUM_PERM: int = 128
+    NEAR_DUPLICATE_MAX_ITEMS: int = 100000
+    NEAR_DUPLICATE_REJECT_CLUSTER_SIZE: int = 0
+    BEHAVIOR_FEATURES_ENABLED: bool = False
+    BEHAVIOR_WINDOW_SECONDS: float = 600.0
+    BEHAVIOR_WINDOW_BUCKETS: int = 60
+    BEHAVIOR_MAX_ENTITIES: int = 100000
+    BEHAVIOR_REJECT_USER_REVIEWS_IN_WINDOW: int = 0
+    BEHAVIOR_REJECT_FIVE_STAR_STREAK: int = 0
+    TRENDING_PHRASES_ENABLED: bool = False
+    TRENDING_SKETCH_WIDTH: int = 16384
+    TRENDING_SKETCH_DEPTH: int = 4
+    TRENDING_TOP_K: int = 100
+    TRENDING_HALF_LIFE_SECONDS: float = 900.0
+    TRENDING_MIN_COUNT: float = 20.0
+    TRENDING_REJECT_MIN_PHRASES: int = 0
+    SIGNALS_SNAPSHOT_DIR: Optional[str] = None
+    SIGNALS_SNAPSHOT_EVERY: int = 1000
+
     SECRET_KEY: str = "a_very_weak_default_secret_key_replace_in_env"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     COOKIE_NAME: str = "my_app_session_cookie"
 
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_MAXSIZE: int = 10000
+
+    PASSWORD_POOL_WORKERS: int = 2
+    PASSWORD_POOL_MAX_QUEUE: int = 32
+    PASSWORD_POOL_RETRY_AFTER_SECONDS: int = 1
+
+    COMMENT_BULK_MAX_ITEMS: int = 5000
+    COMMENT_EXPORT_BATCH_SIZE: int = 1000
+
+    CLASSIFIER_ENABLED: bool = False
+    MODEL_DIR: str = "/app/model"
+    CLASSIFY_MAX_BATCH_SIZE: int = 64
+    CLASSIFY_MAX_WAIT_MS: float = 5.0
+    CLASSIFY_WORKERS: int = 1
+
+    ADMISSION_MAX_QUEUE_DEPTH: int = 10000
+    ADMISSION_SAMPLE_INTERVAL_SECONDS: float = 5.0
+    ADMISSION_SINGLE_POLICY: str = "defer"
+    ADMISSION_BULK_POLICY: str = "reject"
+    ADMISSION_RETRY_AFTER_SECONDS: int = 30
+    ADMISSION_REQUEUE_BATCH_SIZE: int = 500
+
+    DB_INSTRUMENTATION_ENABLED: bool = False
+    DB_SLOW_QUERY_MS: float = 200.0
+    DB_QUERIES_PER_REQUEST_WARN: int = 20
+
     INITIAL_BALANCE: int = 10
 
     ENVIRONMENT: str = "development"
 
+    STATIC_BUILD_DIR: Optional[str] = None
+    TEMPLATE_CACHE_DIR: Optional[str] = None
+
 
 
     @property
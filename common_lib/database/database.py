@@ -1,12 +1,17 @@
 import logging
+from sqlalchemy import text
 from sqlmodel import SQLModel, Session, create_engine
 from .config import get_settings
-from common_lib.models import UserCreate
+from .instrumentation import instrument_engine
+from common_lib.models import UserCreate, ModerationStatus
 from common_lib.services.crud.user import ensure_user
 from ..services.crud.product import ensure_products
+from ..services.crud.product_stats import rebuild_product_stats
 
 engine = create_engine(url=get_settings().DATABASE_URL_psycopg,
                        echo=False, pool_size=5, max_overflow=10)
+if get_settings().DB_INSTRUMENTATION_ENABLED:
+    instrument_engine(engine, "main")
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s"
@@ -23,12 +28,38 @@ def create_db_and_tables():
     logger.info("Attempting to create database tables...")
     try:
         SQLModel.metadata.create_all(engine)
+        _add_missing_enum_values()
+        _add_missing_columns()
         logger.info("Tables created successfully (or already exist).")
     except Exception as e:
         logger.error(f"Error creating tables: {e}", exc_info=True)
         raise
 
 
+def _add_missing_enum_values():
+    # create_all не изменяет уже существующие типы ENUM в PostgreSQL
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as connection:
+        for status in ModerationStatus:
+            connection.execute(text(f"ALTER TYPE moderationstatus ADD VALUE IF NOT EXISTS '{status.name}'"))
+
+
+def _add_missing_columns():
+    # create_all не добавляет колонки в уже существующие таблицы
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as connection:
+        connection.execute(text("ALTER TABLE comment ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE"))
+        connection.execute(text("CREATE INDEX IF NOT EXISTS ix_comment_created_at ON comment (created_at)"))
+
+
+def check_db_connection():
+    """Проверяет доступность БД одним запросом, не изменяя схему."""
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
 def init_db():
     create_db_and_tables()
     demo_user = UserCreate(
@@ -47,4 +78,5 @@ def init_db():
         ensure_user(session, demo_user)
         ensure_user(session, admin_user)
         ensure_products(session)
+        rebuild_product_stats(session)
 
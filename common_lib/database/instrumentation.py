@@ -0,0 +1,195 @@
+"""
+Opt-in SQLAlchemy instrumentation (``DB_INSTRUMENTATION_ENABLED``).
+
+``instrument_engine`` attaches engine events that record a latency histogram
+per statement, the time spent waiting for a pooled connection and how often
+the pool was exhausted. ``track_queries`` counts statements issued inside a
+unit of work (an HTTP request, a worker message); ``QueryCountMiddleware``
+applies it to every request and flags routes that issue more than
+``DB_QUERIES_PER_REQUEST_WARN`` statements, which is how lazy loads such as
+``Product.comments`` turn into N+1 patterns.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from common_lib.database.config import get_settings
+from common_lib.metrics import Histogram, register_metrics_provider
+from common_lib.services.tracing import get_request_id
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_ms: float = 0.0
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("db_query_stats", default=None)
+
+
+class EngineMetrics:
+    """Statement and pool metrics of one instrumented engine."""
+
+    def __init__(self, name: str, slow_query_ms: float):
+        self.name = name
+        self.slow_query_ms = slow_query_ms
+        self.statements = Histogram()
+        self.pool_wait = Histogram()
+        self.slow_queries = 0
+        self.pool_exhausted = 0
+        self.pool_timeouts = 0
+        self.engine: Optional[Engine] = None
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self.engine.pool if self.engine is not None else None
+        return {
+            "statements": self.statements.snapshot(),
+            "slow_queries": self.slow_queries,
+            "slow_query_ms": self.slow_query_ms,
+            "pool_wait": self.pool_wait.snapshot(),
+            "pool_exhausted": self.pool_exhausted,
+            "pool_timeouts": self.pool_timeouts,
+            "pool_status": pool.status() if pool is not None else None,
+        }
+
+
+_engines: Dict[str, EngineMetrics] = {}
+_flagged_requests: Dict[str, int] = {}
+_queries_per_unit = Histogram(buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500), unit="queries")
+
+
+def _pool_capacity(pool) -> Optional[int]:
+    # Только у QueuePool есть ограничение; у StaticPool/NullPool ждать нечего
+    size = getattr(pool, "size", None)
+    max_overflow = getattr(pool, "_max_overflow", None)
+    if not callable(size) or max_overflow is None or max_overflow < 0:
+        return None
+    return size() + max_overflow
+
+
+def instrument_engine(engine: Engine, name: str, slow_query_ms: Optional[float] = None) -> EngineMetrics:
+    """
+    Attaches statement timing and pool wait measurement to ``engine``.
+    Calling it again for the same name returns the existing metrics.
+    """
+    if name in _engines:
+        return _engines[name]
+    metrics = EngineMetrics(name, settings.DB_SLOW_QUERY_MS if slow_query_ms is None else slow_query_ms)
+    metrics.engine = engine
+
+    # Время старта хранится в контексте выполнения самого запроса: если
+    # запрос упал, after_cursor_execute не вызывается и контекст просто
+    # отбрасывается, ничего не накапливаясь на соединении из пула.
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_start", None)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        metrics.statements.observe(elapsed_ms)
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.total_ms += elapsed_ms
+        if elapsed_ms >= metrics.slow_query_ms:
+            metrics.slow_queries += 1
+            logger.warning(f"Slow query on '{name}' ({elapsed_ms:.1f} ms, request_id={get_request_id()}): "
+                           f"{statement[:500]}")
+
+    # Событий "до ожидания соединения" у пула нет, поэтому время checkout
+    # измеряется обёрткой вокруг raw_connection (она переживает engine.dispose()).
+    raw_connection = engine.raw_connection
+
+    def _timed_raw_connection(*args, **kwargs):
+        capacity = _pool_capacity(engine.pool)
+        if capacity is not None and engine.pool.checkedout() >= capacity:
+            metrics.pool_exhausted += 1
+        started = time.perf_counter()
+        try:
+            return raw_connection(*args, **kwargs)
+        except PoolTimeoutError:
+            metrics.pool_timeouts += 1
+            logger.error(f"Connection pool of '{name}' timed out: {engine.pool.status()}")
+            raise
+        finally:
+            metrics.pool_wait.observe((time.perf_counter() - started) * 1000)
+
+    engine.raw_connection = _timed_raw_connection
+    if not _engines:
+        register_metrics_provider("db", instrumentation_stats)
+    _engines[name] = metrics
+    logger.info(f"SQLAlchemy instrumentation enabled for engine '{name}'")
+    return metrics
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Counts statements executed by instrumented engines in the current context."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def record_unit_of_work(name: str, stats: QueryStats, threshold: Optional[int] = None) -> bool:
+    """
+    Records the statement count of a finished request or task and flags it
+    when it exceeds ``threshold``. Returns True if the unit was flagged.
+    """
+    threshold = settings.DB_QUERIES_PER_REQUEST_WARN if threshold is None else threshold
+    _queries_per_unit.observe(stats.count)
+    if stats.count <= threshold:
+        return False
+    _flagged_requests[name] = _flagged_requests.get(name, 0) + 1
+    logger.warning(f"{name} issued {stats.count} SQL statements ({stats.total_ms:.1f} ms), "
+                   f"threshold is {threshold}; possible N+1")
+    return True
+
+
+class QueryCountMiddleware:
+    """
+    Pure ASGI middleware counting SQL statements per HTTP request. The route
+    template (``/api/products/{product_id}``) is read from the scope after the
+    router has matched it, so flagged counts are grouped per endpoint.
+    """
+
+    def __init__(self, app, threshold: Optional[int] = None):
+        self.app = app
+        self.threshold = threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with track_queries() as stats:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                route = scope.get("route")
+                path = getattr(route, "path", None) or scope.get("path", "")
+                record_unit_of_work(f"{scope.get('method', '')} {path}", stats, self.threshold)
+
+
+def instrumentation_stats() -> Dict[str, Any]:
+    return {
+        "engines": {name: metrics.stats() for name, metrics in _engines.items()},
+        "queries_per_unit": _queries_per_unit.snapshot(),
+        "flagged": dict(_flagged_requests),
+        "queries_per_request_warn": settings.DB_QUERIES_PER_REQUEST_WARN,
+    }
@@ -0,0 +1,52 @@
+"""
+One-shot database management commands.
+
+Schema creation and seeding are run once per deploy instead of on every
+application start:
+    python -m common_lib.database.manage init-db
+"""
+import argparse
+import logging
+import sys
+import time
+
+from sqlmodel import Session
+
+from common_lib.database.database import (engine, create_db_and_tables, init_db, check_db_connection)
+from common_lib.services.crud.product_stats import rebuild_product_stats
+
+logger = logging.getLogger(__name__)
+
+
+def _rebuild_stats(only_missing: bool) -> None:
+    with Session(engine) as session:
+        rebuild_product_stats(session, only_missing=only_missing)
+
+
+COMMANDS = {
+    "init-db": ("Create tables, seed demo users and products, backfill product stats", init_db),
+    "create-schema": ("Create missing tables, columns and enum values only", create_db_and_tables),
+    "rebuild-stats": ("Recompute review aggregates for every product", lambda: _rebuild_stats(only_missing=False)),
+    "check": ("Verify database connectivity", check_db_connection),
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Database management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, (help_text, _) in COMMANDS.items():
+        subparsers.add_parser(name, help=help_text)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        COMMANDS[args.command][1]()
+    except Exception as e:
+        logger.error(f"Command '{args.command}' failed: {e}", exc_info=True)
+        return 1
+    logger.info(f"Command '{args.command}' completed in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
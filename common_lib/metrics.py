@@ -0,0 +1,87 @@
+import bisect
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MetricsProvider = Callable[[], Dict[str, Any]]
+
+_providers: Dict[str, MetricsProvider] = {}
+
+
+def register_metrics_provider(name: str, provider: MetricsProvider) -> None:
+    """
+    Registers a callable returning a dict snapshot of a component's metrics.
+    """
+    _providers[name] = provider
+
+
+def collect_metrics() -> Dict[str, Dict[str, Any]]:
+    snapshot = {}
+    for name, provider in _providers.items():
+        try:
+            snapshot[name] = provider()
+        except Exception as e:
+            logger.error(f"Failed to collect metrics from '{name}': {e}")
+            snapshot[name] = {"error": str(e)}
+    return snapshot
+
+
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """
+    Thread-safe fixed-bucket histogram, milliseconds by default.
+
+    Percentiles are estimated as the upper bound of the bucket that contains
+    the requested rank, which is enough to spot which component is slow.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS_MS, unit: str = "ms"):
+        self.buckets = tuple(sorted(buckets))
+        self.unit = unit
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+            self._max = max(self._max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            return self._percentile(q)
+
+    def _percentile(self, q: float) -> Optional[float]:
+        if not self._count:
+            return None
+        rank = q / 100 * self._count
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if count and seen >= rank:
+                return min(self.buckets[index], self._max) if index < len(self.buckets) else self._max
+        return self._max
+
+    def snapshot(self) -> Dict[str, Any]:
+        unit = self.unit
+        with self._lock:
+            buckets = {f"le_{bound:g}": count for bound, count in zip(self.buckets, self._counts)}
+            buckets["le_inf"] = self._counts[-1]
+            return {
+                "count": self._count,
+                f"avg_{unit}": self._sum / self._count if self._count else None,
+                f"max_{unit}": self._max,
+                f"p50_{unit}": self._percentile(50),
+                f"p95_{unit}": self._percentile(95),
+                f"p99_{unit}": self._percentile(99),
+                "buckets": buckets,
+            }
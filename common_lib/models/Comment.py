@@ -1,7 +1,9 @@
+from datetime import datetime, timezone
 from enum import Enum
-from typing import List, TYPE_CHECKING
+from typing import Any, List, Optional, TYPE_CHECKING
 from uuid import UUID, uuid4
 from pydantic import ConfigDict
+from sqlalchemy import DateTime
 from sqlmodel import Field, Relationship, SQLModel
 from .basemodels import CommentBase
 
@@ -14,6 +16,7 @@ class ModerationStatus(str, Enum):
     NOT_CHECKED = "not_checked"
     APPROVED = "approved"
     REJECTED = "rejected"
+    DEFERRED = "deferred"
 
 
 class Comment(CommentBase, table=True):
@@ -25,6 +28,12 @@ class Comment(CommentBase, table=True):
 
     user_id: UUID = Field(foreign_key="user.id", index=True)
     product_id: UUID = Field(foreign_key="product.id", index=True)
+    # NULL только у комментариев, созданных до появления колонки
+    created_at: Optional[datetime] = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=DateTime(timezone=True),
+        index=True
+    )
 
     user: "User" = Relationship(back_populates="comments")
     product: "Product" = Relationship(back_populates="comments")
@@ -45,3 +54,17 @@ class CommentOut(CommentBase):
 
 class CommentUpdateModeration(SQLModel):
     moderation_status: ModerationStatus
+
+
+class CommentBulkItemResult(SQLModel):
+    index: int
+    status: str
+    id: Optional[UUID] = None
+    queued: bool = False
+    errors: Optional[List[Any]] = None
+
+
+class CommentBulkResult(SQLModel):
+    created: int
+    failed: int
+    results: List[CommentBulkItemResult]
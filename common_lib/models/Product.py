@@ -1,7 +1,7 @@
-from typing import List, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 from uuid import UUID, uuid4
 
-from sqlmodel import Field, Relationship
+from sqlmodel import Field, Relationship, SQLModel
 from .basemodels import ProductBase
 from .Comment import CommentOut
 
@@ -14,6 +14,34 @@ class Product(ProductBase, table=True):
 
     # Связь "один ко многим": один продукт -> много комментариев
     comments: List["Comment"] = Relationship(back_populates="product")
+    # Агрегаты по отзывам хранятся отдельной строкой и подгружаются вместе с продуктом
+    stats: Optional["ProductStats"] = Relationship(
+        back_populates="product",
+        sa_relationship_kwargs={"uselist": False, "lazy": "selectin", "cascade": "all, delete-orphan"}
+    )
+
+
+class ProductStats(SQLModel, table=True):
+    product_id: UUID = Field(foreign_key="product.id", primary_key=True)
+    comment_count: int = 0
+    rating_sum: int = 0
+    approved_count: int = 0
+    rejected_count: int = 0
+
+    product: Product = Relationship(back_populates="stats")
+
+    @property
+    def average_rating(self) -> Optional[float]:
+        if not self.comment_count:
+            return None
+        return self.rating_sum / self.comment_count
+
+
+class ProductStatsOut(SQLModel):
+    comment_count: int
+    average_rating: Optional[float] = None
+    approved_count: int
+    rejected_count: int
 
 
 class ProductCreate(ProductBase):
@@ -24,5 +52,9 @@ class ProductOut(ProductBase):
     id: UUID
 
 
-class ProductOutWithComments(ProductOut):
+class ProductOutWithStats(ProductOut):
+    stats: Optional[ProductStatsOut] = None
+
+
+class ProductOutWithComments(ProductOutWithStats):
     comments: List[CommentOut] = []
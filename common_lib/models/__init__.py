@@ -1,7 +1,7 @@
 from .basemodels import *
 from .User import User, UserOut, UserCreate, RoleEnum
-from .Product import ProductCreate, Product
+from .Product import ProductCreate, Product, ProductStats, ProductStatsOut, ProductOutWithStats
 from .Comment import Comment, CommentOut, ModerationStatus, CommentUpdateModeration
 
 __all__ = ["UserBase", "ProductBase", "CommentBase", "User", "UserOut",
-           "UserCreate", "Product", "ProductCreate", "Comment", "CommentOut", "ModerationStatus", "RoleEnum", "CommentUpdateModeration"]
+           "UserCreate", "Product", "ProductCreate", "ProductStats", "ProductStatsOut", "ProductOutWithStats", "Comment", "CommentOut", "ModerationStatus", "RoleEnum", "CommentUpdateModeration"]
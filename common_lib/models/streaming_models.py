@@ -0,0 +1,182 @@
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import confusion_matrix
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+from common_lib.text_transformers.column_selector import ColumnSelector
+from common_lib.text_transformers.text_cleaner_analyzer import TextCleanerAnalyzer
+
+ChunkSource = Union[str, Callable[[], Iterable[pd.DataFrame]]]
+
+
+class StreamingModelTrainer:
+    """
+    Out-of-core counterpart of BaselineModelTrainer.
+
+    The corpus is read in chunks of ``chunk_size`` rows; each chunk is cleaned
+    and vectorized by a stateless HashingVectorizer whose analyzer is the
+    TextCleaner (no vocabulary, nothing to fit) and passed to the model's
+    ``partial_fit``. Peak memory is bounded by one chunk plus the model.
+
+    Rows are assigned to the held-out set by a hash of their text, so the
+    split does not depend on chunking or row order and duplicated texts never
+    leak from training into evaluation. The held-out rows are scored in a
+    separate pass after every epoch.
+    """
+
+    def __init__(self, text_column: str = 'text_', label_column: str = 'label',
+                 classes: Optional[List[Any]] = None,
+                 clean_text_methods: Optional[List[str]] = None,
+                 clean_text_stopwords_lang: Optional[str] = 'english',
+                 clean_text_lemmatize: bool = False, clean_text_stem: bool = False,
+                 n_features: int = 2 ** 20, ngram_range: Tuple[int, int] = (1, 2),
+                 holdout_fraction: float = 0.1):
+        self.text_column = text_column
+        self.label_column = label_column
+        self.classes = classes
+        self.holdout_fraction = holdout_fraction
+        self.vectorizer = HashingVectorizer(
+            analyzer=TextCleanerAnalyzer(
+                methods=clean_text_methods,
+                stop_words_lang=clean_text_stopwords_lang,
+                lemmatize=clean_text_lemmatize,
+                stem=clean_text_stem,
+                ngram_range=ngram_range
+            ),
+            n_features=n_features,
+            alternate_sign=False
+        )
+        self.model: Any = None
+        self.model_name: str = ""
+        self.pipeline: Optional[Pipeline] = None
+        self.label_mapping: Dict[Any, int] = {}
+        self.history: List[Dict[str, Any]] = []
+        self._models: Dict[str, Any] = {
+            'sgd': SGDClassifier,
+            'naive_bayes': MultinomialNB
+        }
+
+    def get_supported_models(self) -> List[str]:
+        return list(self._models.keys())
+
+    def _get_default_params(self, model_name: str) -> Dict[str, Any]:
+        if model_name == 'sgd':
+            # log_loss даёт predict_proba, который нужен ReviewClassifier
+            return {'loss': 'log_loss', 'alpha': 1e-5, 'random_state': 42}
+        if model_name == 'naive_bayes':
+            return {'alpha': 1.0}
+        return {}
+
+    def iter_chunks(self, source: ChunkSource, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """Yields DataFrame chunks from a CSV path or from a callable returning chunks."""
+        if callable(source):
+            yield from source()
+            return
+        yield from pd.read_csv(source, usecols=[self.text_column, self.label_column], chunksize=chunk_size,
+                               quotechar='"', encoding='utf-8', encoding_errors='replace')
+
+    def _holdout_mask(self, texts: pd.Series) -> np.ndarray:
+        threshold = int(self.holdout_fraction * 10000)
+        return np.fromiter((zlib.crc32(str(text).encode('utf-8')) % 10000 < threshold for text in texts),
+                           dtype=bool, count=len(texts))
+
+    def _split(self, chunk: pd.DataFrame, holdout: bool) -> Tuple[pd.Series, np.ndarray]:
+        chunk = chunk.dropna(subset=[self.label_column])
+        texts = chunk[self.text_column].fillna('')
+        mask = self._holdout_mask(texts)
+        if not holdout:
+            mask = ~mask
+        labels = chunk[self.label_column][mask].map(self.label_mapping)
+        known = labels.notna().to_numpy()
+        return texts[mask][known], labels[known].to_numpy(dtype=int)
+
+    def _collect_classes(self, source: ChunkSource, chunk_size: int) -> List[Any]:
+        print("Collecting class labels...")
+        labels = set()
+        for chunk in self.iter_chunks(source, chunk_size):
+            labels.update(chunk[self.label_column].dropna().unique().tolist())
+        return sorted(labels)
+
+    def train(self, model_name: str, source: ChunkSource, chunk_size: int = 10000, epochs: int = 1,
+              **kwargs: Any) -> Dict[str, Any]:
+        """Trains the model over ``epochs`` passes and returns the held-out metrics of the last one."""
+        if model_name not in self._models:
+            raise ValueError(f"Model '{model_name}' is not supported. "
+                             f"Supported models are: {self.get_supported_models()}")
+
+        classes = self.classes if self.classes is not None else self._collect_classes(source, chunk_size)
+        self.label_mapping = {label: i for i, label in enumerate(classes)}
+        class_ids = np.arange(len(classes))
+
+        self.model_name = model_name
+        print(f"--- Streaming training {self.model_name} ---")
+        model_params = self._get_default_params(self.model_name)
+        model_params.update(kwargs)
+        print(f"Using model parameters: {model_params}")
+        self.model = self._models[self.model_name](**model_params)
+        self.history = []
+
+        for epoch in range(1, epochs + 1):
+            rows = 0
+            for chunk in self.iter_chunks(source, chunk_size):
+                texts, labels = self._split(chunk, holdout=False)
+                if len(labels) == 0:
+                    continue
+                self.model.partial_fit(self.vectorizer.transform(texts), labels, classes=class_ids)
+                rows += len(labels)
+            metrics = self.evaluate(source, chunk_size)
+            metrics.update(epoch=epoch, train_rows=rows)
+            self.history.append(metrics)
+            print(f"Epoch {epoch}: trained on {rows} rows, holdout metrics: {metrics}")
+
+        self.pipeline = Pipeline([
+            ('column_selector', ColumnSelector(self.text_column)),
+            ('vectorizer', self.vectorizer),
+            ('classifier', self.model)
+        ])
+        print("Training complete.")
+        return self.history[-1]
+
+    def evaluate(self, source: ChunkSource, chunk_size: int = 10000) -> Dict[str, Any]:
+        """Scores the held-out rows chunk by chunk, accumulating only a confusion matrix."""
+        labels_range = list(range(len(self.label_mapping)))
+        matrix = np.zeros((len(labels_range), len(labels_range)), dtype=np.int64)
+        for chunk in self.iter_chunks(source, chunk_size):
+            texts, labels = self._split(chunk, holdout=True)
+            if len(labels) == 0:
+                continue
+            predicted = self.model.predict(self.vectorizer.transform(texts))
+            matrix += confusion_matrix(labels, predicted, labels=labels_range)
+        return self._metrics(matrix)
+
+    @staticmethod
+    def _metrics(matrix: np.ndarray) -> Dict[str, Any]:
+        total = int(matrix.sum())
+        true_positive = np.diag(matrix).astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            precision = np.nan_to_num(true_positive / matrix.sum(axis=0))
+            recall = np.nan_to_num(true_positive / matrix.sum(axis=1))
+            f1 = np.nan_to_num(2 * precision * recall / (precision + recall))
+        return {
+            'holdout_rows': total,
+            'accuracy': float(true_positive.sum() / total) if total else 0.0,
+            'precision_macro': float(precision.mean()) if len(precision) else 0.0,
+            'recall_macro': float(recall.mean()) if len(recall) else 0.0,
+            'f1_macro': float(f1.mean()) if len(f1) else 0.0,
+            'confusion_matrix': matrix.tolist(),
+        }
+
+    def save_artifacts(self, path: str) -> None:
+        """Saves the pipeline in the model_artifacts.pkl format read by ReviewClassifier and the worker."""
+        if self.pipeline is None:
+            raise ValueError("The model has not been trained yet.")
+        joblib.dump({'full_pipeline': self.pipeline, 'label_mapping': self.label_mapping,
+                     'model_name': self.model_name, 'history': self.history}, path)
+        print(f"Artifacts saved to {path}")
@@ -0,0 +1,90 @@
+import logging
+import threading
+import time
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from common_lib.database.config import get_settings
+from common_lib.metrics import register_metrics_provider
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class SheddingPolicy(str, Enum):
+    DEFER = "defer"
+    REJECT = "reject"
+
+
+class AdmissionController:
+    """
+    Caches the moderation queue load sampled in the background and turns it
+    into an O(1) admission decision, so admission adds no broker round trip
+    per request.
+
+    The queue is overloaded when it holds max_queue_depth messages or more,
+    or when nobody consumes it. A sample older than stale_after_seconds is
+    ignored (fail open), so a broken sampler never blocks writes.
+    """
+
+    def __init__(self, max_queue_depth: int = 10000, stale_after_seconds: float = 30.0):
+        self.max_queue_depth = max_queue_depth
+        self.stale_after_seconds = stale_after_seconds
+        self._lock = threading.Lock()
+        self._message_count: Optional[int] = None
+        self._consumer_count: Optional[int] = None
+        self._sampled_at: Optional[float] = None
+        self._overloaded = False
+        self._deferred = 0
+        self._rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_queue_depth > 0
+
+    def update(self, message_count: int, consumer_count: int) -> None:
+        overloaded = message_count >= self.max_queue_depth or consumer_count == 0
+        with self._lock:
+            if overloaded != self._overloaded:
+                logger.warning(f"Moderation queue {'overloaded' if overloaded else 'recovered'}: "
+                               f"{message_count} message(s), {consumer_count} consumer(s)")
+            self._message_count = message_count
+            self._consumer_count = consumer_count
+            self._sampled_at = time.monotonic()
+            self._overloaded = overloaded
+
+    def is_overloaded(self) -> bool:
+        if not self.enabled or self._sampled_at is None:
+            return False
+        if time.monotonic() - self._sampled_at > self.stale_after_seconds:
+            return False
+        return self._overloaded
+
+    def record_deferred(self, count: int = 1) -> None:
+        with self._lock:
+            self._deferred += count
+
+    def record_rejected(self, count: int = 1) -> None:
+        with self._lock:
+            self._rejected += count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            age = time.monotonic() - self._sampled_at if self._sampled_at is not None else None
+            return {
+                "enabled": self.enabled,
+                "max_queue_depth": self.max_queue_depth,
+                "message_count": self._message_count,
+                "consumer_count": self._consumer_count,
+                "sample_age_seconds": age,
+                "overloaded": self.is_overloaded(),
+                "deferred": self._deferred,
+                "rejected": self._rejected,
+            }
+
+
+admission_controller = AdmissionController(
+    max_queue_depth=settings.ADMISSION_MAX_QUEUE_DEPTH,
+    stale_after_seconds=settings.ADMISSION_SAMPLE_INTERVAL_SECONDS * 3,
+)
+register_metrics_provider("admission", admission_controller.stats)
@@ -11,6 +11,7 @@ from common_lib.database.database import get_session
 from common_lib.services.crud import user as UserService
 from common_lib.models import User
 from .cookieauth import OAuth2PasswordBearerWithCookie
+from .user_cache import user_cache
 from common_lib.database.config import get_settings
 from ...models.User import RoleEnum
 
@@ -42,6 +43,11 @@ async def get_current_user_optional(
         logger.debug("No token provided for optional authentication.")
         return None
 
+    cached_user = user_cache.get(token)
+    if cached_user is not None:
+        logger.debug(f"Resolved optional user from cache: {cached_user.email}")
+        return cached_user
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: Optional[str] = payload.get("sub")
@@ -55,6 +61,7 @@ async def get_current_user_optional(
     if user is None:
         logger.warning(f"User not found for email in optional token: {email}")
         return None
+    user_cache.set(token, user, token_exp=payload.get("exp"))
     logger.debug(f"Successfully authenticated optional user: {user.email}")
     return user
 
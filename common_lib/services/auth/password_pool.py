@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from common_lib.database.config import get_settings
+from common_lib.metrics import register_metrics_provider
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class PasswordPoolSaturated(Exception):
+    """Raised when the password pool has no free worker and its queue is full."""
+
+
+class PasswordPool:
+    """
+    Bounded thread pool for bcrypt hashing and verification.
+
+    bcrypt releases the GIL, so running it in a few dedicated threads keeps the
+    event loop free while a login storm is in progress. Submissions beyond
+    max_workers + max_queue are rejected immediately instead of piling up.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 32):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                logger.warning(f"Password pool saturated: {self._pending} task(s) pending")
+                raise PasswordPoolSaturated("Password pool is saturated")
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password")
+            executor = self._executor
+        try:
+            future = executor.submit(func, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        # Слот освобождается, когда задача закончилась в потоке, а не когда
+        # вызывающий перестал ждать: отменённый запрос не отменяет bcrypt
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": min(self._pending, self.max_workers),
+                "queue_depth": max(self._pending - self.max_workers, 0),
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+password_pool = PasswordPool(
+    max_workers=settings.PASSWORD_POOL_WORKERS,
+    max_queue=settings.PASSWORD_POOL_MAX_QUEUE,
+)
+register_metrics_provider("password_pool", password_pool.stats)
@@ -0,0 +1,118 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+from uuid import UUID
+
+from common_lib.database.config import get_settings
+from common_lib.metrics import register_metrics_provider
+from common_lib.models import UserOut
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class UserCache:
+    """
+    Bounded TTL cache of decoded access tokens -> UserOut.
+
+    Entries are keyed by the raw token string, so a hit skips both the JWT
+    decode and the user lookup in the database. An entry never outlives the
+    token it was built from. Invalidation is explicit by email or user id,
+    and must be called whenever a user record or its role changes.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl_seconds: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, UserOut]]" = OrderedDict()
+        self._tokens_by_email: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, token: str) -> Optional[UserOut]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, user = entry
+            if expires_at <= now:
+                self._remove(token)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self._hits += 1
+            return user
+
+    def set(self, token: str, user: UserOut, token_exp: Optional[float] = None) -> None:
+        if self.maxsize <= 0 or self.ttl_seconds <= 0:
+            return
+        ttl = self.ttl_seconds
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+            if ttl <= 0:
+                return
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (time.monotonic() + ttl, user)
+            self._tokens_by_email.setdefault(user.email, set()).add(token)
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def invalidate_email(self, email: str) -> None:
+        with self._lock:
+            tokens = self._tokens_by_email.pop(email, set())
+            for token in tokens:
+                self._entries.pop(token, None)
+            if tokens:
+                self._invalidations += 1
+                logger.debug(f"Invalidated {len(tokens)} cached token(s) for user: {email}")
+
+    def invalidate_user_id(self, user_id: UUID) -> None:
+        with self._lock:
+            emails = {user.email for _, user in self._entries.values() if user.id == user_id}
+        for email in emails:
+            self.invalidate_email(email)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_email.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+    def _remove(self, token: str) -> None:
+        _, user = self._entries.pop(token)
+        tokens = self._tokens_by_email.get(user.email)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_email[user.email]
+
+
+user_cache = UserCache(
+    maxsize=settings.USER_CACHE_MAXSIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+register_metrics_provider("user_cache", user_cache.stats)
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class BatcherNotRunning(Exception):
+    """Raised when an item is submitted to a batcher that has not been started."""
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Merges concurrent single-item requests into batched calls.
+
+    The first queued item opens a batch; the batch is dispatched as soon as it
+    holds max_batch_size items or max_wait_ms have passed since it was opened.
+    Batches run in a pool of `workers` threads. While every worker is busy new
+    items keep accumulating, so batches grow with load instead of queueing up
+    as single-item calls.
+    """
+
+    def __init__(self,
+                 predict_batch: Callable[[List[T]], List[R]],
+                 max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0,
+                 workers: int = 1):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight: set = set()
+        self._batches = 0
+        self._items = 0
+        self._max_batch_seen = 0
+        self._errors = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._loop_task is not None and not self._loop_task.done()
+
+    async def start(self) -> None:
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batcher")
+        self._loop_task = asyncio.create_task(self._run())
+        logger.info(f"Batcher started: max_batch_size={self.max_batch_size}, "
+                    f"max_wait_ms={self.max_wait_ms}, workers={self.workers}")
+
+    async def stop(self) -> None:
+        if self._loop_task is None:
+            return
+        self._loop_task.cancel()
+        try:
+            await self._loop_task
+        except asyncio.CancelledError:
+            pass
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(BatcherNotRunning("Batcher stopped"))
+        self._executor.shutdown(wait=False)
+        self._loop_task = None
+        logger.info("Batcher stopped")
+
+    async def submit(self, item: T) -> R:
+        if not self.is_running:
+            raise BatcherNotRunning("Batcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[T, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        try:
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            # Остановка во время ожидания дедлайна: элементы уже сняты с очереди
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(BatcherNotRunning("Batcher stopped"))
+            raise
+        # Забираем всё, что успело накопиться, пока ждали дедлайн
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except asyncio.CancelledError:
+                self._slots.release()
+                raise
+            task = asyncio.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        items = [item for item, _ in batch]
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(self._executor, self.predict_batch, items)
+            if len(results) != len(items):
+                raise RuntimeError(f"predict_batch returned {len(results)} results for {len(items)} items")
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            self._errors += 1
+            logger.error(f"Batch of {len(items)} item(s) failed: {e}", exc_info=True)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._batches += 1
+            self._items += len(items)
+            self._max_batch_seen = max(self._max_batch_seen, len(items))
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.is_running,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": self._items / self._batches if self._batches else 0.0,
+            "max_batch_size_seen": self._max_batch_seen,
+            "errors": self._errors,
+        }
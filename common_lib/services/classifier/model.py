@@ -0,0 +1,55 @@
+import logging
+import os
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TEXT_COLUMN = "text_"
+ARTIFACT_FILENAME = "model_artifacts.pkl"
+
+
+class ReviewClassifier:
+    """
+    Thin wrapper around the trained pipeline stored in model_artifacts.pkl.
+
+    All methods take a list of texts and run one vectorized pipeline call,
+    so the same object serves batched scoring in the app and in the worker.
+    """
+
+    def __init__(self, model_path: Optional[str] = None):
+        import joblib
+
+        if model_path is None:
+            model_dir = os.getenv("MODEL_DIR", "/app/model")
+            model_path = os.path.join(model_dir, ARTIFACT_FILENAME)
+
+        logger.info(f"Loading model artifacts from {model_path}")
+        artifacts = joblib.load(model_path)
+        self.pipeline = artifacts['full_pipeline']
+        self.label_mapping: Dict[str, int] = artifacts.get('label_mapping', {})
+        self.reverse_label_mapping = {v: k for k, v in self.label_mapping.items()}
+
+    def _frame(self, texts: List[str]):
+        import pandas as pd
+
+        return pd.DataFrame({TEXT_COLUMN: texts})
+
+    def predict_labels(self, texts: List[str]) -> List[int]:
+        return [int(label) for label in self.pipeline.predict(self._frame(texts))]
+
+    def classify(self, texts: List[str]) -> List[Dict]:
+        probabilities = self.pipeline.predict_proba(self._frame(texts))
+        classes = [int(label) for label in self.pipeline.classes_]
+        results = []
+        for row in probabilities:
+            best = int(row.argmax())
+            results.append({
+                'label': classes[best],
+                'predicted_class': self.reverse_label_mapping.get(classes[best], f"class_{classes[best]}"),
+                'confidence': float(row[best]),
+                'probabilities': {
+                    self.reverse_label_mapping.get(label, f"class_{label}"): float(row[idx])
+                    for idx, label in enumerate(classes)
+                },
+            })
+        return results
@@ -1,17 +1,19 @@
 # services/crud_comment.py
-import json
 import logging
-import os
-from datetime import datetime
+from datetime import datetime, timezone
 from uuid import UUID
-from typing import Optional
+from typing import Optional, List, Dict, Any, Tuple, Iterator
 
-import pika
-from pika.exceptions import ProbableAuthenticationError
-from sqlmodel import Session
+from sqlalchemy import insert, update as sa_update
+from sqlmodel import Session, select
 
-from common_lib.models.Comment import Comment, CommentCreate, CommentUpdateModeration
+from common_lib.models.Comment import Comment, CommentCreate, CommentUpdateModeration, ModerationStatus
+from common_lib.models.Product import Product
 from common_lib.models.User import User
+from common_lib.services.crud import product_stats
+from common_lib.services.tracing import build_trace_headers, get_request_id
+from common_lib.services.transport.base import ModerationTask
+from common_lib.services.transport.registry import get_transport
 
 logger = logging.getLogger(__name__)
 
@@ -24,24 +26,172 @@ def get_comment(session: Session, comment_id: UUID) -> Optional[Comment]:
 def create_comment(
         session: Session,
         comment_in: CommentCreate,
-        author: User
+        author: User,
+        defer: bool = False
 ) -> Comment:
-    db_comment = Comment.model_validate(comment_in, update={"user_id": author.id})
+    """
+    Сохраняет комментарий и ставит задачу модерации в очередь. При defer=True
+    комментарий сохраняется со статусом DEFERRED и публикуется позже,
+    когда очередь модерации разгрузится.
+    """
+    update = {"user_id": author.id}
+    if defer:
+        update["moderation_status"] = ModerationStatus.DEFERRED
+    db_comment = Comment.model_validate(comment_in, update=update)
 
     session.add(db_comment)
+    product_stats.on_comment_created(session, db_comment)
     session.commit()
     session.refresh(db_comment)
-    comment_service = CommentService()
-    comment_service.publish_moderation_task(comment_id=str(db_comment.id), text=comment_in.text, user_id=str(author.id))
+    if defer:
+        logger.info(f"Модерация комментария {db_comment.id} отложена")
+        return db_comment
+    CommentService().publish_moderation_tasks([_moderation_task(db_comment)])
     return db_comment
 
 
+def _moderation_task(comment: Comment) -> Dict[str, Any]:
+    return {
+        "comment_id": str(comment.id),
+        "text": comment.text,
+        "user_id": str(comment.user_id),
+        "product_id": str(comment.product_id),
+        "rating": comment.rating,
+    }
+
+
+def create_comments_bulk(
+        session: Session,
+        comments_in: List[CommentCreate],
+        author: User,
+        defer: bool = False
+) -> Tuple[List[Comment], bool]:
+    """
+    Создаёт пачку комментариев одним многострочным INSERT и одним коммитом,
+    затем публикует задачи модерации через одно соединение с RabbitMQ.
+    Возвращает созданные комментарии и признак успешной постановки в очередь;
+    если публикация не удалась, комментарии всё равно остаются сохранёнными.
+    """
+    update = {"user_id": author.id}
+    if defer:
+        update["moderation_status"] = ModerationStatus.DEFERRED
+    db_comments = [Comment.model_validate(c, update=update) for c in comments_in]
+    if not db_comments:
+        return [], False
+
+    session.execute(insert(Comment), [c.model_dump() for c in db_comments])
+    product_stats.on_comments_created(session, db_comments)
+    session.commit()
+    if defer:
+        return db_comments, False
+
+    comment_service = CommentService()
+    try:
+        comment_service.publish_moderation_tasks([
+            _moderation_task(c) for c in db_comments
+        ])
+        queued = True
+    except Exception as e:
+        logger.error(f"Не удалось поставить в очередь {len(db_comments)} комментариев: {e}")
+        queued = False
+    return db_comments, queued
+
+
+def requeue_deferred_comments(session: Session, limit: int) -> int:
+    """
+    Публикует до limit отложенных комментариев и возвращает их в статус
+    NOT_CHECKED. Возвращает число поставленных в очередь комментариев.
+
+    Строки сначала захватываются одним UPDATE ... RETURNING (подзапрос
+    берёт их с FOR UPDATE SKIP LOCKED), и публикуются только захваченные:
+    параллельные обходы на разных репликах не отправят один комментарий
+    дважды. Если публикация не удалась, комментарии возвращаются в DEFERRED.
+    """
+    claimable = (
+        select(Comment.id)
+        .where(Comment.moderation_status == ModerationStatus.DEFERRED)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    claimed = session.execute(
+        sa_update(Comment)
+        .where(Comment.id.in_(claimable))
+        .where(Comment.moderation_status == ModerationStatus.DEFERRED)
+        .values(moderation_status=ModerationStatus.NOT_CHECKED)
+        .returning(Comment.id, Comment.text, Comment.user_id, Comment.product_id, Comment.rating)
+        .execution_options(synchronize_session=False)
+    ).all()
+    session.commit()
+    if not claimed:
+        return 0
+
+    try:
+        CommentService().publish_moderation_tasks([_moderation_task(c) for c in claimed])
+    except Exception:
+        session.execute(
+            sa_update(Comment)
+            .where(Comment.id.in_([c.id for c in claimed]))
+            .where(Comment.moderation_status == ModerationStatus.NOT_CHECKED)
+            .values(moderation_status=ModerationStatus.DEFERRED)
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        raise
+    logger.info(f"Отложенные комментарии поставлены в очередь: {len(claimed)}")
+    return len(claimed)
+
+
+def get_existing_product_ids(session: Session, product_ids: List[UUID]) -> set:
+    if not product_ids:
+        return set()
+    statement = select(Product.id).where(Product.id.in_(set(product_ids)))
+    return set(session.exec(statement).all())
+
+
+EXPORT_COLUMNS = ("id", "product_id", "user_id", "rating", "moderation_status", "created_at", "text")
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Время без часового пояса считается UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def iter_comments_for_export(
+        session: Session,
+        product_id: Optional[UUID] = None,
+        moderation_status: Optional[ModerationStatus] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        batch_size: int = 1000
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Отдаёт комментарии пачками по batch_size строк через серверный курсор,
+    не загружая всю выборку в память. since/until ограничивают created_at
+    полуинтервалом [since, until).
+    """
+    statement = select(*(getattr(Comment, column) for column in EXPORT_COLUMNS))
+    if product_id is not None:
+        statement = statement.where(Comment.product_id == product_id)
+    if moderation_status is not None:
+        statement = statement.where(Comment.moderation_status == moderation_status)
+    if since is not None:
+        statement = statement.where(Comment.created_at >= _as_utc(since))
+    if until is not None:
+        statement = statement.where(Comment.created_at < _as_utc(until))
+    statement = statement.order_by(Comment.id).execution_options(yield_per=batch_size)
+
+    result = session.exec(statement)
+    for partition in result.partitions():
+        yield [dict(zip(EXPORT_COLUMNS, row)) for row in partition]
+
+
 def delete_comment(session: Session, comment_id: UUID) -> Optional[Comment]:
     comment = session.get(Comment, comment_id)
     if not comment:
         return None
 
     session.delete(comment)
+    product_stats.on_comment_deleted(session, comment)
     session.commit()
     return comment
 
@@ -49,88 +199,73 @@ def delete_comment(session: Session, comment_id: UUID) -> Optional[Comment]:
 def moderate_comment(
         session: Session, comment_id: UUID, moderation_in: CommentUpdateModeration
 ) -> Optional[Comment]:
-    """Обновляет статус модерации комментария."""
+    """
+    Обновляет статус модерации комментария. Статус меняется условным
+    UPDATE ... WHERE moderation_status = <прочитанный статус>, и счётчики
+    продукта сдвигаются, только если строка действительно обновилась:
+    воркер и администратор, модерирующие комментарий одновременно, не
+    применят одну дельту дважды. Если статус успели изменить, он
+    перечитывается и попытка повторяется.
+    """
     comment = session.get(Comment, comment_id)
     if not comment:
         return None
 
-    comment.moderation_status = moderation_in.moderation_status
-
-    session.add(comment)
+    new_status = moderation_in.moderation_status
+    previous_status = comment.moderation_status
+    while previous_status != new_status:
+        result = session.execute(
+            sa_update(Comment)
+            .where(Comment.id == comment_id)
+            .where(Comment.moderation_status == previous_status)
+            .values(moderation_status=new_status)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            session.expire(comment, ["moderation_status"])
+            product_stats.on_comment_moderated(session, comment, previous_status)
+            break
+        session.refresh(comment)
+        previous_status = comment.moderation_status
     session.commit()
     session.refresh(comment)
+    logger.info(f"Комментарий {comment_id}: {previous_status.value} -> {comment.moderation_status.value} "
+                f"(request_id={get_request_id()})")
     return comment
 
 
 class CommentService:
-    def __init__(self):
-        self.rabbitmq_config = {
-            'host': os.getenv('RABBITMQ_HOST', 'localhost'),
-            'port': int(os.getenv('RABBITMQ_PORT', 5672)),
-            'user': os.getenv('RABBITMQ_USER', 'guest'),
-            'password': os.getenv('RABBITMQ_PASS', 'guest'),
-            'vhost': os.getenv('RABBITMQ_VHOST', '/'),
-            'queue': os.getenv('QUEUE_NAME', 'ml_task_queue')
-        }
-
-    def publish_moderation_task(self, comment_id: str, text: str, user_id: str):
-        """
-        Публикация задачи модерации с правильной аутентификацией
-        """
-        connection = None
+    """
+    Публикует задачи модерации через настроенный транспорт
+    (TASK_TRANSPORT: RabbitMQ или очередь внутри процесса).
+    """
 
-        try:
-            credentials = pika.PlainCredentials(
-                self.rabbitmq_config['user'],
-                self.rabbitmq_config['password']
-            )
-            connection_params = pika.ConnectionParameters(
-                host=self.rabbitmq_config['host'],
-                port=self.rabbitmq_config['port'],
-                virtual_host=self.rabbitmq_config['vhost'],
-                credentials=credentials,
-                heartbeat=600,
-                blocked_connection_timeout=300
-            )
+    def publish_moderation_task(self, comment_id: str, text: str, user_id: str,
+                                product_id: Optional[str] = None, rating: Optional[int] = None):
+        self.publish_moderation_tasks([{"comment_id": comment_id, "text": text, "user_id": user_id,
+                                        "product_id": product_id, "rating": rating}])
 
-            connection = pika.BlockingConnection(connection_params)
-            channel = connection.channel()
-
-            channel.queue_declare(
-                queue=self.rabbitmq_config['queue'],
-                durable=True
-            )
-
-            message = {
-                'task_id': comment_id,
-                'task_type': 'text_classification',
-                'text': text,
-                'user_id': user_id,
-                'timestamp': datetime.utcnow().isoformat()
-            }
-
-            channel.basic_publish(
-                exchange='',
-                routing_key=self.rabbitmq_config['queue'],
-                body=json.dumps(message),
-                properties=pika.BasicProperties(
-                    delivery_mode=2,  # Устойчивость к перезагрузке
-                    content_type='application/json'
-                )
+    def publish_moderation_tasks(self, tasks: List[Dict[str, Any]]):
+        """
+        Публикация пачки задач модерации. ID запроса и время приёма берутся
+        из задачи или из контекста текущего запроса и передаются обработчику
+        вместе с задачей.
+        """
+        transport = get_transport()
+        transport.publish([
+            ModerationTask(
+                comment_id=task['comment_id'],
+                text=task['text'],
+                user_id=task['user_id'],
+                product_id=task.get('product_id'),
+                rating=task.get('rating'),
+                headers=build_trace_headers(task.get('request_id'), task.get('accepted_at'))
             )
-
-            logger.info(f"Задача модерации отправлена для комментария {comment_id}")
-
-        except pika.exceptions.ProbableAuthenticationError as e:
-            logger.error(f"Ошибка аутентификации RabbitMQ: {e}")
-            logger.error(f"Проверьте переменные окружения:")
-            logger.error(f"  RABBITMQ_HOST: {self.rabbitmq_config['host']}")
-            logger.error(f"  RABBITMQ_USER: {self.rabbitmq_config['user']}")
-            logger.error(f"  RABBITMQ_PASSWORD: {'*' * len(self.rabbitmq_config['password'])}")
-            raise
-        except Exception as e:
-            logger.error(f"Ошибка отправки в RabbitMQ: {e}")
-            raise
-        finally:
-            if connection and not connection.is_closed:
-                connection.close()
\ No newline at end of file
+            for task in tasks
+        ])
+        if len(tasks) == 1:
+            logger.info(f"Задача модерации отправлена для комментария {tasks[0]['comment_id']} "
+                        f"через {transport.name} (request_id={get_request_id()})")
+        else:
+            logger.info(f"Отправлено {len(tasks)} задач модерации через {transport.name} "
+                        f"(request_id={get_request_id()})")
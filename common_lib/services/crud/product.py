@@ -4,7 +4,7 @@ from typing import List, Optional
 from uuid import UUID
 from sqlmodel import Session, select
 
-from common_lib.models import Product, ProductCreate
+from common_lib.models import Product, ProductCreate, ProductStats
 
 
 def get_product(session: Session, product_id: UUID) -> Optional[Product]:
@@ -18,6 +18,7 @@ def get_products(session: Session, skip: int = 0, limit: int = 10) -> List[Produ
 
 def create_product(session: Session, product_in: ProductCreate) -> Product:
     db_product = Product.model_validate(product_in)
+    db_product.stats = ProductStats(product_id=db_product.id)
 
     session.add(db_product)
     session.commit()
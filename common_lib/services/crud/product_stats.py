@@ -0,0 +1,121 @@
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import case, func, update
+from sqlmodel import Session, select
+
+from common_lib.models.Comment import Comment, ModerationStatus
+from common_lib.models.Product import Product, ProductStats
+
+logger = logging.getLogger(__name__)
+
+STAT_COLUMNS = ("comment_count", "rating_sum", "approved_count", "rejected_count")
+
+
+def _status_delta(moderation_status: ModerationStatus, sign: int) -> Dict[str, int]:
+    if moderation_status == ModerationStatus.APPROVED:
+        return {"approved_count": sign}
+    if moderation_status == ModerationStatus.REJECTED:
+        return {"rejected_count": sign}
+    return {}
+
+
+def apply_stats_delta(session: Session, product_id: UUID, **deltas: int) -> None:
+    """
+    Атомарно сдвигает счётчики продукта на заданные дельты в текущей транзакции.
+    Коммит выполняет вызывающий код вместе с изменением самого комментария.
+    """
+    deltas = {column: delta for column, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    values = {column: getattr(ProductStats, column) + delta for column, delta in deltas.items()}
+    result = session.execute(
+        update(ProductStats).where(ProductStats.product_id == product_id).values(**values)
+    )
+    if result.rowcount == 0:
+        logger.info(f"Stats row for product {product_id} is missing, creating it")
+        session.add(ProductStats(product_id=product_id, **deltas))
+        session.flush()
+
+
+def on_comment_created(session: Session, comment: Comment) -> None:
+    apply_stats_delta(
+        session, comment.product_id,
+        comment_count=1, rating_sum=comment.rating,
+        **_status_delta(comment.moderation_status, 1)
+    )
+
+
+def on_comments_created(session: Session, comments: Iterable[Comment]) -> None:
+    per_product: Dict[UUID, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for comment in comments:
+        deltas = per_product[comment.product_id]
+        deltas["comment_count"] += 1
+        deltas["rating_sum"] += comment.rating
+        for column, delta in _status_delta(comment.moderation_status, 1).items():
+            deltas[column] += delta
+    for product_id, deltas in per_product.items():
+        apply_stats_delta(session, product_id, **deltas)
+
+
+def on_comment_deleted(session: Session, comment: Comment) -> None:
+    apply_stats_delta(
+        session, comment.product_id,
+        comment_count=-1, rating_sum=-comment.rating,
+        **_status_delta(comment.moderation_status, -1)
+    )
+
+
+def on_comment_moderated(session: Session, comment: Comment, previous_status: ModerationStatus) -> None:
+    if previous_status == comment.moderation_status:
+        return
+    deltas = defaultdict(int)
+    for column, delta in _status_delta(previous_status, -1).items():
+        deltas[column] += delta
+    for column, delta in _status_delta(comment.moderation_status, 1).items():
+        deltas[column] += delta
+    apply_stats_delta(session, comment.product_id, **deltas)
+
+
+def get_product_stats(session: Session, product_id: UUID) -> Optional[ProductStats]:
+    return session.get(ProductStats, product_id)
+
+
+def rebuild_product_stats(session: Session, only_missing: bool = True) -> int:
+    """
+    Пересчитывает агрегаты по таблице комментариев. По умолчанию только для
+    продуктов, у которых ещё нет строки статистики (например, созданных до
+    появления этой таблицы). Возвращает число записанных строк.
+    """
+    if not only_missing:
+        session.execute(ProductStats.__table__.delete())
+
+    missing_ids = session.exec(
+        select(Product.id).where(Product.id.not_in(select(ProductStats.product_id)))
+    ).all()
+    if not missing_ids:
+        return 0
+
+    aggregates: Dict[UUID, Tuple[int, int, int, int]] = {}
+    statement = (
+        select(
+            Comment.product_id,
+            func.count(Comment.id),
+            func.coalesce(func.sum(Comment.rating), 0),
+            func.sum(case((Comment.moderation_status == ModerationStatus.APPROVED, 1), else_=0)),
+            func.sum(case((Comment.moderation_status == ModerationStatus.REJECTED, 1), else_=0)),
+        )
+        .where(Comment.product_id.in_(missing_ids))
+        .group_by(Comment.product_id)
+    )
+    for product_id, *values in session.exec(statement).all():
+        aggregates[product_id] = tuple(int(value or 0) for value in values)
+
+    for product_id in missing_ids:
+        values = aggregates.get(product_id, (0, 0, 0, 0))
+        session.add(ProductStats(product_id=product_id, **dict(zip(STAT_COLUMNS, values))))
+    session.commit()
+    logger.info(f"Rebuilt review stats for {len(missing_ids)} product(s)")
+    return len(missing_ids)
@@ -5,7 +5,9 @@ from typing import Optional, List
 from passlib.context import CryptContext
 
 from sqlmodel import Session, select
-from common_lib.models import User, UserCreate, UserOut
+from common_lib.models import User, UserCreate, UserOut, RoleEnum
+from common_lib.services.auth.password_pool import password_pool
+from common_lib.services.auth.user_cache import user_cache
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s"
@@ -22,14 +24,34 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def create_user(session: Session, user_in: UserCreate) -> UserOut:
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_pool.run(get_password_hash, password)
+
+
+def _ensure_email_free(session: Session, user_in: UserCreate) -> None:
     existing_user = get_user_by_email(session, user_in.email)
     if existing_user:
         logger.warning(f"Attempted to create user '{user_in.email}' which already exists.")
         raise ValueError(f"User with email {user_in.email} already exists")
-        pass
 
+
+def create_user(session: Session, user_in: UserCreate) -> UserOut:
+    _ensure_email_free(session, user_in)
     hashed_password = get_password_hash(user_in.password)
+    return _insert_user(session, user_in, hashed_password)
+
+
+async def create_user_async(session: Session, user_in: UserCreate) -> UserOut:
+    _ensure_email_free(session, user_in)
+    hashed_password = await get_password_hash_async(user_in.password)
+    return _insert_user(session, user_in, hashed_password)
+
+
+def _insert_user(session: Session, user_in: UserCreate, hashed_password: str) -> UserOut:
     db_user = User(
         email=user_in.email,
         hashed_password=hashed_password,
@@ -40,10 +62,25 @@ def create_user(session: Session, user_in: UserCreate) -> UserOut:
     session.add(db_user)
     session.commit()
     session.refresh(db_user)
+    user_cache.invalidate_email(db_user.email)
     logger.info(f"User '{db_user.email}' created successfully with ID {db_user.id}")
     return UserOut.from_orm(db_user)
 
 
+def update_user_role(session: Session, user_id: uuid.UUID, role: RoleEnum) -> Optional[UserOut]:
+    user = session.get(User, user_id)
+    if not user:
+        return None
+
+    user.role = role
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    user_cache.invalidate_email(user.email)
+    logger.info(f"User '{user.email}' role changed to '{role.value}'")
+    return UserOut.from_orm(user)
+
+
 def get_user_by_id(session: Session, user_id: uuid.UUID) -> Optional[UserOut]:
     user = session.get(User, user_id)
     return UserOut.from_orm(user)
@@ -77,6 +114,18 @@ def authenticate_user(session: Session, email: str, password: str) -> Optional[U
     return UserOut.from_orm(user)
 
 
+async def authenticate_user_async(session: Session, email: str, password: str) -> Optional[UserOut]:
+    user = get_user_by_email_raw(session, email)
+    if not user:
+        logger.warning(f"Authentication failed: User '{email}' not found.")
+        return None
+    if not await verify_password_async(password, user.hashed_password):
+        logger.warning(f"Authentication failed: Incorrect password for user '{email}'.")
+        return None
+    logger.info(f"User '{email}' authenticated successfully.")
+    return UserOut.from_orm(user)
+
+
 def ensure_user(session: Session, user: UserCreate) -> UserOut:
     existing_user = get_user_by_email(session, user.email)
     if not existing_user:
@@ -0,0 +1,227 @@
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+
+from sqlmodel import Session
+
+from common_lib.database.config import get_settings
+from common_lib.database.instrumentation import record_unit_of_work, track_queries
+from common_lib.metrics import register_metrics_provider
+from common_lib.models import ModerationStatus
+from common_lib.models.Comment import CommentUpdateModeration
+from common_lib.services.crud.comment import moderate_comment
+from common_lib.services.signals.near_duplicates import NearDuplicateIndex
+from common_lib.services.signals.trending_phrases import TrendingPhraseTracker
+from common_lib.services.signals.user_features import BehaviorFeatureStore
+from common_lib.services.tracing import bind_request, hop_latency, read_trace_headers, reset_request
+from common_lib.services.transport.base import ModerationTask
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def _default_session_factory() -> Session:
+    from common_lib.database.database import engine
+
+    return Session(engine)
+
+
+class ModerationProcessor:
+    """
+    Scores a moderation task and writes the resulting status. Shared by the
+    ml_worker (RabbitMQ) and the in-process transport, so both paths apply
+    the same label mapping, signals, tracing and query accounting.
+
+    ``predict_label`` returns the model label for a text; 0 means the review
+    is computer generated and the comment is rejected. In-memory signal
+    stores (``near_duplicates``, ``behavior_features``, ``trending_phrases``)
+    are fed from the task stream and can override an approval; they are snapshotted to ``snapshot_dir`` every
+    ``snapshot_every`` tasks and on ``snapshot()``.
+    """
+
+    def __init__(self, predict_label: Callable[[str], int],
+                 session_factory: Callable[[], Session] = _default_session_factory,
+                 summary_every: int = 100, unit_name: str = "moderation task",
+                 near_duplicates: Optional[NearDuplicateIndex] = None, reject_cluster_size: int = 0,
+                 snapshot_dir: Optional[str] = None, snapshot_every: int = 0,
+                 behavior_features: Optional[BehaviorFeatureStore] = None,
+                 reject_user_reviews_in_window: int = 0, reject_five_star_streak: int = 0,
+                 trending_phrases: Optional[TrendingPhraseTracker] = None, reject_trending_phrases: int = 0):
+        self.predict_label = predict_label
+        self.session_factory = session_factory
+        self.summary_every = summary_every
+        self.unit_name = unit_name
+        self.near_duplicates = near_duplicates
+        self.reject_cluster_size = reject_cluster_size
+        self.snapshot_dir = snapshot_dir
+        self.snapshot_every = snapshot_every
+        self.behavior_features = behavior_features
+        self.reject_user_reviews_in_window = reject_user_reviews_in_window
+        self.reject_five_star_streak = reject_five_star_streak
+        self.trending_phrases = trending_phrases
+        self.reject_trending_phrases = reject_trending_phrases
+        self._traced = 0
+        self._handled = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, predict_label: Callable[[str], int], **kwargs) -> "ModerationProcessor":
+        """Builds a processor with the signal stores enabled in settings, restoring their snapshots."""
+        if settings.NEAR_DUPLICATE_ENABLED:
+            index = NearDuplicateIndex(
+                threshold=settings.NEAR_DUPLICATE_THRESHOLD,
+                num_perm=settings.NEAR_DUPLICATE_NUM_PERM,
+                max_items=settings.NEAR_DUPLICATE_MAX_ITEMS,
+            )
+            kwargs.setdefault("near_duplicates", index)
+            kwargs.setdefault("reject_cluster_size", settings.NEAR_DUPLICATE_REJECT_CLUSTER_SIZE)
+            register_metrics_provider("near_duplicates", index.stats)
+        if settings.BEHAVIOR_FEATURES_ENABLED:
+            store = BehaviorFeatureStore(
+                window_seconds=settings.BEHAVIOR_WINDOW_SECONDS,
+                buckets=settings.BEHAVIOR_WINDOW_BUCKETS,
+                max_entities=settings.BEHAVIOR_MAX_ENTITIES,
+            )
+            kwargs.setdefault("behavior_features", store)
+            kwargs.setdefault("reject_user_reviews_in_window", settings.BEHAVIOR_REJECT_USER_REVIEWS_IN_WINDOW)
+            kwargs.setdefault("reject_five_star_streak", settings.BEHAVIOR_REJECT_FIVE_STAR_STREAK)
+            register_metrics_provider("behavior_features", store.stats)
+        if settings.TRENDING_PHRASES_ENABLED:
+            tracker = TrendingPhraseTracker(
+                width=settings.TRENDING_SKETCH_WIDTH,
+                depth=settings.TRENDING_SKETCH_DEPTH,
+                top_k=settings.TRENDING_TOP_K,
+                half_life_seconds=settings.TRENDING_HALF_LIFE_SECONDS,
+                min_count=settings.TRENDING_MIN_COUNT,
+            )
+            kwargs.setdefault("trending_phrases", tracker)
+            kwargs.setdefault("reject_trending_phrases", settings.TRENDING_REJECT_MIN_PHRASES)
+            register_metrics_provider("trending_phrases", tracker.stats)
+        kwargs.setdefault("snapshot_dir", settings.SIGNALS_SNAPSHOT_DIR)
+        kwargs.setdefault("snapshot_every", settings.SIGNALS_SNAPSHOT_EVERY)
+        processor = cls(predict_label, **kwargs)
+        processor.restore()
+        return processor
+
+    def _snapshot_targets(self) -> Dict[str, Any]:
+        stores = {"near_duplicates": self.near_duplicates, "behavior_features": self.behavior_features,
+                  "trending_phrases": self.trending_phrases}
+        return {name: store for name, store in stores.items() if store is not None}
+
+    def _snapshot_path(self, name: str) -> str:
+        suffix = getattr(self._snapshot_targets()[name], "snapshot_suffix", ".npz")
+        return os.path.join(self.snapshot_dir, f"{name}{suffix}")
+
+    def restore(self) -> None:
+        if not self.snapshot_dir:
+            return
+        for name, store in self._snapshot_targets().items():
+            try:
+                store.load(self._snapshot_path(name))
+            except Exception as e:
+                logger.error(f"Failed to restore {name} snapshot: {e}")
+
+    def snapshot(self) -> None:
+        if not self.snapshot_dir:
+            return
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        for name, store in self._snapshot_targets().items():
+            try:
+                store.save(self._snapshot_path(name))
+            except Exception as e:
+                logger.error(f"Failed to save {name} snapshot: {e}")
+
+    def handle(self, task: ModerationTask) -> Optional[ModerationStatus]:
+        tokens = bind_request(task.request_id)
+        try:
+            with track_queries() as query_stats:
+                status = self._process(task)
+            record_unit_of_work(self.unit_name, query_stats)
+        finally:
+            reset_request(tokens)
+        self._record_trace(task)
+        with self._lock:
+            self._handled += 1
+            due = self.snapshot_every > 0 and self._handled % self.snapshot_every == 0
+        if due:
+            self.snapshot()
+        return status
+
+    def collect_signals(self, task: ModerationTask) -> Dict[str, Any]:
+        """Updates the in-memory stores with the task and returns its behavioral signals."""
+        signals: Dict[str, Any] = {}
+        if self.near_duplicates is not None:
+            match = self.near_duplicates.insert(task.comment_id, task.text)
+            signals["near_duplicate_cluster_size"] = match.cluster_size if match else 1
+        # Время события — момент приёма запроса, а не обработки: очередь не должна сжимать всплеск
+        timestamps = read_trace_headers(task.headers)["timestamps"]
+        at = timestamps.get("accepted", timestamps.get("published"))
+        if self.behavior_features is not None:
+            self.behavior_features.update(task.comment_id, task.user_id, task.product_id, task.rating, at)
+            user = self.behavior_features.user_features(task.user_id, at)
+            signals["user_reviews_in_window"] = user["reviews_in_window"]
+            signals["user_distinct_products"] = user["distinct"]
+            signals["user_five_star_streak"] = user["five_star_streak"]
+            signals["product_reviews_in_window"] = self.behavior_features.product_features(
+                task.product_id, at)["reviews_in_window"]
+        if self.trending_phrases is not None:
+            signals["trending_phrases"] = self.trending_phrases.observe(task.text, at, task.comment_id)
+        return signals
+
+    def decide(self, label: int, signals: Dict[str, Any]) -> ModerationStatus:
+        if label == 0:
+            return ModerationStatus.REJECTED
+        cluster_size = signals.get("near_duplicate_cluster_size", 1)
+        if 0 < self.reject_cluster_size <= cluster_size:
+            logger.info(f"Отклонено как почти дубликат: кластер из {cluster_size} текстов")
+            return ModerationStatus.REJECTED
+        user_reviews = signals.get("user_reviews_in_window", 0)
+        if 0 < self.reject_user_reviews_in_window < user_reviews:
+            logger.info(f"Отклонено как всплеск: {user_reviews} отзывов пользователя в окне")
+            return ModerationStatus.REJECTED
+        streak = signals.get("user_five_star_streak", 0)
+        if 0 < self.reject_five_star_streak <= streak:
+            logger.info(f"Отклонено: {streak} оценок 5 подряд от пользователя")
+            return ModerationStatus.REJECTED
+        trending = signals.get("trending_phrases", [])
+        if 0 < self.reject_trending_phrases <= len(trending):
+            logger.info(f"Отклонено как часть кампании: трендовые фразы {trending[:5]}")
+            return ModerationStatus.REJECTED
+        return ModerationStatus.APPROVED
+
+    def _process(self, task: ModerationTask) -> Optional[ModerationStatus]:
+        if not task.text:
+            raise ValueError("Текст для анализа не предоставлен")
+        comment_id = UUID(task.comment_id)
+
+        signals = self.collect_signals(task)
+        label = self.predict_label(task.text)
+        task.mark("scored")
+        logger.info(f"Задача {task.comment_id} успешно обработана, результат: {label}, сигналы: {signals}")
+
+        new_status = self.decide(label, signals)
+        with self.session_factory() as session:
+            comment = moderate_comment(session, comment_id, CommentUpdateModeration(moderation_status=new_status))
+        task.mark("persisted")
+        if comment is None:
+            logger.warning(f"Комментарий {task.comment_id} не найден, статус не записан")
+            return None
+        return new_status
+
+    def _record_trace(self, task: ModerationTask) -> None:
+        """
+        Записывает разбивку задержки по этапам и периодически выводит сводку
+        гистограмм в лог.
+        """
+        trace = read_trace_headers(task.headers)
+        breakdown = hop_latency.record(trace["timestamps"])
+        logger.info(f"Trace request_id={trace['request_id']}: "
+                    + ", ".join(f"{hop}={ms:.1f}ms" for hop, ms in breakdown.items()))
+        with self._lock:
+            self._traced += 1
+            traced = self._traced
+        if self.summary_every > 0 and traced % self.summary_every == 0:
+            logger.info(f"Time-to-moderation summary after {traced} tasks: {json.dumps(hop_latency.stats())}")
@@ -1,5 +1,5 @@
 import asyncio
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 import aio_pika
 import pika
@@ -51,6 +51,18 @@ async def connect_rabbitmq():
         raise
 
 
+async def sample_queue_load() -> Tuple[int, int]:
+    """
+    Пассивно объявляет очередь модерации на уже открытом канале и возвращает
+    (число сообщений, число потребителей), не изменяя саму очередь.
+    """
+    if channel is None or channel.is_closed:
+        raise RuntimeError("RabbitMQ channel is not available")
+    queue = await channel.declare_queue(QUEUE_NAME, passive=True)
+    result = queue.declaration_result
+    return result.message_count, result.consumer_count
+
+
 async def close_rabbitmq():
     global connection
     if connection:
@@ -0,0 +1,254 @@
+"""
+MinHash-LSH index of recent review texts.
+
+Each text is reduced to character shingles of its normalized form and
+summarized by a MinHash signature of ``num_perm`` values. The signature is
+split into ``bands`` x ``rows``; texts that agree on every row of at least
+one band share an LSH bucket and become candidates. Only candidates are
+compared (by estimated Jaccard similarity), so an insert costs roughly the
+number of true near-duplicates instead of the size of the index.
+
+Matching texts are grouped into clusters; the size of a text's cluster is
+what moderation uses as the copy-paste signal. The index keeps the last
+``max_items`` texts and forgets the oldest ones first.
+"""
+import logging
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_NON_WORD = re.compile(r"[^\w]+")
+SNAPSHOT_VERSION = 1
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+def shingles(text: str, size: int) -> Set[str]:
+    normalized = normalize_text(text)
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def _integrate(y: np.ndarray, x: np.ndarray) -> float:
+    if len(x) < 2:
+        return 0.0
+    return float(np.sum((y[1:] + y[:-1]) / 2 * np.diff(x)))
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Picks (bands, rows) with bands * rows <= num_perm that minimizes the sum
+    of false positive and false negative probability around ``threshold``.
+    """
+    grid = np.linspace(0.0, 1.0, 201)
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        probability = 1 - (1 - grid ** rows) ** bands
+        below = grid < threshold
+        false_positive = _integrate(probability[below], grid[below])
+        false_negative = _integrate(1 - probability[~below], grid[~below])
+        error = false_positive + false_negative
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+@dataclass
+class DuplicateMatch:
+    comment_id: str
+    cluster_id: str
+    cluster_size: int
+    matches: List[Tuple[str, float]]
+
+
+class NearDuplicateIndex:
+    """
+    Thread-safe in-memory MinHash-LSH index with clustering and FIFO eviction.
+    """
+
+    def __init__(self, threshold: float = 0.7, num_perm: int = 128, shingle_size: int = 5,
+                 max_items: int = 100000, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.max_items = max_items
+        self.seed = seed
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=(num_perm, 1)).astype(np.uint64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=(num_perm, 1)).astype(np.uint64)
+
+        self._signatures: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+        self._cluster_of: Dict[str, str] = {}
+        self._clusters: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._inserts = 0
+        self._candidates_checked = 0
+        self._duplicates = 0
+        self._evictions = 0
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        tokens = shingles(text, self.shingle_size)
+        if not tokens:
+            return None
+        hashes = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in tokens),
+                             dtype=np.uint64, count=len(tokens))
+        # a < 2^31 и hash < 2^32, поэтому произведение помещается в uint64
+        permuted = (self._a * hashes[np.newaxis, :] + self._b) % _MERSENNE_PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def insert(self, comment_id: str, text: str) -> Optional[DuplicateMatch]:
+        """
+        Adds the text and returns its cluster. Re-inserting a known id (for
+        example a redelivered task) returns the existing cluster unchanged.
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        with self._lock:
+            if comment_id in self._signatures:
+                cluster_id = self._cluster_of[comment_id]
+                return DuplicateMatch(comment_id, cluster_id, len(self._clusters[cluster_id]), [])
+
+            candidates: Set[str] = set()
+            keys = self._band_keys(signature)
+            for key in keys:
+                candidates.update(self._buckets.get(key, ()))
+            self._candidates_checked += len(candidates)
+            matches = []
+            for candidate in candidates:
+                similarity = float(np.mean(self._signatures[candidate] == signature))
+                if similarity >= self.threshold:
+                    matches.append((candidate, similarity))
+            matches.sort(key=lambda match: -match[1])
+
+            self._signatures[comment_id] = signature
+            for key in keys:
+                self._buckets.setdefault(key, set()).add(comment_id)
+            cluster_id = self._join_clusters(comment_id, [candidate for candidate, _ in matches])
+            self._inserts += 1
+            if matches:
+                self._duplicates += 1
+
+            while len(self._signatures) > self.max_items:
+                self._evict_oldest()
+            return DuplicateMatch(comment_id, cluster_id, len(self._clusters.get(cluster_id, ())), matches)
+
+    def _join_clusters(self, comment_id: str, matched: List[str]) -> str:
+        cluster_ids = {self._cluster_of[candidate] for candidate in matched}
+        if not cluster_ids:
+            self._cluster_of[comment_id] = comment_id
+            self._clusters[comment_id] = {comment_id}
+            return comment_id
+        # Меньшие кластеры переносятся в наибольший
+        target = max(cluster_ids, key=lambda cid: len(self._clusters[cid]))
+        for cluster_id in cluster_ids - {target}:
+            for member in self._clusters.pop(cluster_id):
+                self._cluster_of[member] = target
+                self._clusters[target].add(member)
+        self._cluster_of[comment_id] = target
+        self._clusters[target].add(comment_id)
+        return target
+
+    def _evict_oldest(self) -> None:
+        comment_id, signature = self._signatures.popitem(last=False)
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(comment_id)
+                if not bucket:
+                    del self._buckets[key]
+        cluster_id = self._cluster_of.pop(comment_id)
+        members = self._clusters[cluster_id]
+        members.discard(comment_id)
+        if not members:
+            del self._clusters[cluster_id]
+        self._evictions += 1
+
+    def cluster_size(self, comment_id: str) -> int:
+        with self._lock:
+            cluster_id = self._cluster_of.get(comment_id)
+            return len(self._clusters[cluster_id]) if cluster_id is not None else 0
+
+    def clusters(self, min_size: int = 2) -> List[List[str]]:
+        with self._lock:
+            return [sorted(members) for members in self._clusters.values() if len(members) >= min_size]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "size": len(self._signatures),
+                "max_items": self.max_items,
+                "threshold": self.threshold,
+                "bands": self.bands,
+                "rows": self.rows,
+                "buckets": len(self._buckets),
+                "clusters_with_duplicates": sum(1 for members in self._clusters.values() if len(members) > 1),
+                "largest_cluster": max((len(members) for members in self._clusters.values()), default=0),
+                "inserts": self._inserts,
+                "duplicates": self._duplicates,
+                "avg_candidates": self._candidates_checked / self._inserts if self._inserts else 0.0,
+                "evictions": self._evictions,
+            }
+
+    def _config(self) -> np.ndarray:
+        return np.array([SNAPSHOT_VERSION, self.num_perm, self.shingle_size, self.seed, self.bands, self.rows],
+                        dtype=np.int64)
+
+    def save(self, path: str) -> None:
+        """Writes signatures and cluster ids in insertion order (atomically)."""
+        with self._lock:
+            ids = list(self._signatures)
+            signatures = (np.stack(list(self._signatures.values())) if ids
+                          else np.empty((0, self.num_perm), dtype=np.uint32))
+            cluster_ids = [self._cluster_of[comment_id] for comment_id in ids]
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, config=self._config(), ids=np.array(ids, dtype=str),
+                                signatures=signatures, cluster_ids=np.array(cluster_ids, dtype=str))
+        os.replace(tmp, path)
+        logger.info(f"Near-duplicate index snapshot saved: {len(ids)} item(s) -> {path}")
+
+    def load(self, path: str) -> bool:
+        """
+        Restores a snapshot written with the same parameters. Returns False
+        if the file is missing or was built with different parameters.
+        """
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as data:
+            if not np.array_equal(data["config"], self._config()):
+                logger.warning(f"Near-duplicate snapshot {path} was built with other parameters, ignoring it")
+                return False
+            ids, signatures, cluster_ids = data["ids"].tolist(), data["signatures"], data["cluster_ids"].tolist()
+        with self._lock:
+            for comment_id, signature, cluster_id in zip(ids, signatures, cluster_ids):
+                self._signatures[comment_id] = signature
+                for key in self._band_keys(signature):
+                    self._buckets.setdefault(key, set()).add(comment_id)
+                self._cluster_of[comment_id] = cluster_id
+                self._clusters.setdefault(cluster_id, set()).add(comment_id)
+            while len(self._signatures) > self.max_items:
+                self._evict_oldest()
+        logger.info(f"Near-duplicate index restored from {path}: {len(ids)} item(s)")
+        return True
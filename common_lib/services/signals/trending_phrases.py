@@ -0,0 +1,241 @@
+"""
+Streaming detection of phrases trending across recent reviews.
+
+Coordinated campaigns reuse the same wording across many new reviews. Each
+review is cleaned with ``TextCleaner`` and reduced to its distinct word
+n-grams; every n-gram is counted once per review in a count-min sketch of
+``depth`` x ``width`` cells, so memory does not grow with traffic. Counts
+decay exponentially with ``half_life_seconds``, which turns the sketch into
+a soft sliding window: a phrase repeated in a burst stands out, the same
+phrase spread over weeks does not.
+
+Next to the sketch a table of at most ``top_k`` phrases with the largest
+estimates is maintained (the heavy hitters). A phrase is trending when its
+decayed count reaches ``min_count``; checking a review against the trending
+set is a dictionary lookup per n-gram. A comment id seen recently (a
+redelivered task) is checked against the trending set but not counted again.
+
+Decay uses forward scaling: an update at time ``t`` adds
+``2 ** ((t - landmark) / half_life)`` instead of decaying every cell, and
+reads divide by the same factor. The landmark is moved (and the table
+rescaled once) before the factor grows large.
+"""
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from common_lib.data.text_cleaner import TextCleaner
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_MAX_EXPONENT = 64
+SNAPSHOT_VERSION = 1
+CLEANING_METHODS = ['lower', 'remove_punctuation', 'remove_numbers', 'remove_whitespace']
+
+
+def ngrams(tokens: List[str], ngram_range: Tuple[int, int]) -> Set[str]:
+    low, high = ngram_range
+    return {" ".join(tokens[i:i + n]) for n in range(low, high + 1) for i in range(len(tokens) - n + 1)}
+
+
+class TrendingPhraseTracker:
+    """
+    Thread-safe time-decayed count-min sketch with top-k heavy hitters.
+    """
+
+    def __init__(self, width: int = 16384, depth: int = 4, top_k: int = 100,
+                 half_life_seconds: float = 900.0, min_count: float = 20.0,
+                 ngram_range: Tuple[int, int] = (3, 4), seed: int = 1,
+                 cleaner: Optional[TextCleaner] = None, max_recent_ids: int = 100000):
+        if half_life_seconds <= 0:
+            raise ValueError("half_life_seconds должен быть положительным")
+        self.width = width
+        self.depth = depth
+        self.top_k = top_k
+        self.half_life_seconds = float(half_life_seconds)
+        self.min_count = min_count
+        self.ngram_range = tuple(ngram_range)
+        self.seed = seed
+        self.max_recent_ids = max_recent_ids
+        self.cleaner = cleaner if cleaner is not None else TextCleaner(methods=CLEANING_METHODS)
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=(depth, 1)).astype(np.uint64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=(depth, 1)).astype(np.uint64)
+        self._rows = np.arange(depth)[:, np.newaxis]
+
+        self._table = np.zeros((depth, width), dtype=np.float64)
+        self._landmark: Optional[float] = None
+        self._top: Dict[str, float] = {}
+        self._floor_key: Optional[str] = None
+        self._recent_ids: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._reviews = 0
+        self._phrases = 0
+        self._repeated = 0
+
+    def phrases(self, text: str) -> Set[str]:
+        return ngrams(self.cleaner.clean_text(text).split(), self.ngram_range)
+
+    def _columns(self, phrases: List[str]) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(phrase.encode("utf-8")) for phrase in phrases),
+                             dtype=np.uint64, count=len(phrases))
+        return ((self._a * hashes[np.newaxis, :] + self._b) % _MERSENNE_PRIME % self.width).astype(np.intp)
+
+    def _scale(self, at: float) -> float:
+        if self._landmark is None:
+            self._landmark = at
+        exponent = (at - self._landmark) / self.half_life_seconds
+        if exponent > _MAX_EXPONENT:
+            # Переносим точку отсчёта: все значения умножаются на один множитель
+            factor = 2.0 ** -exponent
+            self._table *= factor
+            self._top = {phrase: count * factor for phrase, count in self._top.items()}
+            self._landmark = at
+            return 1.0
+        return 2.0 ** exponent
+
+    def _trending_among(self, phrases: List[str], scale: float) -> List[str]:
+        threshold = self.min_count * scale
+        trending = [(self._top[phrase], phrase) for phrase in phrases
+                    if self._top.get(phrase, 0.0) >= threshold]
+        return [phrase for _, phrase in sorted(trending, reverse=True)]
+
+    def observe(self, text: str, at: Optional[float] = None, comment_id: Optional[str] = None) -> List[str]:
+        """
+        Counts the review's phrases and returns those that are trending
+        after the update, most frequent first. A ``comment_id`` seen
+        recently is not counted again.
+        """
+        phrases = sorted(self.phrases(text))
+        if not phrases:
+            return []
+        at = time.time() if at is None else at
+        columns = self._columns(phrases)
+        with self._lock:
+            scale = self._scale(at)
+            if comment_id is not None:
+                if comment_id in self._recent_ids:
+                    self._repeated += 1
+                    return self._trending_among(phrases, scale)
+                self._recent_ids[comment_id] = None
+                while len(self._recent_ids) > self.max_recent_ids:
+                    self._recent_ids.popitem(last=False)
+            # Разные фразы отзыва могут попасть в одну ячейку; np.add.at учтёт каждую
+            np.add.at(self._table, (self._rows, columns), scale)
+            estimates = self._table[self._rows, columns].min(axis=0)
+            for phrase, estimate in zip(phrases, estimates):
+                self._offer(phrase, float(estimate))
+            self._reviews += 1
+            self._phrases += len(phrases)
+            return self._trending_among(phrases, scale)
+
+    def _offer(self, phrase: str, estimate: float) -> None:
+        # Оценки только растут (прямое масштабирование), поэтому минимум
+        # пересчитывается, лишь когда меняется сам минимальный элемент
+        if phrase in self._top:
+            self._top[phrase] = estimate
+            if phrase == self._floor_key:
+                self._floor_key = min(self._top, key=self._top.get)
+        elif len(self._top) < self.top_k:
+            self._top[phrase] = estimate
+            if len(self._top) == self.top_k:
+                self._floor_key = min(self._top, key=self._top.get)
+        elif estimate > self._top[self._floor_key]:
+            del self._top[self._floor_key]
+            self._top[phrase] = estimate
+            self._floor_key = min(self._top, key=self._top.get)
+
+    def contains_trending(self, text: str, at: Optional[float] = None) -> List[str]:
+        """Trending phrases of a text without counting it."""
+        at = time.time() if at is None else at
+        phrases = sorted(self.phrases(text))
+        with self._lock:
+            if self._landmark is None:
+                return []
+            return self._trending_among(phrases, self._scale(at))
+
+    def estimate(self, phrase: str, at: Optional[float] = None) -> float:
+        """Decayed number of recent reviews containing the phrase (an upper bound)."""
+        at = time.time() if at is None else at
+        columns = self._columns([phrase])
+        with self._lock:
+            if self._landmark is None:
+                return 0.0
+            return float(self._table[self._rows, columns].min()) / self._scale(at)
+
+    def trending(self, limit: Optional[int] = None, at: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Currently trending phrases with their decayed counts, most frequent first."""
+        at = time.time() if at is None else at
+        with self._lock:
+            if self._landmark is None:
+                return []
+            scale = self._scale(at)
+            current = sorted(((count / scale, phrase) for phrase, count in self._top.items()), reverse=True)
+        result = [(phrase, count) for count, phrase in current if count >= self.min_count]
+        return result[:limit] if limit is not None else result
+
+    def stats(self) -> Dict[str, float]:
+        trending = self.trending(limit=10)
+        with self._lock:
+            return {
+                "width": self.width,
+                "depth": self.depth,
+                "table_bytes": self._table.nbytes,
+                "top_k": self.top_k,
+                "half_life_seconds": self.half_life_seconds,
+                "min_count": self.min_count,
+                "reviews": self._reviews,
+                "repeated_reviews": self._repeated,
+                "avg_phrases_per_review": self._phrases / self._reviews if self._reviews else 0.0,
+                "trending": [{"phrase": phrase, "count": round(count, 2)} for phrase, count in trending],
+            }
+
+    def _config(self) -> np.ndarray:
+        return np.array([SNAPSHOT_VERSION, self.width, self.depth, self.seed, *self.ngram_range,
+                         self.half_life_seconds], dtype=np.float64)
+
+    def save(self, path: str) -> None:
+        """Writes the sketch and the heavy hitters (atomically)."""
+        with self._lock:
+            table = self._table.copy()
+            landmark = np.array([np.nan if self._landmark is None else self._landmark])
+            phrases, counts = list(self._top), list(self._top.values())
+            recent_ids = list(self._recent_ids)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, config=self._config(), table=table, landmark=landmark,
+                                phrases=np.array(phrases, dtype=str), counts=np.array(counts, dtype=np.float64),
+                                recent_ids=np.array(recent_ids, dtype=str))
+        os.replace(tmp, path)
+        logger.info(f"Trending phrase snapshot saved: {len(phrases)} heavy hitter(s) -> {path}")
+
+    def load(self, path: str) -> bool:
+        """
+        Restores a snapshot written with the same parameters. Returns False
+        if the file is missing or was built with different parameters.
+        """
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as data:
+            if not np.array_equal(data["config"], self._config()):
+                logger.warning(f"Trending phrase snapshot {path} was built with other parameters, ignoring it")
+                return False
+            table, landmark = data["table"], float(data["landmark"][0])
+            top = dict(zip(data["phrases"].tolist(), data["counts"].tolist()))
+            recent_ids = data["recent_ids"].tolist() if "recent_ids" in data.files else []
+        with self._lock:
+            self._table = table
+            self._landmark = None if np.isnan(landmark) else landmark
+            self._top = dict(sorted(top.items(), key=lambda item: -item[1])[:self.top_k])
+            self._floor_key = min(self._top, key=self._top.get) if self._top else None
+            for comment_id in recent_ids[-self.max_recent_ids:]:
+                self._recent_ids[comment_id] = None
+        logger.info(f"Trending phrases restored from {path}: {len(top)} heavy hitter(s)")
+        return True
@@ -0,0 +1,257 @@
+"""
+Sliding-window behavioral features per user and per product.
+
+Burst posting (many reviews from one account within minutes, a run of
+5-star ratings, one product suddenly reviewed by many fresh accounts) is a
+strong fake-review signal that the text model cannot see. The store keeps,
+for every recently active user and product, a ring of ``buckets`` time
+buckets covering the last ``window_seconds``: review count and rating
+histogram per bucket, with running totals so reading the features does not
+scan history. Distinct counterparties (products of a user, users of a
+product) are tracked by last-seen time and capped at ``max_distinct``.
+
+Memory is bounded: at most ``max_entities`` users and products are kept,
+least recently active first out. Expired buckets are cleared lazily on the
+next update or read, which costs at most ``buckets`` steps.
+"""
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+RATINGS = (1, 2, 3, 4, 5)
+
+
+class _Window:
+    """Ring of time buckets for one entity. Not thread-safe on its own."""
+
+    __slots__ = ("slots", "counts", "ratings", "total", "rating_totals", "newest", "seen", "five_star_streak")
+
+    def __init__(self, buckets: int):
+        self.slots = [-1] * buckets
+        self.counts = [0] * buckets
+        self.ratings = [[0] * len(RATINGS) for _ in range(buckets)]
+        self.total = 0
+        self.rating_totals = [0] * len(RATINGS)
+        self.newest = -1
+        self.seen: "OrderedDict[str, float]" = OrderedDict()
+        self.five_star_streak = 0
+
+    def _clear(self, index: int) -> None:
+        self.total -= self.counts[index]
+        for i, value in enumerate(self.ratings[index]):
+            self.rating_totals[i] -= value
+        self.counts[index] = 0
+        self.ratings[index] = [0] * len(RATINGS)
+        self.slots[index] = -1
+
+    def advance(self, slot: int) -> None:
+        """Clears buckets that fell out of the window ending at ``slot``."""
+        if slot <= self.newest:
+            return
+        buckets = len(self.slots)
+        for step in range(min(slot - self.newest, buckets)):
+            index = (self.newest + 1 + step) % buckets
+            if self.slots[index] != -1:
+                self._clear(index)
+        self.newest = slot
+
+    def add(self, slot: int, rating: Optional[int]) -> None:
+        self.advance(slot)
+        if slot <= self.newest - len(self.slots):
+            return
+        index = slot % len(self.slots)
+        if self.slots[index] != slot:
+            self._clear(index)
+            self.slots[index] = slot
+        self.counts[index] += 1
+        self.total += 1
+        if rating in RATINGS:
+            self.ratings[index][rating - 1] += 1
+            self.rating_totals[rating - 1] += 1
+
+    def touch(self, counterparty: Optional[str], at: float, window_seconds: float, max_distinct: int) -> None:
+        if counterparty is not None:
+            self.seen[counterparty] = max(at, self.seen.pop(counterparty, at))
+            while len(self.seen) > max_distinct:
+                self.seen.popitem(last=False)
+        self.expire_seen(at - window_seconds)
+
+    def expire_seen(self, horizon: float) -> None:
+        while self.seen and next(iter(self.seen.values())) < horizon:
+            self.seen.popitem(last=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"slots": self.slots, "counts": self.counts, "ratings": self.ratings, "newest": self.newest,
+                "seen": list(self.seen.items()), "five_star_streak": self.five_star_streak}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], buckets: int) -> "_Window":
+        window = cls(buckets)
+        window.slots, window.counts, window.ratings = data["slots"], data["counts"], data["ratings"]
+        window.newest = data["newest"]
+        window.total = sum(window.counts)
+        window.rating_totals = [sum(row[i] for row in window.ratings) for i in range(len(RATINGS))]
+        window.seen = OrderedDict((key, value) for key, value in data["seen"])
+        window.five_star_streak = data["five_star_streak"]
+        return window
+
+
+class BehaviorFeatureStore:
+    """
+    Thread-safe bounded store of per-user and per-product sliding windows.
+    """
+
+    snapshot_suffix = ".json.gz"
+
+    def __init__(self, window_seconds: float = 600.0, buckets: int = 60, max_entities: int = 100000,
+                 max_distinct: int = 256):
+        if window_seconds <= 0 or buckets <= 0:
+            raise ValueError("window_seconds и buckets должны быть положительными")
+        self.window_seconds = float(window_seconds)
+        self.buckets = buckets
+        self.bucket_seconds = self.window_seconds / buckets
+        self.max_entities = max_entities
+        self.max_distinct = max_distinct
+        self._entities: "OrderedDict[Tuple[str, str], _Window]" = OrderedDict()
+        self._recent_ids: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._newest_slot = -1
+        self._updates = 0
+        self._late_events = 0
+        self._evictions = 0
+
+    def _slot(self, at: float) -> int:
+        return int(at // self.bucket_seconds)
+
+    def _window(self, kind: str, key: str) -> _Window:
+        entity = (kind, key)
+        window = self._entities.get(entity)
+        if window is None:
+            window = self._entities[entity] = _Window(self.buckets)
+            while len(self._entities) > self.max_entities:
+                self._entities.popitem(last=False)
+                self._evictions += 1
+        else:
+            self._entities.move_to_end(entity)
+        return window
+
+    def update(self, comment_id: str, user_id: Optional[str], product_id: Optional[str],
+               rating: Optional[int] = None, at: Optional[float] = None) -> bool:
+        """
+        Records one review. A comment id seen recently (a redelivered task)
+        is counted once. Returns False if the event was not counted.
+        """
+        at = time.time() if at is None else at
+        slot = self._slot(at)
+        with self._lock:
+            if comment_id in self._recent_ids:
+                return False
+            if slot <= self._newest_slot - self.buckets:
+                self._late_events += 1
+                return False  # событие старше окна
+            self._newest_slot = max(self._newest_slot, slot)
+            self._recent_ids[comment_id] = None
+            while len(self._recent_ids) > self.max_entities:
+                self._recent_ids.popitem(last=False)
+
+            for kind, key, counterparty in (("user", user_id, product_id), ("product", product_id, user_id)):
+                if key is None:
+                    continue
+                window = self._window(kind, key)
+                window.add(slot, rating)
+                window.touch(counterparty, at, self.window_seconds, self.max_distinct)
+                if kind == "user" and rating is not None:
+                    window.five_star_streak = window.five_star_streak + 1 if rating == 5 else 0
+            self._updates += 1
+            return True
+
+    def _features(self, kind: str, key: Optional[str], at: Optional[float]) -> Dict[str, Any]:
+        at = time.time() if at is None else at
+        with self._lock:
+            window = self._entities.get((kind, key)) if key is not None else None
+            if window is None:
+                return {"reviews_in_window": 0, "reviews_per_minute": 0.0,
+                        "rating_histogram": {rating: 0 for rating in RATINGS}, "distinct": 0,
+                        "five_star_streak": 0}
+            window.advance(self._slot(at))
+            window.expire_seen(at - self.window_seconds)
+            return {
+                "reviews_in_window": window.total,
+                "reviews_per_minute": window.total * 60.0 / self.window_seconds,
+                "rating_histogram": dict(zip(RATINGS, window.rating_totals)),
+                "distinct": len(window.seen),
+                "five_star_streak": window.five_star_streak,
+            }
+
+    def user_features(self, user_id: Optional[str], at: Optional[float] = None) -> Dict[str, Any]:
+        """Reviews, rating histogram and distinct products of the user within the window."""
+        return self._features("user", user_id, at)
+
+    def product_features(self, product_id: Optional[str], at: Optional[float] = None) -> Dict[str, Any]:
+        """Reviews, rating histogram and distinct users of the product within the window."""
+        return self._features("product", product_id, at)
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            users = sum(1 for kind, _ in self._entities if kind == "user")
+            return {
+                "users": users,
+                "products": len(self._entities) - users,
+                "max_entities": self.max_entities,
+                "window_seconds": self.window_seconds,
+                "buckets": self.buckets,
+                "updates": self._updates,
+                "late_events": self._late_events,
+                "evictions": self._evictions,
+            }
+
+    def _config(self) -> List[float]:
+        return [SNAPSHOT_VERSION, self.window_seconds, self.buckets]
+
+    def save(self, path: str) -> None:
+        """Writes every window in LRU order (atomically)."""
+        with self._lock:
+            data = {
+                "config": self._config(),
+                "entities": [[kind, key, window.to_dict()] for (kind, key), window in self._entities.items()],
+                "recent_ids": list(self._recent_ids),
+            }
+        tmp = f"{path}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+        logger.info(f"Behavior feature snapshot saved: {len(data['entities'])} entity(ies) -> {path}")
+
+    def load(self, path: str) -> bool:
+        """
+        Restores a snapshot written with the same window. Returns False if
+        the file is missing or was built with a different window.
+        """
+        if not os.path.exists(path):
+            return False
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("config") != self._config():
+            logger.warning(f"Behavior feature snapshot {path} was built with another window, ignoring it")
+            return False
+        with self._lock:
+            for kind, key, window in data["entities"]:
+                self._entities[(kind, key)] = _Window.from_dict(window, self.buckets)
+                self._newest_slot = max(self._newest_slot, window["newest"])
+            while len(self._entities) > self.max_entities:
+                self._entities.popitem(last=False)
+            for comment_id in data["recent_ids"][-self.max_entities:]:
+                self._recent_ids[comment_id] = None
+        logger.info(f"Behavior features restored from {path}: {len(data['entities'])} entity(ies)")
+        return True
@@ -0,0 +1,128 @@
+"""
+Request correlation IDs and time-to-moderation tracing.
+
+The app assigns every HTTP request an ID (``X-Request-ID``) and the time it
+was accepted. Both are stored in context variables, so code running deeper
+in the request, such as the RabbitMQ publisher, can read them without extra
+parameters. The publisher copies them into the AMQP message headers together
+with the publish time. The worker adds the dequeue, scoring and persist
+times and records the breakdown between consecutive hops.
+
+Timestamps are wall-clock (``time.time()``) because the hops run in
+different processes. Hops missing from a trace (for example deferred
+comments published by the sampler) are skipped.
+"""
+import logging
+import re
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from common_lib.metrics import Histogram, register_metrics_provider
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "x-request-id"
+TIMESTAMP_HEADER_PREFIX = "x-ts-"
+HOPS = ("accepted", "published", "dequeued", "scored", "persisted")
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+_accepted_at: ContextVar[Optional[float]] = ContextVar("request_accepted_at", default=None)
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex
+
+
+def normalize_request_id(value: Optional[str]) -> str:
+    """Accepts a client supplied ID if it is short and printable, otherwise generates one."""
+    if value and _VALID_REQUEST_ID.match(value):
+        return value
+    return new_request_id()
+
+
+def get_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def get_accepted_at() -> Optional[float]:
+    return _accepted_at.get()
+
+
+def bind_request(request_id: Optional[str], accepted_at: Optional[float] = None):
+    """Binds the ID to the current context; returns tokens for ``reset_request``."""
+    return _request_id.set(request_id), _accepted_at.set(accepted_at)
+
+
+def reset_request(tokens) -> None:
+    request_token, accepted_token = tokens
+    _request_id.reset(request_token)
+    _accepted_at.reset(accepted_token)
+
+
+def stamp(headers: Dict[str, Any], hop: str, at: Optional[float] = None) -> None:
+    """Records a hop timestamp in message headers (as a string: AMQP tables have no float type)."""
+    headers[TIMESTAMP_HEADER_PREFIX + hop] = f"{time.time() if at is None else at:.6f}"
+
+
+def build_trace_headers(request_id: Optional[str] = None, accepted_at: Optional[float] = None) -> Dict[str, Any]:
+    """AMQP headers for a moderation task, stamped with the publish time."""
+    accepted_at = accepted_at if accepted_at is not None else get_accepted_at()
+    headers: Dict[str, Any] = {REQUEST_ID_HEADER: request_id or get_request_id() or new_request_id()}
+    if accepted_at is not None:
+        stamp(headers, "accepted", accepted_at)
+    stamp(headers, "published")
+    return headers
+
+
+def read_trace_headers(headers: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Extracts the request ID and hop timestamps from message headers."""
+    headers = headers or {}
+    request_id = headers.get(REQUEST_ID_HEADER)
+    if isinstance(request_id, bytes):
+        request_id = request_id.decode("utf-8", errors="replace")
+    timestamps = {}
+    for hop in HOPS:
+        value = headers.get(TIMESTAMP_HEADER_PREFIX + hop)
+        if value is not None:
+            timestamps[hop] = float(value)
+    return {"request_id": request_id, "timestamps": timestamps}
+
+
+class HopLatencyRecorder:
+    """Histogram of the time between consecutive hops, plus the end-to-end total."""
+
+    def __init__(self):
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, name: str) -> Histogram:
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram()
+            return self._histograms[name]
+
+    def record(self, timestamps: Dict[str, float]) -> Dict[str, float]:
+        """Records every available segment and returns it in milliseconds."""
+        breakdown: Dict[str, float] = {}
+        present = [hop for hop in HOPS if hop in timestamps]
+        for previous, current in zip(present, present[1:]):
+            # Отрицательные интервалы возможны при расхождении часов между хостами
+            breakdown[f"{previous}->{current}"] = max(0.0, (timestamps[current] - timestamps[previous]) * 1000)
+        if len(present) > 1:
+            breakdown["total"] = max(0.0, (timestamps[present[-1]] - timestamps[present[0]]) * 1000)
+        for name, value in breakdown.items():
+            self._histogram(name).observe(value)
+        return breakdown
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {name: histogram.snapshot() for name, histogram in histograms.items()}
+
+
+hop_latency = HopLatencyRecorder()
+register_metrics_provider("moderation_trace", hop_latency.stats)
@@ -0,0 +1,108 @@
+import logging
+from datetime import datetime
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from common_lib.services.tracing import (
+    REQUEST_ID_HEADER,
+    build_trace_headers,
+    hop_latency,
+    read_trace_headers,
+    stamp,
+)
+
+logger = logging.getLogger(__name__)
+
+TASK_TYPE = "text_classification"
+
+
+class TransportError(Exception):
+    """The task could not be handed over to the transport."""
+
+
+@dataclass
+class ModerationTask:
+    """
+    A moderation task as it travels from the app to the scorer. ``headers``
+    carries the correlation ID and hop timestamps (see tracing).
+    """
+    comment_id: str
+    text: str
+    user_id: Optional[str] = None
+    product_id: Optional[str] = None
+    rating: Optional[int] = None
+    headers: Dict[str, Any] = field(default_factory=dict)
+
+    def to_message(self) -> Dict[str, Any]:
+        return {
+            'task_id': self.comment_id,
+            'task_type': TASK_TYPE,
+            'text': self.text,
+            'user_id': self.user_id,
+            'product_id': self.product_id,
+            'rating': self.rating,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+
+    @classmethod
+    def from_message(cls, message: Dict[str, Any], headers: Optional[Dict[str, Any]] = None) -> "ModerationTask":
+        task_type = message.get("task_type", TASK_TYPE)
+        if task_type != TASK_TYPE:
+            raise ValueError(f"Неизвестный тип задачи: {task_type}")
+        if not message.get("task_id"):
+            raise ValueError("В задаче отсутствует task_id")
+        return cls(
+            comment_id=message["task_id"],
+            text=message.get("text", ""),
+            user_id=message.get("user_id"),
+            product_id=message.get("product_id"),
+            rating=message.get("rating"),
+            headers=dict(headers or {}),
+        )
+
+    @property
+    def request_id(self) -> Optional[str]:
+        return read_trace_headers(self.headers)["request_id"]
+
+    def mark(self, hop: str) -> None:
+        stamp(self.headers, hop)
+
+
+class TaskTransport(ABC):
+    """
+    Publishes moderation tasks to a scorer and reports queue load for
+    admission control. ``publish`` is synchronous because it is called from
+    the CRUD layer, which runs in the request threadpool.
+    """
+
+    name: str = "base"
+    # Если задачи оцениваются в этом же процессе, полную разбивку по этапам
+    # записывает обработчик; иначе здесь учитывается этап публикации.
+    scored_in_process: bool = False
+
+    def publish(self, tasks: List[ModerationTask]) -> None:
+        for task in tasks:
+            if REQUEST_ID_HEADER not in task.headers:
+                task.headers.update(build_trace_headers())
+        self._publish(tasks)
+        if not self.scored_in_process:
+            for task in tasks:
+                hop_latency.record(read_trace_headers(task.headers)["timestamps"])
+
+    @abstractmethod
+    def _publish(self, tasks: List[ModerationTask]) -> None:
+        ...
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    @abstractmethod
+    async def queue_load(self) -> Tuple[int, int]:
+        """Returns (tasks waiting, active consumers)."""
+
+    def stats(self) -> Dict[str, Any]:
+        return {"transport": self.name}
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from common_lib.metrics import Histogram
+from common_lib.services.tracing import read_trace_headers
+from common_lib.services.transport.base import ModerationTask, TaskTransport, TransportError
+
+logger = logging.getLogger(__name__)
+
+
+class InProcessTransport(TaskTransport):
+    """
+    Moderation tasks go through an asyncio.Queue inside the app process and
+    are handled by ``workers`` consumers, each running ``handler`` in a
+    dedicated thread pool so scoring never blocks the event loop.
+
+    There is no broker, so tasks still queued when the process stops are
+    lost; their comments stay in NOT_CHECKED.
+    """
+
+    name = "inprocess"
+    scored_in_process = True
+
+    def __init__(self, handler: Callable[[ModerationTask], Any], workers: int = 2, max_queue: int = 10000,
+                 drain_timeout_seconds: float = 10.0):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.drain_timeout_seconds = drain_timeout_seconds
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._consumers: List[asyncio.Task] = []
+        self._dispatch = Histogram()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._processed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._loop is not None and bool(self._consumers)
+
+    async def start(self) -> None:
+        if self.is_running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="moderation")
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+        logger.info(f"In-process moderation transport started with {self.workers} worker(s)")
+
+    async def stop(self) -> None:
+        if not self.is_running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=self.drain_timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.warning(f"In-process transport stopped with {self._queue.qsize()} unprocessed task(s)")
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+        self._consumers = []
+        self._loop = None
+
+    def _publish(self, tasks: List[ModerationTask]) -> None:
+        if not self.is_running:
+            raise TransportError("In-process moderation transport is not running")
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            self._enqueue(tasks)
+        else:
+            # Вызов из потока threadpool: ставим задачи в очередь в цикле приложения
+            asyncio.run_coroutine_threadsafe(self._enqueue_async(tasks), self._loop).result()
+
+    async def _enqueue_async(self, tasks: List[ModerationTask]) -> None:
+        self._enqueue(tasks)
+
+    def _enqueue(self, tasks: List[ModerationTask]) -> None:
+        if self._queue.qsize() + len(tasks) > self.max_queue > 0:
+            with self._lock:
+                self._rejected += len(tasks)
+            raise TransportError(f"In-process moderation queue is full ({self.max_queue})")
+        for task in tasks:
+            self._queue.put_nowait(task)
+
+    async def _consume(self) -> None:
+        while True:
+            task: ModerationTask = await self._queue.get()
+            try:
+                task.mark("dequeued")
+                timestamps = read_trace_headers(task.headers)["timestamps"]
+                if "published" in timestamps:
+                    self._dispatch.observe((timestamps["dequeued"] - timestamps["published"]) * 1000)
+                with self._lock:
+                    self._in_flight += 1
+                await self._loop.run_in_executor(self._executor, self.handler, task)
+                with self._lock:
+                    self._processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                with self._lock:
+                    self._failed += 1
+                logger.error(f"Moderation task {task.comment_id} failed: {e}", exc_info=True)
+            finally:
+                with self._lock:
+                    self._in_flight = max(0, self._in_flight - 1)
+                self._queue.task_done()
+
+    async def queue_load(self) -> Tuple[int, int]:
+        if not self.is_running:
+            return 0, 0
+        return self._queue.qsize(), sum(1 for consumer in self._consumers if not consumer.done())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "transport": self.name,
+                "workers": self.workers,
+                "running": self.is_running,
+                "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "processed": self._processed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "dispatch": self._dispatch.snapshot(),
+            }
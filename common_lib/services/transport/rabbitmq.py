@@ -0,0 +1,155 @@
+import json
+import logging
+from typing import Any, Callable, Dict, List, Tuple
+
+import pika
+
+from common_lib.database.config import get_settings
+from common_lib.services.transport.base import ModerationTask, TaskTransport
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class RabbitMQTransport(TaskTransport):
+    """
+    Tasks are published as persistent JSON messages to QUEUE_NAME and
+    consumed by the ml_worker. Trace data travels in the AMQP headers.
+    """
+
+    name = "rabbitmq"
+
+    def __init__(self):
+        self.rabbitmq_config = {
+            'host': settings.RABBITMQ_HOST,
+            'port': settings.RABBITMQ_PORT,
+            'user': settings.RABBITMQ_USER,
+            'password': settings.RABBITMQ_PASS,
+            'vhost': settings.RABBITMQ_VHOST,
+            'queue': settings.QUEUE_NAME
+        }
+
+    def _connection_parameters(self, **overrides) -> pika.ConnectionParameters:
+        credentials = pika.PlainCredentials(
+            self.rabbitmq_config['user'],
+            self.rabbitmq_config['password']
+        )
+        params: Dict[str, Any] = dict(heartbeat=600, blocked_connection_timeout=300)
+        params.update(overrides)
+        return pika.ConnectionParameters(
+            host=self.rabbitmq_config['host'],
+            port=self.rabbitmq_config['port'],
+            virtual_host=self.rabbitmq_config['vhost'],
+            credentials=credentials,
+            **params
+        )
+
+    def _publish(self, tasks: List[ModerationTask]) -> None:
+        """
+        Публикация пачки задач модерации через одно соединение и один канал
+        """
+        connection = None
+
+        try:
+            connection = pika.BlockingConnection(self._connection_parameters())
+            channel = connection.channel()
+
+            channel.queue_declare(
+                queue=self.rabbitmq_config['queue'],
+                durable=True
+            )
+
+            for task in tasks:
+                properties = pika.BasicProperties(
+                    delivery_mode=2,  # Устойчивость к перезагрузке
+                    content_type='application/json',
+                    correlation_id=task.request_id,
+                    headers=task.headers
+                )
+                channel.basic_publish(
+                    exchange='',
+                    routing_key=self.rabbitmq_config['queue'],
+                    body=json.dumps(task.to_message()),
+                    properties=properties
+                )
+
+        except pika.exceptions.ProbableAuthenticationError as e:
+            logger.error(f"Ошибка аутентификации RabbitMQ: {e}")
+            logger.error(f"Проверьте переменные окружения:")
+            logger.error(f"  RABBITMQ_HOST: {self.rabbitmq_config['host']}")
+            logger.error(f"  RABBITMQ_USER: {self.rabbitmq_config['user']}")
+            logger.error(f"  RABBITMQ_PASSWORD: {'*' * len(self.rabbitmq_config['password'])}")
+            raise
+        except Exception as e:
+            logger.error(f"Ошибка отправки в RabbitMQ: {e}")
+            raise
+        finally:
+            if connection and not connection.is_closed:
+                connection.close()
+
+    # Асинхронное соединение (aio_pika) нужно только приложению для опроса
+    # очереди, поэтому rm импортируется лениво и не требуется воркеру.
+    async def start(self) -> None:
+        from common_lib.services.rm.rm import connect_rabbitmq
+
+        await connect_rabbitmq()
+
+    async def stop(self) -> None:
+        from common_lib.services.rm.rm import close_rabbitmq
+
+        await close_rabbitmq()
+
+    async def queue_load(self) -> Tuple[int, int]:
+        from common_lib.services.rm.rm import sample_queue_load
+
+        return await sample_queue_load()
+
+    def consume(self, handler: Callable[[ModerationTask], Any], prefetch_count: int = 1) -> None:
+        """
+        Blocking consumer loop used by the ml_worker. Malformed messages and
+        ValueError from the handler are dropped; any other error requeues
+        the message.
+        """
+        connection = pika.BlockingConnection(self._connection_parameters(heartbeat=30, blocked_connection_timeout=2))
+        channel = connection.channel()
+        channel.queue_declare(queue=self.rabbitmq_config['queue'], durable=True)
+
+        def callback(ch, method, properties, body):
+            logger.info(f"Получено сообщение, delivery_tag: {method.delivery_tag}")
+            task = None
+            try:
+                task = ModerationTask.from_message(json.loads(body.decode('utf-8')), properties.headers)
+                task.mark("dequeued")
+                handler(task)
+                ch.basic_ack(delivery_tag=method.delivery_tag)
+                logger.info(f"Задача {task.comment_id} завершена успешно")
+
+            except json.JSONDecodeError as e:
+                logger.error(f"Ошибка парсинга JSON: {e}")
+                ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+
+            except ValueError as e:
+                logger.error(f"Ошибка валидации данных задачи {task.comment_id if task else None}: {e}")
+                ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+
+            except Exception as e:
+                logger.error(f"Критическая ошибка при обработке задачи {task.comment_id if task else None}: {e}",
+                             exc_info=True)
+                ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+
+        channel.basic_qos(prefetch_count=prefetch_count)
+        channel.basic_consume(
+            queue=self.rabbitmq_config['queue'],
+            on_message_callback=callback,
+            auto_ack=False
+        )
+
+        logger.info('Ожидание сообщений. Для выхода нажмите Ctrl+C')
+        try:
+            channel.start_consuming()
+        except KeyboardInterrupt:
+            logger.info('Получен сигнал прерывания. Остановка...')
+            channel.stop_consuming()
+        finally:
+            if not connection.is_closed:
+                connection.close()
@@ -0,0 +1,33 @@
+from typing import Optional
+
+from common_lib.database.config import get_settings
+from common_lib.services.transport.base import TaskTransport
+
+settings = get_settings()
+
+TRANSPORTS = ("rabbitmq", "inprocess")
+
+_transport: Optional[TaskTransport] = None
+
+
+def set_transport(transport: Optional[TaskTransport]) -> None:
+    global _transport
+    _transport = transport
+
+
+def get_transport() -> TaskTransport:
+    """
+    Returns the configured transport. RabbitMQ is created on first use; the
+    in-process transport needs a scorer and must be installed by the app
+    with ``set_transport`` (see app/core/transport.py).
+    """
+    global _transport
+    if _transport is None:
+        if settings.TASK_TRANSPORT not in TRANSPORTS:
+            raise ValueError(f"Unknown TASK_TRANSPORT '{settings.TASK_TRANSPORT}', expected one of {TRANSPORTS}")
+        if settings.TASK_TRANSPORT != "rabbitmq":
+            raise RuntimeError(f"Transport '{settings.TASK_TRANSPORT}' has not been started")
+        from common_lib.services.transport.rabbitmq import RabbitMQTransport
+
+        _transport = RabbitMQTransport()
+    return _transport
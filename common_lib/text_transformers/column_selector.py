@@ -0,0 +1,23 @@
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+
+class ColumnSelector(BaseEstimator, TransformerMixin):
+    """
+    A scikit-learn transformer that passes one text column of a DataFrame on
+    as a Series, without copying it. Missing values become empty strings
+    (only then is the column copied).
+    """
+    def __init__(self, column: str):
+        self.column = column
+
+    def fit(self, X, y=None):
+        if not isinstance(X, pd.DataFrame) or self.column not in X.columns:
+            raise ValueError(f"Input must be a DataFrame with column '{self.column}'.")
+        return self
+
+    def transform(self, X) -> pd.Series:
+        if not isinstance(X, pd.DataFrame) or self.column not in X.columns:
+            raise ValueError(f"Input must be a DataFrame with column '{self.column}'.")
+        series = X[self.column]
+        return series.fillna('') if series.hasnans else series
@@ -0,0 +1,54 @@
+from typing import Optional
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.preprocessing import normalize
+
+
+class StreamingTfidfTransformer(BaseEstimator, TransformerMixin):
+    """
+    TF-IDF weighting for hashed term counts that can be fitted in batches.
+
+    Only the number of documents and the per-column document frequencies are
+    kept, so ``partial_fit`` over chunks gives the same IDF as ``fit`` over
+    the whole corpus (``smooth_idf`` follows TfidfTransformer:
+    ``idf = ln((1 + n) / (1 + df)) + 1``). The state is a dense vector of
+    ``n_features`` values; there is no vocabulary.
+    """
+    def __init__(self, norm: Optional[str] = 'l2', smooth_idf: bool = True, sublinear_tf: bool = False):
+        self.norm = norm
+        self.smooth_idf = smooth_idf
+        self.sublinear_tf = sublinear_tf
+
+    def fit(self, X, y=None):
+        for attribute in ('n_docs_', 'df_'):
+            self.__dict__.pop(attribute, None)
+        return self.partial_fit(X, y)
+
+    def partial_fit(self, X, y=None):
+        X = sp.csr_matrix(X)
+        if not hasattr(self, 'df_'):
+            self.n_docs_ = 0
+            self.df_ = np.zeros(X.shape[1], dtype=np.int32)
+        elif X.shape[1] != self.df_.shape[0]:
+            raise ValueError(f"Expected {self.df_.shape[0]} features, got {X.shape[1]}.")
+        X.eliminate_zeros()
+        self.n_docs_ += X.shape[0]
+        self.df_ += np.bincount(X.indices, minlength=X.shape[1])
+        return self
+
+    @property
+    def idf_(self) -> np.ndarray:
+        smooth = int(self.smooth_idf)
+        return np.log((self.n_docs_ + smooth) / (self.df_ + smooth)) + 1.0
+
+    def transform(self, X):
+        if not hasattr(self, 'df_'):
+            raise ValueError("StreamingTfidfTransformer is not fitted yet.")
+        X = sp.csr_matrix(X, dtype=np.float64, copy=True)
+        if self.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1.0
+        X = X @ sp.diags(self.idf_)
+        return normalize(X, norm=self.norm, copy=False) if self.norm else X
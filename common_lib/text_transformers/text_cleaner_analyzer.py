@@ -0,0 +1,60 @@
+from typing import Iterable, List, Optional, Tuple
+
+from common_lib.data.text_cleaner import TextCleaner
+
+
+class TextCleanerAnalyzer:
+    """
+    A callable ``analyzer`` for CountVectorizer/TfidfVectorizer that runs the
+    centralized TextCleaner and yields word n-grams directly, so the corpus
+    is never joined into cleaned strings and re-tokenized by the vectorizer.
+
+    With a callable analyzer the vectorizer ignores ``ngram_range`` and
+    ``lowercase``, so they are applied here. Tokens shorter than
+    ``min_token_length`` are dropped like the vectorizer's default
+    ``token_pattern`` does; tokens are otherwise the cleaner's whitespace
+    split, so texts with punctuation left in (no ``remove_punctuation``) can
+    give slightly different features than the unfused pipeline.
+    """
+
+    def __init__(self, methods: Optional[List[str]] = None,
+                 stop_words_lang: Optional[str] = 'english', lemmatize: bool = False,
+                 stem: bool = False, ngram_range: Tuple[int, int] = (1, 1),
+                 lowercase: bool = True, min_token_length: int = 2):
+        self.methods = methods
+        self.stop_words_lang = stop_words_lang
+        self.lemmatize = lemmatize
+        self.stem = stem
+        self.ngram_range = tuple(ngram_range)
+        self.lowercase = lowercase
+        self.min_token_length = min_token_length
+        self._text_cleaner = TextCleaner(
+            methods=methods,
+            stop_words_lang=stop_words_lang,
+            lemmatize=lemmatize,
+            stem=stem
+        )
+        self._lowercase_tokens = lowercase and 'lower' not in (methods or [])
+
+    def __call__(self, doc) -> List[str]:
+        tokens = self._text_cleaner.tokens(doc)
+        if self._lowercase_tokens:
+            tokens = [token.lower() for token in tokens]
+        if self.min_token_length > 1:
+            tokens = [token for token in tokens if len(token) >= self.min_token_length]
+
+        min_n, max_n = self.ngram_range
+        features = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+            features.extend(' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return features
+
+    def __repr__(self) -> str:
+        return (f"TextCleanerAnalyzer(methods={self.methods!r}, lemmatize={self.lemmatize}, stem={self.stem}, "
+                f"ngram_range={self.ngram_range})")
+
+    def seed_token_cache(self, vocabulary: Iterable[str]) -> int:
+        return self._text_cleaner.seed_token_cache(word for term in vocabulary for word in term.split())
+
+    def token_cache_stats(self):
+        return self._text_cleaner.token_cache_stats()
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Any, Dict, Iterable, List, Optional
 
 import pandas as pd
 from sklearn.base import BaseEstimator, TransformerMixin
@@ -9,16 +9,19 @@ from sklearn.base import BaseEstimator, TransformerMixin
 class TextCleanerTransformer(BaseEstimator, TransformerMixin):
     """
     A custom scikit-learn transformer for cleaning text using the centralized TextCleaner.
+    ``n_jobs`` and ``chunk_size`` are passed to ``TextCleaner.clean_series``.
     """
 
     def __init__(self, text_column: str, methods: Optional[List[str]] = None,
                  stop_words_lang: Optional[str] = 'english', lemmatize: bool = False,
-                 stem: bool = False):
+                 stem: bool = False, n_jobs: int = 1, chunk_size: int = 10000):
         self.text_column = text_column
         self.methods = methods
         self.stop_words_lang = stop_words_lang
         self.lemmatize = lemmatize
         self.stem = stem
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
         from common_lib.data.text_cleaner import TextCleaner
         self._text_cleaner = TextCleaner(
             methods=methods,
@@ -35,4 +38,20 @@ class TextCleanerTransformer(BaseEstimator, TransformerMixin):
     def transform(self, X) -> pd.Series:
         if self.text_column not in X.columns:
             raise ValueError(f"Column '{self.text_column}' not found in the DataFrame X.")
-        return self._text_cleaner.clean_series(X[self.text_column])
+        return self._text_cleaner.clean_series(X[self.text_column], n_jobs=self.n_jobs, chunk_size=self.chunk_size)
+
+    def __setstate__(self, state):
+        # Пайплайны, сохранённые до появления параллельной очистки
+        state.setdefault('n_jobs', 1)
+        state.setdefault('chunk_size', 10000)
+        super().__setstate__(state)
+
+    def seed_token_cache(self, vocabulary: Iterable[str]) -> int:
+        """
+        Pre-seeds the lemma/stem caches with the words of a fitted vectorizer
+        vocabulary (n-grams are split into words).
+        """
+        return self._text_cleaner.seed_token_cache(word for term in vocabulary for word in term.split())
+
+    def token_cache_stats(self) -> Dict[str, Any]:
+        return self._text_cleaner.token_cache_stats()
@@ -3,6 +3,7 @@ from typing import Generator
 from unittest.mock import patch, AsyncMock
 
 from fastapi.testclient import TestClient
+from sqlalchemy.pool import StaticPool
 from sqlmodel import SQLModel, Session, create_engine
 
 from app.api import app
@@ -12,7 +13,7 @@ from common_lib.models import User, Product, RoleEnum
 from common_lib.services.auth.auth_service import create_access_token
 
 TEST_DATABASE_URL = "sqlite:///:memory:"
-engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False}, poolclass=StaticPool)
 
 
 def get_settings_override():
@@ -28,9 +29,9 @@ def override_app_settings():
 
 @pytest.fixture(scope="function", autouse=True)
 def mocked_app_lifecycle():
-    with patch("app.api.init_db", return_value=None), \
-         patch("app.api.connect_rabbitmq", new_callable=AsyncMock), \
-         patch("app.api.close_rabbitmq", new_callable=AsyncMock):
+    with patch("app.api.check_db_connection", return_value=None), \
+         patch("app.api.start_transport", new_callable=AsyncMock), \
+         patch("app.api.stop_transport", new_callable=AsyncMock):
         yield
 
 
@@ -0,0 +1,84 @@
+from unittest.mock import patch
+from uuid import UUID
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+
+from common_lib.database.config import get_settings
+from common_lib.models import Comment, ModerationStatus, Product, User
+from common_lib.services.admission import AdmissionController, admission_controller
+from common_lib.services.auth.auth_service import create_access_token
+from common_lib.services.crud.comment import requeue_deferred_comments
+
+settings = get_settings()
+PUBLISH = "common_lib.services.crud.comment.CommentService.publish_moderation_tasks"
+
+
+def login(client: TestClient, user: User):
+    token = create_access_token(data={"sub": user.email})
+    client.cookies.set(settings.COOKIE_NAME, f"Bearer {token}")
+
+
+def test_controller_decisions():
+    controller = AdmissionController(max_queue_depth=100, stale_after_seconds=60)
+    assert not controller.is_overloaded()
+    controller.update(message_count=10, consumer_count=1)
+    assert not controller.is_overloaded()
+    controller.update(message_count=100, consumer_count=1)
+    assert controller.is_overloaded()
+    controller.update(message_count=0, consumer_count=0)
+    assert controller.is_overloaded()
+
+
+def test_stale_sample_fails_open():
+    controller = AdmissionController(max_queue_depth=1, stale_after_seconds=0)
+    controller.update(message_count=50, consumer_count=1)
+    assert not controller.is_overloaded()
+
+
+def test_overload_defers_single_and_rejects_bulk(client: TestClient, session: Session,
+                                                 test_user: User, test_product: Product):
+    login(client, test_user)
+    payload = {"text": "Great", "rating": 5, "product_id": str(test_product.id)}
+    with patch.object(admission_controller, "is_overloaded", return_value=True), patch(PUBLISH) as publish:
+        single = client.post("/api/comments/", json=payload)
+        bulk = client.post("/api/comments/bulk", json=[payload])
+
+    assert single.status_code == 201
+    assert single.json()["moderation_status"] == "deferred"
+    assert bulk.status_code == 429
+    assert bulk.headers["retry-after"] == str(settings.ADMISSION_RETRY_AFTER_SECONDS)
+    publish.assert_not_called()
+
+    with patch(PUBLISH) as publish:
+        assert requeue_deferred_comments(session, limit=10) == 1
+    assert len(publish.call_args.args[0]) == 1
+    session.expire_all()
+    assert session.get(Comment, UUID(single.json()["id"])).moderation_status == ModerationStatus.NOT_CHECKED
+
+
+def test_overlapping_sweeps_publish_each_deferred_comment_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        product = Product(name="Product", description="", price=1.0)
+        user = User(name="User", email="user@example.com", hashed_password="x")
+        session.add_all([product, user])
+        session.commit()
+        session.add_all([Comment(text=f"Review {i}", rating=5, product_id=product.id, user_id=user.id,
+                                 moderation_status=ModerationStatus.DEFERRED) for i in range(5)])
+        session.commit()
+
+    published = []
+
+    def publish(tasks):
+        published.extend(task["comment_id"] for task in tasks)
+        if len(published) == len(tasks):
+            # Второй обход стартует, пока первый ещё публикует
+            with Session(engine) as other:
+                assert requeue_deferred_comments(other, limit=10) == 2
+
+    with patch(PUBLISH, side_effect=publish), Session(engine) as session:
+        assert requeue_deferred_comments(session, limit=3) == 3
+        assert requeue_deferred_comments(session, limit=10) == 0
+    assert sorted(published) == sorted(set(published)) and len(published) == 5
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import app
+from common_lib.database.config import get_settings
+from common_lib.models import User
+from common_lib.services.auth.auth_service import create_access_token
+from common_lib.services.classifier.batcher import BatcherNotRunning, MicroBatcher
+from core.classifier import get_batcher
+
+settings = get_settings()
+
+
+def test_concurrent_requests_are_merged_into_one_batch():
+    calls: List[List[str]] = []
+
+    def predict(texts: List[str]) -> List[int]:
+        calls.append(texts)
+        return [len(text) for text in texts]
+
+    async def scenario():
+        batcher = MicroBatcher(predict, max_batch_size=8, max_wait_ms=50)
+        await batcher.start()
+        results = await asyncio.gather(*(batcher.submit("x" * i) for i in range(5)))
+        await batcher.stop()
+        return results, batcher.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert results == [0, 1, 2, 3, 4]
+    assert calls == [["", "x", "xx", "xxx", "xxxx"]]
+    assert stats["batches"] == 1 and stats["items"] == 5
+
+
+def test_batches_are_capped_by_max_batch_size():
+    sizes: List[int] = []
+    lock = threading.Lock()
+
+    def predict(texts: List[int]) -> List[int]:
+        with lock:
+            sizes.append(len(texts))
+        return texts
+
+    async def scenario():
+        batcher = MicroBatcher(predict, max_batch_size=3, max_wait_ms=20, workers=2)
+        await batcher.start()
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+        await batcher.stop()
+        return results
+
+    assert asyncio.run(scenario()) == list(range(10))
+    assert max(sizes) <= 3 and sum(sizes) == 10
+
+
+def test_failed_batch_propagates_error_to_every_caller():
+    def predict(texts):
+        raise RuntimeError("model failure")
+
+    async def scenario():
+        batcher = MicroBatcher(predict, max_batch_size=4, max_wait_ms=10)
+        await batcher.start()
+        results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+        await batcher.stop()
+        return results
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(scenario()))
+
+
+def test_stop_during_wait_window_fails_collected_items():
+    async def scenario():
+        batcher = MicroBatcher(lambda texts: texts, max_batch_size=8, max_wait_ms=10000)
+        await batcher.start()
+        pending = [asyncio.create_task(batcher.submit(i)) for i in range(3)]
+        await asyncio.sleep(0.05)  # элементы сняты с очереди, батч ждёт дедлайн
+        assert batcher.stats()["queue_depth"] == 0
+        await batcher.stop()
+        return await asyncio.wait_for(asyncio.gather(*pending, return_exceptions=True), timeout=1)
+
+    assert all(isinstance(r, BatcherNotRunning) for r in asyncio.run(scenario()))
+
+
+def test_submit_requires_running_batcher():
+    with pytest.raises(BatcherNotRunning):
+        asyncio.run(MicroBatcher(lambda texts: texts).submit("a"))
+
+
+class FakeBatcher:
+    async def submit(self, text: str):
+        return {"label": 1, "predicted_class": "OR", "confidence": 0.9,
+                "probabilities": {"CG": 0.1, "OR": 0.9}}
+
+
+def test_classify_endpoint(client: TestClient, test_admin_user: User):
+    app.dependency_overrides[get_batcher] = lambda: FakeBatcher()
+    token = create_access_token(data={"sub": test_admin_user.email})
+    client.cookies.set(settings.COOKIE_NAME, f"Bearer {token}")
+
+    response = client.post("/api/classify/", json={"texts": ["good", "bad"]})
+
+    assert response.status_code == 200
+    assert [r["predicted_class"] for r in response.json()] == ["OR", "OR"]
+
+
+def test_classify_requires_admin(client: TestClient, test_user: User):
+    app.dependency_overrides[get_batcher] = lambda: FakeBatcher()
+    token = create_access_token(data={"sub": test_user.email})
+    client.cookies.set(settings.COOKIE_NAME, f"Bearer {token}")
+    assert client.post("/api/classify/", json={"texts": ["good"]}).status_code == 403
+
+
+def test_classify_unavailable_when_disabled(client: TestClient, test_admin_user: User):
+    token = create_access_token(data={"sub": test_admin_user.email})
+    client.cookies.set(settings.COOKIE_NAME, f"Bearer {token}")
+    assert client.post("/api/classify/", json={"texts": ["good"]}).status_code == 503
@@ -0,0 +1,58 @@
+from unittest.mock import patch
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from common_lib.database.config import get_settings
+from common_lib.models import Comment, Product, User
+from common_lib.services.auth.auth_service import create_access_token
+
+settings = get_settings()
+
+
+def login(client: TestClient, user: User) -> TestClient:
+    token = create_access_token(data={"sub": user.email})
+    client.cookies.set(settings.COOKIE_NAME, f"Bearer {token}")
+    return client
+
+
+def test_bulk_create_returns_per_item_results(client: TestClient, session: Session,
+                                               test_user: User, test_product: Product):
+    login(client, test_user)
+    payload = [
+        {"text": "Great product", "rating": 5, "product_id": str(test_product.id)},
+        {"text": "Bad rating", "rating": 9, "product_id": str(test_product.id)},
+        {"text": "Unknown product", "rating": 3, "product_id": str(uuid4())},
+        {"text": "Fine", "rating": 4, "product_id": str(test_product.id)},
+    ]
+    with patch("common_lib.services.crud.comment.CommentService.publish_moderation_tasks") as publish:
+        response = client.post("/api/comments/bulk", json=payload)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 2
+    assert [r["status"] for r in data["results"]] == ["created", "invalid", "invalid", "created"]
+    assert all(r["queued"] for r in data["results"] if r["status"] == "created")
+
+    publish.assert_called_once()
+    assert len(publish.call_args.args[0]) == 2
+    assert len(session.exec(select(Comment)).all()) == 2
+
+
+def test_bulk_create_reports_unqueued_on_broker_failure(client: TestClient, test_user: User,
+                                                        test_product: Product):
+    login(client, test_user)
+    payload = [{"text": "Great product", "rating": 5, "product_id": str(test_product.id)}]
+    with patch("common_lib.services.crud.comment.CommentService.publish_moderation_tasks",
+               side_effect=ConnectionError("broker down")):
+        response = client.post("/api/comments/bulk", json=payload)
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["queued"] is False
+
+
+def test_bulk_create_requires_authentication(client: TestClient):
+    response = client.post("/api/comments/bulk", json=[])
+    assert response.status_code == 401
@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from common_lib.database.config import get_settings
+from common_lib.models import Comment, ModerationStatus, Product, User
+from common_lib.services.auth.auth_service import create_access_token
+
+settings = get_settings()
+
+
+def add_comments(session: Session, user: User, product: Product):
+    statuses = [ModerationStatus.APPROVED, ModerationStatus.REJECTED, ModerationStatus.APPROVED]
+    for i, moderation_status in enumerate(statuses):
+        session.add(Comment(text=f"Review {i}, \"quoted\"", rating=i + 1, user_id=user.id,
+                            product_id=product.id, moderation_status=moderation_status))
+    session.commit()
+
+
+def test_export_ndjson_filters_by_status(client: TestClient, session: Session, test_admin_user: User,
+                                         test_product: Product):
+    add_comments(session, test_admin_user, test_product)
+    token = create_access_token(data={"sub": test_admin_user.email})
+    client.cookies.set(settings.COOKIE_NAME, f"Bearer {token}")
+
+    response = client.get("/api/comments/export",
+                          params={"product_id": str(test_product.id), "moderation_status": "approved"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 2
+    assert {row["moderation_status"] for row in rows} == {"approved"}
+    assert all(row["product_id"] == str(test_product.id) for row in rows)
+
+
+def test_export_csv(client: TestClient, session: Session, test_admin_user: User, test_product: Product):
+    add_comments(session, test_admin_user, test_product)
+    token = create_access_token(data={"sub": test_admin_user.email})
+    client.cookies.set(settings.COOKIE_NAME, f"Bearer {token}")
+
+    response = client.get("/api/comments/export", params={"export_format": "csv"})
+
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 3
+    assert rows[0]["text"].startswith("Review")
+
+
+def test_export_requires_admin(client: TestClient, test_user: User):
+    token = create_access_token(data={"sub": test_user.email})
+    client.cookies.set(settings.COOKIE_NAME, f"Bearer {token}")
+    assert client.get("/api/comments/export").status_code == 403
+
+
+def test_export_filters_by_creation_date(client: TestClient, session: Session, test_admin_user: User,
+                                         test_product: Product):
+    for day in (1, 2, 3):
+        session.add(Comment(text=f"Review {day}", rating=5, user_id=test_admin_user.id, product_id=test_product.id,
+                            created_at=datetime(2024, 5, day, 12, tzinfo=timezone.utc)))
+    session.commit()
+    token = create_access_token(data={"sub": test_admin_user.email})
+    client.cookies.set(settings.COOKIE_NAME, f"Bearer {token}")
+
+    response = client.get("/api/comments/export",
+                          params={"since": "2024-05-02T00:00:00", "until": "2024-05-03T12:00:00+00:00"})
+
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["text"] for row in rows] == ["Review 2"]
+    assert rows[0]["created_at"].startswith("2024-05-02T12:00:00")
+    assert len(client.get("/api/comments/export", params={"since": "2024-05-02T14:00:00+02:00"})
+               .text.splitlines()) == 2
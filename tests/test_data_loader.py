@@ -0,0 +1,95 @@
+import os
+
+import pandas as pd
+import pytest
+
+from common_lib.data import DataLoader, DataPreparer
+from common_lib.data import data_loader as data_loader_module
+
+
+def write_reviews(path, rows=40):
+    pd.DataFrame({
+        "category": ["Home_and_Kitchen", "Books"] * (rows // 2),
+        "rating": [float(i % 5 + 1) for i in range(rows)],
+        "label": ["CG", "OR"] * (rows // 2),
+        "text_": [f"review number {i}" for i in range(rows)],
+    }).to_csv(path, index=False)
+
+
+def test_dtypes_are_set_while_parsing(tmp_path, monkeypatch):
+    path = str(tmp_path / "reviews.csv")
+    write_reviews(path)
+    plain = DataLoader().load_csv(path, use_cache=False)
+    assert isinstance(plain["category"].dtype, pd.CategoricalDtype)
+    assert isinstance(plain["label"].dtype, pd.CategoricalDtype)
+    assert plain["rating"].dtype == "int8" and plain["text_"].dtype == object
+
+    monkeypatch.setattr(data_loader_module, "_import_pyarrow", lambda: None)
+    df = DataLoader().load_csv(path, columns=["rating", "label", "text_"])
+    assert list(df.columns) == ["rating", "label", "text_"]
+    pd.testing.assert_frame_equal(df, plain[["rating", "label", "text_"]])
+    assert not os.path.exists(path + ".parquet")
+
+    # Новое значение добавляется в категории метки, а не падает в fillna
+    df.loc[0, "label"] = None
+    preparer = DataPreparer(df).handle_missing_values(strategy='fill', columns=["label"], fill_value="missing")
+    assert preparer.get_result().loc[0, "label"] == "missing"
+
+    raw = DataLoader(category_columns=(), rating_column=None).load_csv(path)
+    assert raw["label"].dtype == object and raw["rating"].dtype == "float64"
+
+
+def test_ratings_with_gaps_become_nullable_int8(tmp_path):
+    path = str(tmp_path / "reviews.csv")
+    frame = pd.DataFrame({"rating": [5.0, None, 3.0], "text_": ["a", "b", "c"]})
+    frame.to_csv(path, index=False)
+    assert DataLoader().load_csv(path, use_cache=False)["rating"].dtype == "Int8"
+    frame.assign(rating=[4.5, 1.0, 2.0]).to_csv(path, index=False)
+    assert DataLoader().load_csv(path, use_cache=False)["rating"].dtype == "float64"
+
+
+def test_parquet_cache_is_reused_and_invalidated(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "reviews.csv")
+    write_reviews(path)
+    loader = DataLoader()
+
+    first = loader.load_csv(path)
+    assert os.path.exists(path + ".parquet")
+    pd.testing.assert_frame_equal(first, loader.load_csv(path, use_cache=False))
+    cached = loader.load_csv(path, columns=["category", "label", "text_"], memory_map=True)
+    pd.testing.assert_frame_equal(cached, first[["category", "label", "text_"]])
+    assert DataLoader(category_columns=()).load_csv(path)["category"].dtype == object
+
+    write_reviews(path, rows=10)
+    assert len(loader.load_csv(path)) == 10
+
+
+def test_verified_local_copy_is_reused_and_corruption_is_repaired(tmp_path):
+    source_dir = tmp_path / "mirror" / "owner" / "reviews"
+    source_dir.mkdir(parents=True)
+    write_reviews(str(source_dir / "reviews.csv"))
+    calls = []
+    serve = data_loader_module.local_directory_download(str(tmp_path / "mirror"))
+
+    def download(link, force=False):
+        calls.append(force)
+        return serve(link, force)
+
+    loader = DataLoader(download_fn=download)
+    loader.data_path = str(tmp_path / "data")
+    assert len(loader.load_from_kaggle("owner/reviews", "reviews.csv", use_cache=False)) == 40
+    local = tmp_path / "data" / "owner" / "reviews" / "reviews.csv"
+    assert (local.parent / "manifest.json").exists()
+    assert not list(local.parent.glob("*.part"))
+
+    os.utime(local, ns=(1, 1))  # тот же файл с другим mtime проверяется по хэшу
+    loader.load_from_kaggle("owner/reviews", "reviews.csv", use_cache=False)
+    assert calls == [False]
+
+    local.write_text("category,rating\n")  # частично скопированный файл
+    assert len(loader.load_from_kaggle("owner/reviews", "reviews.csv", use_cache=False)) == 40
+    assert calls == [False, False]
+
+    with pytest.raises(FileNotFoundError):
+        serve("owner/missing")
@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from common_lib.database import instrumentation
+from common_lib.database.instrumentation import (
+    QueryCountMiddleware,
+    instrument_engine,
+    instrumentation_stats,
+    track_queries,
+)
+from common_lib.metrics import Histogram
+
+
+def _file_engine(tmp_path, **kwargs):
+    return create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}", **kwargs)
+
+
+def test_histogram_percentiles_use_bucket_bounds():
+    histogram = Histogram(buckets=(1, 10, 100))
+    for value in [0.5] * 90 + [50] * 9 + [500]:
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 100
+    assert snapshot["p50_ms"] == 1
+    assert snapshot["p95_ms"] == 100
+    assert snapshot["p99_ms"] == 100
+    assert snapshot["max_ms"] == 500
+    assert snapshot["buckets"]["le_inf"] == 1
+
+
+def test_statements_are_timed_and_counted_per_unit_of_work(tmp_path):
+    engine = _file_engine(tmp_path)
+    metrics = instrument_engine(engine, "test_statements", slow_query_ms=0)
+
+    with track_queries() as stats:
+        with engine.connect() as connection:
+            for _ in range(3):
+                connection.execute(text("SELECT 1"))
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert stats.count == 3
+    assert metrics.statements.snapshot()["count"] == 4
+    assert metrics.slow_queries == 4
+    assert metrics.pool_wait.snapshot()["count"] == 2
+    assert "test_statements" in instrumentation_stats()["engines"]
+
+
+def test_failed_statements_leave_no_state_on_the_connection(tmp_path):
+    engine = _file_engine(tmp_path, pool_size=1, max_overflow=0)
+    metrics = instrument_engine(engine, "test_failures", slow_query_ms=10000)
+
+    with engine.connect() as connection:
+        info_before = dict(connection.info)
+        for _ in range(5):
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM missing_table"))
+            connection.rollback()
+        connection.execute(text("SELECT 1"))
+        assert connection.info == info_before
+
+    assert metrics.statements.snapshot()["count"] == 1
+    assert metrics.slow_queries == 0
+
+
+def test_pool_exhaustion_is_counted(tmp_path):
+    engine = _file_engine(tmp_path, pool_size=1, max_overflow=0, pool_timeout=5,
+                          connect_args={"check_same_thread": False})
+    metrics = instrument_engine(engine, "test_pool")
+    first = engine.connect()
+    released = threading.Timer(0.2, first.close)
+    released.start()
+
+    with engine.connect() as second:
+        second.execute(text("SELECT 1"))
+    released.join()
+
+    assert metrics.pool_exhausted == 1
+    assert metrics.pool_wait.snapshot()["max_ms"] >= 150
+
+
+def test_middleware_flags_routes_over_threshold(tmp_path):
+    engine = _file_engine(tmp_path, connect_args={"check_same_thread": False})
+    instrument_engine(engine, "test_middleware")
+    app = FastAPI()
+    app.add_middleware(QueryCountMiddleware, threshold=3)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int, queries: int = 1):
+        with engine.connect() as connection:
+            for _ in range(queries):
+                connection.execute(text("SELECT 1"))
+        return {"item_id": item_id}
+
+    with TestClient(app) as client:
+        assert client.get("/items/1").status_code == 200
+        assert "GET /items/{item_id}" not in instrumentation._flagged_requests
+        assert client.get("/items/2", params={"queries": 5}).status_code == 200
+
+    assert instrumentation._flagged_requests["GET /items/{item_id}"] == 1
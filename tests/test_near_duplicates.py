@@ -0,0 +1,60 @@
+from uuid import uuid4
+
+from common_lib.models import ModerationStatus
+from common_lib.services.moderation import ModerationProcessor
+from common_lib.services.signals.near_duplicates import NearDuplicateIndex, optimal_bands
+from common_lib.services.transport.base import ModerationTask
+
+TEMPLATE = ("I bought this {item} last month and the battery lasts two days, screen is bright "
+            "and camera is great. {adverb} recommend to everyone!")
+UNRELATED = [
+    "Terrible quality, broke after a week, never buying again from this seller.",
+    "Delivery was fast but the box was damaged and the manual was missing.",
+    "Works as described. The price is fair for what you get, nothing special.",
+]
+
+
+def test_edited_copies_form_one_cluster():
+    index = NearDuplicateIndex(threshold=0.7)
+    for i, text in enumerate(UNRELATED):
+        assert index.insert(f"u{i}", text).cluster_size == 1
+
+    sizes = [index.insert(f"copy{i}", TEMPLATE.format(item=item, adverb=adverb)).cluster_size
+             for i, (item, adverb) in enumerate([("phone", "Highly"), ("smartphone", "Really"),
+                                                 ("phone", "Strongly"), ("device", "Highly")])]
+
+    assert sizes == [1, 2, 3, 4]
+    assert index.clusters() == [sorted(f"copy{i}" for i in range(4))]
+    assert index.insert("copy0", "ignored on redelivery").cluster_size == 4
+    assert index.stats()["avg_candidates"] < len(index)
+
+
+def test_eviction_and_snapshot_round_trip(tmp_path):
+    index = NearDuplicateIndex(max_items=3)
+    for i in range(4):
+        index.insert(f"c{i}", TEMPLATE.format(item="phone", adverb="Highly"))
+    assert len(index) == 3 and index.cluster_size("c0") == 0
+    assert index.cluster_size("c3") == 3
+
+    path = str(tmp_path / "near_duplicates.npz")
+    index.save(path)
+    restored = NearDuplicateIndex(max_items=3)
+    assert restored.load(path)
+    assert restored.insert("c4", TEMPLATE.format(item="phone", adverb="Really")).cluster_size == 3
+    assert not NearDuplicateIndex(num_perm=64).load(path)
+
+
+def test_band_selection_tracks_threshold():
+    low_bands, low_rows = optimal_bands(0.5, 128)
+    high_bands, high_rows = optimal_bands(0.9, 128)
+    assert low_rows < high_rows and low_bands > high_bands
+
+
+def test_cluster_size_overrides_approval():
+    processor = ModerationProcessor(lambda text: 1, near_duplicates=NearDuplicateIndex(), reject_cluster_size=3)
+    statuses = []
+    for item in ("phone", "smartphone", "device"):
+        task = ModerationTask(comment_id=str(uuid4()), text=TEMPLATE.format(item=item, adverb="Highly"))
+        signals = processor.collect_signals(task)
+        statuses.append(processor.decide(1, signals))
+    assert statuses == [ModerationStatus.APPROVED, ModerationStatus.APPROVED, ModerationStatus.REJECTED]
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from common_lib.models import User
+from common_lib.services.auth.password_pool import PasswordPool, PasswordPoolSaturated
+
+
+def test_pool_rejects_when_saturated():
+    pool = PasswordPool(max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.01)
+        assert pool.stats()["in_flight"] == 1
+        with pytest.raises(PasswordPoolSaturated):
+            await pool.run(release.wait)
+        release.set()
+        await first
+
+    asyncio.run(scenario())
+    stats = pool.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 1
+    pool.shutdown()
+
+
+def test_cancelled_caller_keeps_its_slot_until_the_job_finishes():
+    pool = PasswordPool(max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.01)
+        first.cancel()  # клиент отключился, bcrypt продолжает работать
+        await asyncio.sleep(0.01)
+        with pytest.raises(PasswordPoolSaturated):
+            await asyncio.wait_for(pool.run(release.wait), timeout=1)
+        release.set()
+        for _ in range(100):
+            if pool.stats()["in_flight"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert await pool.run(lambda: "done") == "done"
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+    assert pool.stats()["rejected"] == 1
+    pool.shutdown()
+
+
+def test_login_returns_503_when_pool_saturated(client: TestClient, test_user: User):
+    with patch("common_lib.services.crud.user.password_pool.run", side_effect=PasswordPoolSaturated()):
+        response = client.post(
+            "/api/auth/token",
+            data={"username": test_user.email, "password": "password123"}
+        )
+    assert response.status_code == 503
+    assert "retry-after" in response.headers
@@ -0,0 +1,83 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+
+from common_lib.models import Comment, CommentUpdateModeration, ModerationStatus, Product, ProductCreate, User
+from common_lib.models.Comment import CommentCreate
+from common_lib.services.crud import comment as CommentCrud
+from common_lib.services.crud.product import create_product
+from common_lib.services.crud.product_stats import get_product_stats, rebuild_product_stats
+
+
+def create(session: Session, user: User, product: Product, rating: int) -> Comment:
+    with patch("common_lib.services.crud.comment.CommentService.publish_moderation_tasks"):
+        return CommentCrud.create_comment(
+            session=session,
+            comment_in=CommentCreate(text="Review", rating=rating, product_id=product.id),
+            author=user
+        )
+
+
+def test_stats_follow_create_moderate_delete(session: Session, test_user: User, test_product: Product):
+    first = create(session, test_user, test_product, 5)
+    create(session, test_user, test_product, 2)
+    CommentCrud.moderate_comment(session, first.id, CommentUpdateModeration(moderation_status=ModerationStatus.APPROVED))
+
+    stats = get_product_stats(session, test_product.id)
+    session.refresh(stats)
+    assert stats.comment_count == 2
+    assert stats.average_rating == 3.5
+    assert stats.approved_count == 1
+    assert stats.rejected_count == 0
+
+    CommentCrud.moderate_comment(session, first.id, CommentUpdateModeration(moderation_status=ModerationStatus.REJECTED))
+    CommentCrud.delete_comment(session, first.id)
+    session.refresh(stats)
+    assert stats.comment_count == 1
+    assert stats.rating_sum == 2
+    assert stats.approved_count == 0
+    assert stats.rejected_count == 0
+
+
+def test_rebuild_backfills_missing_stats(session: Session, test_user: User, test_product: Product):
+    session.add(Comment(text="Legacy", rating=4, user_id=test_user.id, product_id=test_product.id,
+                        moderation_status=ModerationStatus.REJECTED))
+    session.commit()
+
+    assert rebuild_product_stats(session) == 1
+    stats = get_product_stats(session, test_product.id)
+    assert (stats.comment_count, stats.rating_sum, stats.rejected_count) == (1, 4, 1)
+    assert rebuild_product_stats(session) == 0
+
+
+def test_product_read_exposes_stats(client: TestClient, session: Session, test_user: User):
+    product = create_product(session, ProductCreate(name="Phone", price=10.0))
+    create(session, test_user, product, 4)
+
+    response = client.get(f"/api/products/{product.id}")
+    assert response.status_code == 200
+    assert response.json()["stats"] == {
+        "comment_count": 1, "average_rating": 4.0, "approved_count": 0, "rejected_count": 0
+    }
+
+
+def test_concurrent_moderation_applies_the_delta_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        user = User(name="User", email="user@example.com", hashed_password="x")
+        product = create_product(session, ProductCreate(name="Phone", price=10.0))
+        session.add(user)
+        session.commit()
+        comment = create(session, user, product, 5)
+        comment_id, product_id = comment.id, product.id
+
+    approve = CommentUpdateModeration(moderation_status=ModerationStatus.APPROVED)
+    with Session(engine) as worker, Session(engine) as admin:
+        stale = worker.get(Comment, comment_id)  # воркер прочитал статус NOT_CHECKED
+        CommentCrud.moderate_comment(admin, comment_id, approve)
+        assert stale.moderation_status == ModerationStatus.NOT_CHECKED
+        assert CommentCrud.moderate_comment(worker, comment_id, approve) is stale
+        assert stale.moderation_status == ModerationStatus.APPROVED
+        assert get_product_stats(worker, product_id).approved_count == 1
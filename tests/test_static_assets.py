@@ -0,0 +1,49 @@
+import gzip
+import re
+
+from fastapi.testclient import TestClient
+
+from core.static_assets import build_static_assets, parse_accept_encoding, IMMUTABLE_CACHE_CONTROL
+
+
+def test_build_fingerprints_and_compresses(tmp_path):
+    source = tmp_path / "static"
+    (source / "js").mkdir(parents=True)
+    (source / "js" / "main.js").write_text("console.log('hi');")
+    (source / "logo.png").write_bytes(b"\x89PNG")
+
+    manifest = build_static_assets(source, tmp_path / "build")
+
+    hashed_js = manifest["js/main.js"]
+    assert re.fullmatch(r"js/main\.[0-9a-f]{12}\.js", hashed_js)
+    assert gzip.decompress((tmp_path / "build" / (hashed_js + ".gz")).read_bytes()) == b"console.log('hi');"
+    assert not (tmp_path / "build" / (manifest["logo.png"] + ".gz")).exists()
+    assert build_static_assets(source, tmp_path / "build") == manifest
+
+
+def test_pages_reference_fingerprinted_assets(client: TestClient):
+    page = client.get("/login")
+    match = re.search(r'href="(/static/style\.[0-9a-f]{12}\.css)"', page.text)
+    assert match
+
+    response = client.get(match.group(1), headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/css")
+
+
+def test_refused_encodings_are_not_served(client: TestClient):
+    assert parse_accept_encoding("br;q=0, gzip") == {"br": 0.0, "gzip": 1.0}
+    assert parse_accept_encoding("gzip; q=0.5, *;q=0, identity;q=x") == {"gzip": 0.5, "*": 0.0, "identity": 0.0}
+
+    path = re.search(r'href="(/static/style\.[0-9a-f]{12}\.css)"', client.get("/login").text).group(1)
+    assert client.get(path, headers={"Accept-Encoding": "br;q=0, gzip"}).headers["content-encoding"] == "gzip"
+    assert client.get(path, headers={"Accept-Encoding": "*"}).headers["content-encoding"] in ("br", "gzip")
+    assert "content-encoding" not in client.get(path, headers={"Accept-Encoding": "br;q=0, gzip;q=0"}).headers
+
+
+def test_unhashed_paths_are_still_served(client: TestClient):
+    response = client.get("/static/style.css")
+    assert response.status_code == 200
+    assert "immutable" not in response.headers.get("cache-control", "")
@@ -0,0 +1,46 @@
+import random
+
+import pandas as pd
+import pytest
+
+from common_lib.models.streaming_models import StreamingModelTrainer
+from common_lib.services.classifier.model import ReviewClassifier
+
+FAKE = "amazing perfect best product ever five stars highly recommend love it".split()
+REAL = "battery lasted two weeks strap broke returned it delivery slow box damaged".split()
+
+
+def write_corpus(path, rows=600, seed=0):
+    rng = random.Random(seed)
+    labels = [rng.choice(["CG", "OR"]) for _ in range(rows)]
+    texts = [" ".join(rng.choices(FAKE if label == "CG" else REAL, k=12)) + f" #{i}"
+             for i, label in enumerate(labels)]
+    pd.DataFrame({"category": "Home", "text_": texts, "label": labels}).to_csv(path, index=False)
+
+
+@pytest.mark.parametrize("model_name", ["sgd", "naive_bayes"])
+def test_streaming_training_from_csv_chunks(tmp_path, model_name):
+    path = tmp_path / "reviews.csv"
+    write_corpus(path)
+    trainer = StreamingModelTrainer(clean_text_methods=['lower', 'remove_punctuation'], n_features=2 ** 12)
+
+    metrics = trainer.train(model_name, str(path), chunk_size=64, epochs=2)
+    assert trainer.label_mapping == {"CG": 0, "OR": 1}
+    assert 30 < metrics["holdout_rows"] < 100
+    assert metrics["train_rows"] + metrics["holdout_rows"] == 600
+    assert metrics["accuracy"] > 0.95
+    assert len(trainer.history) == 2
+
+    artifact = tmp_path / "model_artifacts.pkl"
+    trainer.save_artifacts(str(artifact))
+    classifier = ReviewClassifier(str(artifact))
+    assert classifier.predict_labels(["best product ever, highly recommend", "strap broke, box damaged"]) == [0, 1]
+
+
+def test_holdout_split_does_not_depend_on_chunking(tmp_path):
+    path = tmp_path / "reviews.csv"
+    write_corpus(path, rows=300)
+    trainer = StreamingModelTrainer(classes=["CG", "OR"], n_features=2 ** 10)
+    trainer.train("naive_bayes", str(path), chunk_size=7)
+    small_chunks = trainer.evaluate(str(path), chunk_size=7)
+    assert trainer.evaluate(str(path), chunk_size=1000) == small_chunks
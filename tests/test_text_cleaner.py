@@ -0,0 +1,149 @@
+import pickle
+import re
+import string
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from common_lib.data import PreprocessingPipelineBuilder
+from common_lib.data.text_cleaner import TextCleaner
+
+METHODS = ['lower', 'remove_punctuation', 'remove_numbers', 'remove_whitespace', 'remove_stopwords']
+
+
+def missing_resource(path, *args, **kwargs):
+    raise LookupError(path)
+
+
+def test_cleaning_without_lemmatization_needs_no_corpora():
+    with patch("nltk.data.find", side_effect=missing_resource), patch("nltk.download") as download:
+        cleaner = TextCleaner(methods=['lower', 'remove_punctuation', 'remove_numbers'], stem=True)
+        assert cleaner.clean_text("Running 3 TESTS, quickly!") == "run test quickli"
+    download.assert_not_called()
+
+
+def test_missing_corpus_raises_instead_of_downloading(monkeypatch):
+    monkeypatch.delenv("NLTK_ALLOW_DOWNLOAD", raising=False)
+    with patch("nltk.data.find", side_effect=missing_resource), patch("nltk.download") as download:
+        with pytest.raises(LookupError, match="runtime downloads are disabled"):
+            TextCleaner(methods=METHODS)
+        cleaner = TextCleaner(methods=['lower'], lemmatize=True)
+        with pytest.raises(LookupError, match="wordnet"):
+            cleaner.clean_text("cars")
+    download.assert_not_called()
+
+
+def test_stop_words_are_precomputed_at_construction():
+    with patch("common_lib.data.text_cleaner.TextCleaner._load_stop_words",
+               return_value=frozenset({"the", "a"})) as load:
+        cleaner = TextCleaner(methods=METHODS)
+        assert cleaner.clean_text("The cat and a dog") == "cat and dog"
+        assert cleaner.clean_text("A bird") == "bird"
+    load.assert_called_once()
+
+
+def reference_clean(text, methods, stop_words):
+    if 'lower' in methods:
+        text = text.lower()
+    if 'remove_punctuation' in methods:
+        text = text.translate(str.maketrans('', '', string.punctuation))
+    if 'remove_numbers' in methods:
+        text = re.sub(r'\d+', '', text)
+    if 'remove_whitespace' in methods:
+        text = re.sub(r'\s+', ' ', text).strip()
+    words = text.split()
+    if 'remove_stopwords' in methods:
+        words = [word for word in words if word not in stop_words]
+    return ' '.join(words)
+
+
+@pytest.mark.parametrize("methods", [
+    METHODS,
+    ['remove_numbers'],
+    ['lower', 'remove_whitespace'],
+    ['remove_punctuation', 'remove_stopwords'],
+])
+def test_compiled_plan_matches_step_by_step_cleaning(methods):
+    texts = [
+        "The  QUICK brown fox, 42 times!!\tOver the lazy dog...",
+        "Цена 1500₽ — ОТЛИЧНО; ΟΔΟΣ ٣٤ km/h and a 2nd try",
+        "   ",
+        "It's a-ok: 100% (really) #1",
+    ]
+    with patch("common_lib.data.text_cleaner.TextCleaner._load_stop_words",
+               return_value=frozenset({"the", "a", "and"})):
+        cleaner = TextCleaner(methods=methods)
+    for text in texts:
+        assert cleaner.clean_text(text) == reference_clean(text, methods, {"the", "a", "and"})
+    assert cleaner.clean_text(None) == ""
+
+
+def test_pickles_without_compiled_plan_are_restored():
+    cleaner = TextCleaner(methods=['lower', 'remove_punctuation'], stem=True)
+    state = cleaner.__getstate__()
+    assert '_delete_table' not in state
+
+    restored = pickle.loads(pickle.dumps(cleaner))
+    assert restored.clean_text("Running, FAST!") == "run fast"
+
+    legacy = TextCleaner.__new__(TextCleaner)
+    legacy.__setstate__({"methods": ['lower', 'remove_numbers'], "stop_words_lang": "english",
+                         "lemmatize": False, "stem": False, "_stop_words": set()})
+    assert legacy.clean_text("Room 101 IS Free") == "room is free"
+
+
+def test_stems_are_memoized_in_a_bounded_cache():
+    cleaner = TextCleaner(methods=['lower'], stem=True, token_cache_size=3)
+    assert cleaner.clean_text("running runs running RUNNING") == "run run run run"
+    stats = cleaner.token_cache_stats()["stem"]
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 2, 2)
+
+    cleaner.clean_text("jumping swimming flying")
+    assert len(cleaner._stem_cache) == 3
+    assert cleaner.clean_text("running") == "run"
+
+
+def test_token_cache_is_seeded_from_vocabulary_and_pickled():
+    frame = pd.DataFrame({"text_": ["cats running quickly", "dogs running slowly", "cats sleeping"]})
+    pipeline = PreprocessingPipelineBuilder(frame).build_text_preprocessing_pipeline(
+        "text_", vectorizer_method='count', clean_text_methods=['lower'], clean_text_stem=True,
+        ngram_range=(1, 2))
+    pipeline.fit(frame)
+    assert PreprocessingPipelineBuilder.warm_token_cache(pipeline) > 0
+
+    restored = pickle.loads(pickle.dumps(pipeline))
+    transformer = restored.named_steps['text_cleaner']
+    seeded = transformer.token_cache_stats()["stem"]["size"]
+    assert seeded > 0
+    restored.transform(pd.DataFrame({"text_": ["cat dog"]}))
+    assert transformer.token_cache_stats()["stem"]["hits"] == 2
+
+
+def test_parallel_clean_series_matches_sequential_order():
+    texts = [f"Review {i}: Running DOGS, {i % 7} times!" for i in range(50)] + [None]
+    series = pd.Series(texts, index=range(100, 151), name="text_")
+    cleaner = TextCleaner(methods=['lower', 'remove_punctuation', 'remove_numbers'], stem=True)
+
+    parallel = cleaner.clean_series(series, n_jobs=2, chunk_size=7)
+    pd.testing.assert_series_equal(parallel, series.apply(cleaner.clean_text))
+
+
+def test_fused_analyzer_matches_cleaner_then_vectorizer():
+    frame = pd.DataFrame({"text_": ["Cats running QUICKLY, really!", "Dogs run slowly... a dog", None,
+                                    "The 2 cats & 1 dog running"]})
+    options = dict(vectorizer_method='tfidf', clean_text_methods=['remove_punctuation', 'remove_numbers'],
+                   clean_text_stem=True, ngram_range=(1, 2))
+    builder = PreprocessingPipelineBuilder(frame)
+    chained = builder.build_text_preprocessing_pipeline("text_", **options)
+    fused = builder.build_text_preprocessing_pipeline("text_", fused_analyzer=True, **options)
+
+    expected = chained.fit_transform(frame)
+    actual = fused.fit_transform(frame)
+    assert fused.named_steps['vectorizer'].vocabulary_ == chained.named_steps['vectorizer'].vocabulary_
+    assert abs(expected - actual).max() < 1e-12
+
+    restored = pickle.loads(pickle.dumps(fused))
+    assert abs(restored.transform(frame) - actual).max() < 1e-12
+    with pytest.raises(ValueError, match="token_pattern"):
+        builder.build_text_preprocessing_pipeline("text_", fused_analyzer=True, token_pattern=r"\w+")
@@ -0,0 +1,73 @@
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from common_lib.database.config import get_settings
+from common_lib.models import Product, User
+from common_lib.services.auth.auth_service import create_access_token
+from common_lib.services.tracing import (
+    REQUEST_ID_HEADER,
+    HopLatencyRecorder,
+    bind_request,
+    build_trace_headers,
+    read_trace_headers,
+    reset_request,
+)
+
+settings = get_settings()
+
+
+def test_request_id_is_generated_or_echoed(client: TestClient):
+    generated = client.get("/login")
+    assert len(generated.headers[REQUEST_ID_HEADER]) == 32
+
+    echoed = client.get("/login", headers={"X-Request-ID": "abc-123"})
+    assert echoed.headers[REQUEST_ID_HEADER] == "abc-123"
+
+    rejected = client.get("/login", headers={"X-Request-ID": "bad id\twith spaces"})
+    assert rejected.headers[REQUEST_ID_HEADER] != "bad id\twith spaces"
+
+
+def test_request_id_reaches_amqp_headers(client: TestClient, session: Session, test_user: User,
+                                         test_product: Product):
+    token = create_access_token(data={"sub": test_user.email})
+    client.cookies.set(settings.COOKIE_NAME, f"Bearer {token}")
+
+    with patch("common_lib.services.transport.rabbitmq.pika.BlockingConnection") as connection_cls:
+        channel = MagicMock()
+        connection_cls.return_value.channel.return_value = channel
+        response = client.post(
+            "/api/comments/",
+            json={"product_id": str(test_product.id), "text": "Отличный товар", "rating": 5},
+            headers={"X-Request-ID": "trace-1"},
+        )
+
+    assert response.status_code == 201
+    properties = channel.basic_publish.call_args.kwargs["properties"]
+    assert properties.correlation_id == "trace-1"
+    trace = read_trace_headers(properties.headers)
+    assert trace["request_id"] == "trace-1"
+    assert trace["timestamps"]["accepted"] <= trace["timestamps"]["published"]
+
+
+def test_explicit_task_trace_wins_over_context():
+    tokens = bind_request("from-context", 100.0)
+    try:
+        headers = build_trace_headers("from-task", 50.0)
+    finally:
+        reset_request(tokens)
+    trace = read_trace_headers(headers)
+    assert trace["request_id"] == "from-task"
+    assert trace["timestamps"]["accepted"] == 50.0
+
+
+def test_hop_breakdown_skips_missing_hops():
+    recorder = HopLatencyRecorder()
+    breakdown = recorder.record({"accepted": 10.0, "published": 10.01, "dequeued": 10.5, "persisted": 10.7})
+
+    expected = {"accepted->published": 10.0, "published->dequeued": 490.0,
+                "dequeued->persisted": 200.0, "total": 700.0}
+    assert breakdown.keys() == expected.keys()
+    assert all(abs(breakdown[hop] - ms) < 1e-6 for hop, ms in expected.items())
+    assert recorder.stats()["total"]["count"] == 1
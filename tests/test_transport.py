@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from uuid import uuid4
+
+import pytest
+from sqlmodel import Session
+
+from common_lib.models import Comment, ModerationStatus, Product, User
+from common_lib.services.moderation import ModerationProcessor
+from common_lib.services.tracing import read_trace_headers
+from common_lib.services.transport.base import ModerationTask, TransportError
+from common_lib.services.transport.inprocess import InProcessTransport
+
+
+def make_task(text: str = "Great product") -> ModerationTask:
+    return ModerationTask(comment_id=str(uuid4()), text=text, user_id=str(uuid4()))
+
+
+def test_inprocess_transport_runs_handler_off_the_event_loop():
+    handled = []
+
+    def handler(task: ModerationTask):
+        handled.append((task.comment_id, threading.current_thread().name))
+
+    async def scenario():
+        transport = InProcessTransport(handler, workers=2)
+        await transport.start()
+        tasks = [make_task() for _ in range(5)]
+        # Публикация из потока, как это делают синхронные обработчики запросов
+        await asyncio.to_thread(transport.publish, tasks)
+        await transport.stop()
+        return transport, tasks
+
+    transport, tasks = asyncio.run(scenario())
+
+    assert sorted(comment_id for comment_id, _ in handled) == sorted(t.comment_id for t in tasks)
+    assert all(thread.startswith("moderation") for _, thread in handled)
+    timestamps = read_trace_headers(tasks[0].headers)["timestamps"]
+    assert timestamps["published"] <= timestamps["dequeued"]
+    stats = transport.stats()
+    assert stats["processed"] == 5 and stats["failed"] == 0
+    assert stats["dispatch"]["count"] == 5
+
+
+def test_inprocess_transport_rejects_when_full_or_stopped():
+    release = threading.Event()
+
+    async def scenario():
+        transport = InProcessTransport(lambda task: release.wait(5), workers=1, max_queue=2)
+        with pytest.raises(TransportError):
+            transport.publish([make_task()])
+        await transport.start()
+        transport.publish([make_task()])
+        await asyncio.sleep(0.05)  # первая задача занята обработчиком
+        transport.publish([make_task(), make_task()])
+        with pytest.raises(TransportError):
+            transport.publish([make_task()])
+        assert await transport.queue_load() == (2, 1)
+        release.set()
+        await transport.stop()
+        return transport
+
+    assert asyncio.run(scenario()).stats()["rejected"] == 1
+
+
+def test_task_message_round_trip_and_validation():
+    task = make_task()
+    restored = ModerationTask.from_message(task.to_message(), {"x-request-id": "abc"})
+    assert (restored.comment_id, restored.text, restored.request_id) == (task.comment_id, task.text, "abc")
+
+    with pytest.raises(ValueError):
+        ModerationTask.from_message({"task_id": "1", "task_type": "image_classification"})
+
+
+def test_processor_writes_status_and_stamps_hops(session: Session, test_user: User, test_product: Product):
+    comment = Comment(text="BUY NOW!!!", rating=5, user_id=test_user.id, product_id=test_product.id)
+    session.add(comment)
+    session.commit()
+
+    processor = ModerationProcessor(lambda text: 0 if "!!!" in text else 1,
+                                    session_factory=lambda: Session(session.get_bind()), summary_every=0)
+    task = ModerationTask(comment_id=str(comment.id), text=comment.text, user_id=str(test_user.id))
+
+    assert processor.handle(task) == ModerationStatus.REJECTED
+    session.expire_all()
+    assert session.get(Comment, comment.id).moderation_status == ModerationStatus.REJECTED
+    assert {"scored", "persisted"} <= read_trace_headers(task.headers)["timestamps"].keys()
+
+    with pytest.raises(ValueError):
+        processor.handle(ModerationTask(comment_id=str(comment.id), text=""))
@@ -0,0 +1,92 @@
+from uuid import uuid4
+
+from common_lib.models import ModerationStatus
+from common_lib.services.moderation import ModerationProcessor
+from common_lib.services.signals.trending_phrases import TrendingPhraseTracker
+from common_lib.services.tracing import build_trace_headers
+from common_lib.services.transport.base import ModerationTask
+
+T0 = 1_700_000_000.0
+CAMPAIGN = "Absolutely life changing blender, {n} stars from me"
+BACKGROUND = [
+    "The strap broke after a week of normal use",
+    "Arrived quickly and the colour matches the photos",
+    "Too small for my kitchen but works fine otherwise",
+]
+
+
+def test_campaign_phrase_becomes_trending():
+    tracker = TrendingPhraseTracker(width=1024, top_k=20, min_count=6, half_life_seconds=600)
+    for i in range(15):
+        tracker.observe(BACKGROUND[i % len(BACKGROUND)] + f" order {i}", at=T0)
+    assert tracker.trending(at=T0) == []
+
+    flagged = [tracker.observe(CAMPAIGN.format(n=n), at=T0) for n in range(6)]
+    assert flagged[4] == [] and "absolutely life changing" in flagged[5]
+
+    phrases = dict(tracker.trending(at=T0))
+    assert phrases["absolutely life changing blender"] == 6
+    assert all("strap broke" not in phrase for phrase in phrases)
+    assert tracker.contains_trending("What an absolutely life changing purchase", at=T0)
+    assert tracker.estimate("absolutely life changing", at=T0) >= 6
+
+
+def test_counts_decay_and_memory_is_fixed():
+    tracker = TrendingPhraseTracker(width=512, depth=3, top_k=5, min_count=4, half_life_seconds=60)
+    for i in range(8):
+        tracker.observe(CAMPAIGN.format(n=5), at=T0)
+    assert tracker.estimate("absolutely life changing", at=T0 + 60) == 4.0
+    assert tracker.trending(at=T0 + 120) == []
+
+    for i in range(500):
+        tracker.observe(f"unique review number {i} with words {i * 7}", at=T0 + 200 + i)
+    stats = tracker.stats()
+    assert stats["table_bytes"] == 512 * 3 * 8
+    assert len(tracker._top) == 5
+
+
+def test_redelivered_comment_is_not_counted_again(tmp_path):
+    tracker = TrendingPhraseTracker(width=1024, min_count=3)
+    for _ in range(3):
+        assert tracker.observe(CAMPAIGN.format(n=1), at=T0, comment_id="c1") == []
+    assert tracker.estimate("absolutely life changing", at=T0) == 1
+
+    tracker.observe(CAMPAIGN.format(n=2), at=T0, comment_id="c2")
+    assert tracker.observe(CAMPAIGN.format(n=3), at=T0, comment_id="c3")
+    # Повторная доставка видит тренд, но счётчики не меняет
+    assert tracker.observe(CAMPAIGN.format(n=1), at=T0, comment_id="c1")
+    assert tracker.estimate("absolutely life changing", at=T0) == 3
+
+    path = str(tmp_path / "trending_phrases.npz")
+    tracker.save(path)
+    restored = TrendingPhraseTracker(width=1024, min_count=3)
+    assert restored.load(path)
+    restored.observe(CAMPAIGN.format(n=3), at=T0, comment_id="c3")
+    assert restored.estimate("absolutely life changing", at=T0) == 3
+    assert tracker.stats()["repeated_reviews"] == 3
+
+
+def test_snapshot_round_trip_and_forward_scaling(tmp_path):
+    tracker = TrendingPhraseTracker(width=256, min_count=2, half_life_seconds=1)
+    tracker.observe(CAMPAIGN.format(n=1), at=T0)
+    for n in range(2):  # коэффициент 2^100: точка отсчёта переносится
+        tracker.observe(CAMPAIGN.format(n=n), at=T0 + 100)
+    assert 2.0 <= tracker.trending(at=T0 + 100)[0][1] < 2.01
+
+    path = str(tmp_path / "trending_phrases.npz")
+    tracker.save(path)
+    restored = TrendingPhraseTracker(width=256, min_count=2, half_life_seconds=1)
+    assert restored.load(path)
+    assert restored.trending(at=T0 + 100) == tracker.trending(at=T0 + 100)
+    assert not TrendingPhraseTracker(width=128).load(path)
+
+
+def test_trending_phrases_override_approval():
+    processor = ModerationProcessor(lambda text: 1, reject_trending_phrases=1,
+                                    trending_phrases=TrendingPhraseTracker(width=1024, min_count=3))
+    statuses = []
+    for n in range(4):
+        task = ModerationTask(comment_id=str(uuid4()), text=CAMPAIGN.format(n=n),
+                              headers=build_trace_headers(accepted_at=T0))
+        statuses.append(processor.decide(1, processor.collect_signals(task)))
+    assert statuses == [ModerationStatus.APPROVED] * 2 + [ModerationStatus.REJECTED] * 2
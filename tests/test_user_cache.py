@@ -0,0 +1,81 @@
+import time
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from common_lib.database.config import get_settings
+from common_lib.models import User, UserOut, RoleEnum
+from common_lib.services.auth.auth_service import create_access_token
+from common_lib.services.auth.user_cache import UserCache, user_cache
+
+settings = get_settings()
+
+
+def make_user(email: str = "cached@example.com") -> UserOut:
+    return UserOut(id=uuid4(), name="Cached", email=email, role=RoleEnum.USER)
+
+
+def test_cache_hit_and_miss_stats():
+    cache = UserCache(maxsize=10, ttl_seconds=60)
+    user = make_user()
+    assert cache.get("token") is None
+    cache.set("token", user)
+    assert cache.get("token") == user
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_cache_is_bounded():
+    cache = UserCache(maxsize=2, ttl_seconds=60)
+    for i in range(3):
+        cache.set(f"token-{i}", make_user(f"user{i}@example.com"))
+    assert cache.get("token-0") is None
+    assert cache.stats()["size"] == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_respects_token_expiry():
+    cache = UserCache(maxsize=10, ttl_seconds=60)
+    cache.set("expired", make_user(), token_exp=time.time() - 1)
+    assert cache.get("expired") is None
+
+
+def test_cache_invalidation_by_email_and_id():
+    cache = UserCache(maxsize=10, ttl_seconds=60)
+    user = make_user()
+    cache.set("a", user)
+    cache.set("b", user)
+    cache.invalidate_email(user.email)
+    assert cache.get("a") is None and cache.get("b") is None
+
+    cache.set("c", user)
+    cache.invalidate_user_id(user.id)
+    assert cache.get("c") is None
+
+
+def test_page_auth_served_from_cache(client: TestClient, test_user: User):
+    user_cache.clear()
+    token = create_access_token(data={"sub": test_user.email})
+    client.cookies.set(settings.COOKIE_NAME, f"Bearer {token}")
+
+    client.get("/")
+    hits_before = user_cache.stats()["hits"]
+    response = client.get("/")
+    assert response.status_code == 200
+    assert test_user.name in response.text
+    assert user_cache.stats()["hits"] == hits_before + 1
+
+
+def test_role_change_invalidates_cache(client: TestClient, test_user: User, test_admin_user: User):
+    user_cache.clear()
+    token = create_access_token(data={"sub": test_user.email})
+    user_cache.set(token, UserOut.model_validate(test_user))
+
+    admin_token = create_access_token(data={"sub": test_admin_user.email})
+    client.cookies.set(settings.COOKIE_NAME, f"Bearer {admin_token}")
+    response = client.put(f"/api/auth/users/{test_user.id}/role", params={"role": "admin"})
+    assert response.status_code == 200
+    assert response.json()["role"] == "admin"
+    assert user_cache.get(token) is None
@@ -0,0 +1,68 @@
+from uuid import uuid4
+
+from common_lib.models import ModerationStatus
+from common_lib.services.moderation import ModerationProcessor
+from common_lib.services.signals.user_features import BehaviorFeatureStore
+from common_lib.services.tracing import build_trace_headers
+from common_lib.services.transport.base import ModerationTask
+
+T0 = 1_700_000_000.0
+
+
+def test_window_counts_expire_and_stay_bounded():
+    store = BehaviorFeatureStore(window_seconds=60, buckets=6)
+    for i in range(5):
+        assert store.update(f"c{i}", "u1", f"p{i % 2}", rating=5, at=T0 + i * 10)
+    assert not store.update("c0", "u1", "p0", rating=5, at=T0 + 45)
+
+    features = store.user_features("u1", at=T0 + 45)
+    assert features["reviews_in_window"] == 5
+    assert features["rating_histogram"][5] == 5
+    assert features["distinct"] == 2
+    assert features["five_star_streak"] == 5
+    assert store.product_features("p0", at=T0 + 45)["distinct"] == 1
+
+    # Первые два события (T0, T0+10) выходят из окна
+    assert store.user_features("u1", at=T0 + 75)["reviews_in_window"] == 3
+    assert store.user_features("u1", at=T0 + 1000)["reviews_in_window"] == 0
+    assert store.update("c5", "u2", "p0", at=T0 + 1000)
+    assert not store.update("late", "u1", "p0", at=T0)
+    assert store.stats()["late_events"] == 1
+    assert store.user_features("unknown")["reviews_in_window"] == 0
+
+
+def test_streak_resets_and_entities_are_evicted():
+    store = BehaviorFeatureStore(max_entities=2)
+    store.update("c1", "u1", None, rating=5, at=T0)
+    store.update("c2", "u1", None, rating=3, at=T0 + 1)
+    assert store.user_features("u1", at=T0 + 1)["five_star_streak"] == 0
+
+    store.update("c3", "u2", None, at=T0 + 2)
+    store.update("c4", "u3", None, at=T0 + 3)
+    assert len(store) == 2 and store.stats()["evictions"] == 1
+    assert store.user_features("u1", at=T0 + 3)["reviews_in_window"] == 0
+
+
+def test_snapshot_round_trip(tmp_path):
+    store = BehaviorFeatureStore(window_seconds=60, buckets=6)
+    for i in range(3):
+        store.update(f"c{i}", "u1", f"p{i}", rating=4, at=T0 + i)
+    path = str(tmp_path / f"behavior_features{store.snapshot_suffix}")
+    store.save(path)
+
+    restored = BehaviorFeatureStore(window_seconds=60, buckets=6)
+    assert restored.load(path)
+    assert restored.user_features("u1", at=T0 + 5) == store.user_features("u1", at=T0 + 5)
+    assert not restored.update("c1", "u1", "p1", at=T0 + 5)
+    assert not BehaviorFeatureStore(window_seconds=120, buckets=6).load(path)
+
+
+def test_burst_overrides_approval():
+    processor = ModerationProcessor(lambda text: 1, behavior_features=BehaviorFeatureStore(),
+                                    reject_user_reviews_in_window=2)
+    statuses = []
+    for i in range(3):
+        task = ModerationTask(comment_id=str(uuid4()), text="Great product", user_id="u1",
+                              product_id=f"p{i}", rating=5, headers=build_trace_headers(accepted_at=T0 + i))
+        statuses.append(processor.decide(1, processor.collect_signals(task)))
+    assert statuses == [ModerationStatus.APPROVED, ModerationStatus.APPROVED, ModerationStatus.REJECTED]
@@ -0,0 +1,42 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+
+from common_lib.data import PreprocessingPipelineBuilder
+from common_lib.text_transformers.streaming_tfidf_transformer import StreamingTfidfTransformer
+
+TEXTS = ["great product works perfectly", "terrible product broke after a week", "great price great seller",
+         "works as described", "broke again, terrible"]
+
+
+def test_streaming_idf_matches_tfidf_transformer():
+    counts = HashingVectorizer(n_features=2 ** 10, alternate_sign=False, norm=None).transform(TEXTS)
+    expected = TfidfTransformer(sublinear_tf=True).fit_transform(counts)
+
+    streaming = StreamingTfidfTransformer(sublinear_tf=True)
+    streaming.partial_fit(counts[:2]).partial_fit(counts[2:])
+    assert abs(streaming.transform(counts) - expected).max() < 1e-12
+    assert streaming.n_docs_ == len(TEXTS)
+
+    with pytest.raises(ValueError, match="features"):
+        streaming.partial_fit(counts[:, :10])
+
+
+def test_hashing_pipeline_has_fixed_width_and_no_vocabulary():
+    frame = pd.DataFrame({"text_": TEXTS})
+    builder = PreprocessingPipelineBuilder(frame)
+    pipeline = builder.build_text_preprocessing_pipeline(
+        "text_", vectorizer_method='hashing', use_idf=True, n_features=2 ** 12, ngram_range=(1, 2),
+        clean_text_methods=['lower', 'remove_punctuation'])
+    matrix = pipeline.fit_transform(frame)
+    assert matrix.shape == (len(TEXTS), 2 ** 12)
+    assert np.allclose(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel(), 1.0)
+
+    restored = pickle.loads(pickle.dumps(pipeline))
+    assert abs(restored.transform(frame) - matrix).max() < 1e-12
+
+    features = builder.create_text_features("text_", method='hashing', n_features=2 ** 8)
+    assert features.shape == (len(TEXTS), 2 ** 8)